@@ -1,29 +1,404 @@
 
+import asyncio
 import asyncpg
+import contextvars
+import functools
 import os
+import time
 from dotenv import load_dotenv
+from fastapi import BackgroundTasks, HTTPException
+
+from PlayConnect_API import queries
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica. Handlers decorated with @read_only use it when it is
+# healthy, lagging less than DB_READ_MAX_LAG seconds, and neither the caller
+# nor anyone writing to the topics the handler reads (e.g. "games") has
+# written in the last DB_READ_YOUR_WRITES_WINDOW seconds.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+DB_READ_MAX_LAG = float(os.getenv("DB_READ_MAX_LAG", "2"))
+DB_READ_YOUR_WRITES_WINDOW = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", "5"))
+DB_READ_LAG_CHECK_INTERVAL = float(os.getenv("DB_READ_LAG_CHECK_INTERVAL", "1"))
+
+# Pool sizing. DB_POOL_MAX defaults to a small multiple of the CPU count; set
+# it explicitly on providers with strict client limits (e.g. Neon session mode).
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", str(min(4 * (os.cpu_count() or 1), 20))))
+# Seconds a request may wait for a free connection before failing with 503.
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "5"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))
+# Transaction pooling (pgbouncer, Neon pooled endpoint): a server connection
+# can change between statements, so no statement cache, no explicit prepared
+# statements and no session state.
+DB_PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER_MODE", "0") == "1"
+# Attempts a UnitOfWork makes when the transaction hits a serialization
+# failure or deadlock before giving up with a 503.
+DB_TX_RETRIES = int(os.getenv("DB_TX_RETRIES", "3"))
+
+
+class PoolTimeout(HTTPException):
+    def __init__(self, waited: float):
+        super().__init__(status_code=503, detail=f"Database busy: no connection available after {waited:.1f}s")
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.acquires = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class _Acquire:
+    def __init__(self, owner: "InstrumentedPool", timeout: float):
+        self._owner = owner
+        self._timeout = timeout
+        self._conn = None
+
+    async def __aenter__(self):
+        owner = self._owner
+        start = time.perf_counter()
+        try:
+            self._conn = await owner._pool.acquire(timeout=self._timeout)
+        except asyncio.TimeoutError:
+            owner.metrics.timeouts += 1
+            raise PoolTimeout(time.perf_counter() - start)
+        waited = (time.perf_counter() - start) * 1000
+        m = owner.metrics
+        m.acquires += 1
+        m.wait_ms_total += waited
+        m.wait_ms_max = max(m.wait_ms_max, waited)
+        m.in_use += 1
+        m.peak_in_use = max(m.peak_in_use, m.in_use)
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        try:
+            await self._owner._pool.release(self._conn)
+        finally:
+            self._owner.metrics.in_use -= 1
+
+
+class InstrumentedPool:
+    """asyncpg pool wrapper: acquire() times the wait and fails fast with a 503.
+
+    Everything else (close, get_size, ...) is delegated to the asyncpg pool.
+    """
+
+    def __init__(self, pool: asyncpg.pool.Pool, acquire_timeout: float):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.metrics = PoolMetrics()
+        self.replica: "InstrumentedPool" = None
+
+    def acquire(self, timeout: float = None, *, primary: bool = False) -> _Acquire:
+        """Inside a @read_only handler this hands out a replica connection unless primary=True."""
+        use_replica = self.replica is not None and not primary and _use_replica.get()
+        target = self.replica if use_replica else self
+        return _Acquire(target, target.acquire_timeout if timeout is None else timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    def stats(self) -> dict:
+        m = self.metrics
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "in_use": m.in_use,
+            "peak_in_use": m.peak_in_use,
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "acquires": m.acquires,
+            "timeouts": m.timeouts,
+            "acquire_wait_avg_ms": round(m.wait_ms_total / m.acquires, 3) if m.acquires else 0.0,
+            "acquire_wait_max_ms": round(m.wait_ms_max, 3),
+            "acquire_timeout_s": self.acquire_timeout,
+            "pgbouncer_mode": DB_PGBOUNCER_MODE,
+        }
+
+
+pool: InstrumentedPool = None
+read_pool: InstrumentedPool = None
+
+
+class Scope:
+    """A pooled connection plus side effects to run once it is back in the pool.
+
+        async with Database.scope() as scope:
+            row = await scope.connection.fetchrow(...)
+            scope.after_release(send_email, row["email"], subject, html)
+            return ...
+
+    Hooks (coroutine functions) are awaited in order after the connection is
+    released, so slow I/O such as SMTP never pins a connection. They run when
+    the block exits normally or with an HTTPException (a deliberate response,
+    e.g. login's "verify your email" 403); any other exception drops them.
+    A failing hook is logged and does not affect the response.
+    """
+
+    def __init__(self, pool: InstrumentedPool, timeout: float = None, primary: bool = False):
+        self._acquire = pool.acquire(timeout, primary=primary)
+        self._hooks = []
+        self.connection = None
+
+    def after_release(self, fn, *args, **kwargs) -> None:
+        self._hooks.append((fn, args, kwargs))
+
+    async def __aenter__(self) -> "Scope":
+        self.connection = await self._acquire.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._acquire.__aexit__(exc_type, exc, tb)
+        finally:
+            self.connection = None
+        if exc_type is None or issubclass(exc_type, HTTPException):
+            await run_hooks(self._hooks)
+        return False
+
+
+async def run_hooks(hooks) -> None:
+    for fn, args, kwargs in hooks:
+        try:
+            await fn(*args, **kwargs)
+        except Exception as e:
+            print(f"[WARNING] post-release hook {getattr(fn, '__name__', fn)} failed: {repr(e)}")
+
+
+def scope(timeout: float = None, *, primary: bool = False) -> Scope:
+    return Scope(pool, timeout, primary)
+
+
+RETRYABLE_ERRORS = (
+    asyncpg.exceptions.SerializationError,
+    asyncpg.exceptions.DeadlockDetectedError,
+)
+
+
+class TransactionConflict(HTTPException):
+    def __init__(self, attempts: int):
+        super().__init__(status_code=503, detail=f"Transaction conflict persisted after {attempts} attempts, retry later")
+
+
+class UnitOfWork:
+    """One transaction per write request, retried on serialization failures and deadlocks.
+
+        @app.post(...)
+        async def handler(payload: ..., uow: Database.UnitOfWork = Depends(Database.unit_of_work)):
+            async def work(connection):
+                ...                                   # every statement, one COMMIT
+                uow.after_commit(send_email, ...)     # side effects
+                return result
+            return await uow.run(work)
+
+    `work` may run more than once, so it must not have effects outside the
+    transaction: queue those with after_commit(). Hooks queued by a failed
+    attempt are discarded. After the commit they go to the request's
+    BackgroundTasks (sent after the response) or, without one, are awaited
+    once the connection is back in the pool.
+    """
+
+    def __init__(self, background: BackgroundTasks = None, *, isolation: str = "read_committed",
+                 retries: int = DB_TX_RETRIES):
+        self.background = background
+        self.isolation = isolation
+        self.retries = max(1, retries)
+        self.attempts = 0
+        self._hooks = []
+
+    def after_commit(self, fn, *args, **kwargs) -> None:
+        self._hooks.append((fn, args, kwargs))
+
+    async def run(self, work):
+        for attempt in range(1, self.retries + 1):
+            self.attempts = attempt
+            self._hooks = []
+            try:
+                async with pool.acquire(primary=True) as connection:
+                    async with connection.transaction(isolation=self.isolation):
+                        result = await work(connection)
+            except RETRYABLE_ERRORS as e:
+                print(f"[db] transaction attempt {attempt}/{self.retries} conflicted: {e}")
+                if attempt == self.retries:
+                    raise TransactionConflict(attempt)
+                await asyncio.sleep(0.02 * 2 ** (attempt - 1))
+                continue
+            hooks, self._hooks = self._hooks, []
+            if hooks:
+                if self.background is not None:
+                    self.background.add_task(run_hooks, hooks)
+                else:
+                    await run_hooks(hooks)
+            return result
+
+
+def unit_of_work(background: BackgroundTasks) -> UnitOfWork:
+    """FastAPI dependency: a UnitOfWork whose post-commit hooks run as background tasks."""
+    return UnitOfWork(background)
+
+
+# ---------------------------------------------------------------------------
+# Read routing
+# ---------------------------------------------------------------------------
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+_recent_writes = {}  # user_id -> monotonic time of their last write (this process)
+_recent_topic_writes = {}  # topic (e.g. "games") -> monotonic time of its last write (this process)
+replica_state = {"lag_s": None, "healthy": False, "checked_at": None, "routed": 0, "fallbacks": 0}
+_lag_task: asyncio.Task = None
+
+
+def note_write(*user_ids) -> None:
+    """Pin these users' reads to the primary for DB_READ_YOUR_WRITES_WINDOW seconds."""
+    now = time.monotonic()
+    for uid in user_ids:
+        if uid is not None:
+            _recent_writes[uid] = now
+    if len(_recent_writes) > 10_000:
+        cutoff = now - DB_READ_YOUR_WRITES_WINDOW
+        for uid in [u for u, t in _recent_writes.items() if t < cutoff]:
+            del _recent_writes[uid]
+
+
+def note_topic_write(*topics) -> None:
+    """Pin reads of these topics (for anyone) to the primary for DB_READ_YOUR_WRITES_WINDOW seconds."""
+    now = time.monotonic()
+    for topic in topics:
+        _recent_topic_writes[topic] = now
+
+
+def _replica_usable(user_id=None, topics=()) -> bool:
+    if read_pool is None:
+        return False
+    if not replica_state["healthy"] or (replica_state["lag_s"] or 0) > DB_READ_MAX_LAG:
+        replica_state["fallbacks"] += 1
+        return False
+    now = time.monotonic()
+    wrote_at = [_recent_writes.get(user_id) if user_id is not None else None]
+    wrote_at += [_recent_topic_writes.get(topic) for topic in topics]
+    if any(t is not None and now - t < DB_READ_YOUR_WRITES_WINDOW for t in wrote_at):
+        replica_state["fallbacks"] += 1
+        return False
+    replica_state["routed"] += 1
+    return True
+
+
+def read_only(user_param: str = None, *, topics=()):
+    """Route the handler's Database.pool.acquire() calls to the read replica when safe.
+
+    `user_param` names the handler argument identifying the caller, used for
+    read-your-writes: a user who just wrote (see writes()) reads from the primary.
+    `topics` covers shared lists whose callers aren't the writers (the games
+    dashboard after someone joins): any recent write to one of them pins the
+    read to the primary.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            user_id = kwargs.get(user_param) if user_param else None
+            token = _use_replica.set(_replica_usable(user_id, topics))
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+        return wrapper
+    return decorator
+
+
+def writes(users=None, *, topics=()):
+    """Mark a handler as writing on behalf of `users(kwargs)` (an id or a list of ids)
+    and/or to the shared `topics` read by read_only(topics=...).
+
+    Called after the handler succeeds, so those users' next reads, and everyone's
+    next reads of those topics, go to the primary.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            result = await fn(*args, **kwargs)
+            if users is not None:
+                ids = users(kwargs)
+                note_write(*(ids if isinstance(ids, (list, tuple, set)) else [ids]))
+            note_topic_write(*topics)
+            return result
+        return wrapper
+    return decorator
+
+
+async def _measure_lag() -> None:
+    async with pool._pool.acquire() as primary, read_pool._pool.acquire() as replica:
+        in_recovery = await replica.fetchval("SELECT pg_is_in_recovery()")
+        if not in_recovery:
+            # Not a streaming standby (e.g. a second local instance used for
+            # testing): there is no replay position to compare, treat as current.
+            replica_state["lag_s"] = 0.0
+            return
+        # pg_lsn has no asyncpg codec: carry it across as text and cast back
+        primary_lsn = await primary.fetchval("SELECT pg_current_wal_lsn()::text")
+        lag = await replica.fetchval(
+            '''
+            SELECT CASE
+                WHEN pg_wal_lsn_diff(pg_last_wal_replay_lsn(), $1::text::pg_lsn) >= 0 THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+            END
+            ''',
+            primary_lsn,
+        )
+        replica_state["lag_s"] = float(lag)
+
+
+async def _lag_monitor() -> None:
+    while True:
+        try:
+            await _measure_lag()
+            replica_state["healthy"] = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            replica_state["healthy"] = False
+            print(f"[db] read replica check failed, reads go to primary: {e}")
+        replica_state["checked_at"] = time.time()
+        await asyncio.sleep(DB_READ_LAG_CHECK_INTERVAL)
+
+
+def replica_stats() -> dict:
+    return {"configured": read_pool is not None, **replica_state,
+            "pool": read_pool.stats() if read_pool is not None else None}
 
-pool: asyncpg.pool.Pool = None
 
 async def connect_to_db():
-    global pool
-    # Many managed Postgres providers (e.g., Neon Session mode) have strict client limits.
-    # Use a very small pool in dev unless overridden by env.
-    min_size = int(os.getenv("DB_POOL_MIN", "1"))
-    max_size = int(os.getenv("DB_POOL_MAX", "2"))
-    pool = await asyncpg.create_pool(
-        DATABASE_URL,
-        min_size=min_size,
-        max_size=max_size,
-        command_timeout=60,
+    global pool, read_pool, _lag_task
+    options = dict(
+        min_size=min(DB_POOL_MIN, DB_POOL_MAX),
+        max_size=DB_POOL_MAX,
+        command_timeout=DB_COMMAND_TIMEOUT,
         max_inactive_connection_lifetime=300,
     )
+    if DB_PGBOUNCER_MODE:
+        queries.PREPARE_STATEMENTS = False
+        options.update(statement_cache_size=0, max_cached_statement_lifetime=0)
+    else:
+        options.update(init=queries.prepare_hot)
+    raw = await asyncpg.create_pool(DATABASE_URL, **options)
+    pool = InstrumentedPool(raw, DB_ACQUIRE_TIMEOUT)
+    if DATABASE_READ_URL:
+        raw_read = await asyncpg.create_pool(DATABASE_READ_URL, **options)
+        read_pool = InstrumentedPool(raw_read, DB_ACQUIRE_TIMEOUT)
+        pool.replica = read_pool
+        _lag_task = asyncio.create_task(_lag_monitor())
 
 async def disconnect_db():
-    global pool
+    global pool, read_pool, _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        _lag_task = None
+    if read_pool is not None:
+        await read_pool.close()
+        read_pool = None
     if pool is not None:
         await pool.close()
         pool = None
@@ -0,0 +1,93 @@
+"""Benchmark: one INSERT per activity event vs. the batched ActivityLogWriter.
+
+    python -m PlayConnect_API.benchmarks.activity_log_writer --events 5000 --concurrency 50
+
+`concurrency` tasks log `events` events in total, two ways:
+
+  direct  each event is an INSERT on a pooled connection (old log_activity)
+  writer  each event is queued with services/activity_log.writer and COPYed
+          in batches by its background task
+
+Prints the median/p95 time a caller waits per event, the total time until
+every event is in the table, and how many statements reached the database.
+Rows are written with action 'bench' for the first user in Users and
+deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from PlayConnect_API import Database
+from PlayConnect_API.benchmarks.common import create_pool
+from PlayConnect_API.services.activity_log import ActivityLogWriter
+
+ACTION = "bench"
+
+
+def summary(samples) -> str:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    return f"p50 {statistics.median(samples):7.3f} ms  p95 {p95:7.3f} ms"
+
+
+async def drive(events: int, concurrency: int, log_one):
+    waits = []
+
+    async def worker(n):
+        for _ in range(n):
+            start = time.perf_counter()
+            await log_one()
+            waits.append((time.perf_counter() - start) * 1000)
+
+    share, extra = divmod(events, concurrency)
+    await asyncio.gather(*(worker(share + (1 if i < extra else 0)) for i in range(concurrency)))
+    return waits
+
+
+async def run(events: int, concurrency: int, pool_size: int):
+    raw = await create_pool(min_size=pool_size, max_size=pool_size)
+    Database.pool = Database.InstrumentedPool(raw, 30)
+    try:
+        user_id = await raw.fetchval('SELECT user_id FROM public."Users" ORDER BY user_id LIMIT 1')
+        if user_id is None:
+            raise SystemExit("Need at least one row in Users.")
+
+        async def direct():
+            async with Database.pool.acquire() as conn:
+                await conn.execute(
+                    'INSERT INTO public."activity_logs" (user_id, action, created_at) VALUES ($1, $2, NOW())',
+                    user_id, ACTION,
+                )
+
+        start = time.perf_counter()
+        waits = await drive(events, concurrency, direct)
+        total = (time.perf_counter() - start) * 1000
+        print(f"direct  {summary(waits)}  all written {total:8.1f} ms  statements {events}")
+
+        writer = ActivityLogWriter()
+        writer.start()
+        start = time.perf_counter()
+        waits = await drive(events, concurrency, lambda: writer.log(user_id, ACTION))
+        await writer.stop()
+        total = (time.perf_counter() - start) * 1000
+        print(f"writer  {summary(waits)}  all written {total:8.1f} ms  statements {writer.flushes}"
+              f"  (dropped {writer.dropped})")
+    finally:
+        await raw.execute('DELETE FROM public."activity_logs" WHERE action = $1', ACTION)
+        await raw.close()
+        Database.pool = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, max(args.concurrency, 1), args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
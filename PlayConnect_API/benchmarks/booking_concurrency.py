@@ -0,0 +1,101 @@
+"""Concurrency check for the booking engine (services/booking.py).
+
+    python -m PlayConnect_API.benchmarks.booking_concurrency --bookers 200 --capacity 10
+
+Creates one open game with `capacity` spots and `bookers` users, fires every
+booking at once over a pool, and verifies that exactly `capacity` bookings
+succeeded and the participant count never exceeds max_players. All seeded
+rows are removed afterwards. Exits non-zero on overbooking.
+"""
+
+import argparse
+import asyncio
+import collections
+import sys
+import time
+
+from PlayConnect_API.benchmarks.common import create_pool
+from PlayConnect_API.services.booking import book_spot
+
+
+async def seed(conn, bookers: int, capacity: int):
+    sport_id = await conn.fetchval('SELECT sport_id FROM public."Sports" ORDER BY sport_id LIMIT 1')
+    if sport_id is None:
+        sport_id = await conn.fetchval(
+            'INSERT INTO public."Sports" (name, min_players) VALUES ($1, 1) RETURNING sport_id',
+            f"bench-sport-{int(time.time())}",
+        )
+    user_ids = [
+        r["user_id"]
+        for r in await conn.fetch(
+            '''
+            INSERT INTO public."Users" (first_name, last_name, email, password, age, created_at, isverified, role)
+            SELECT 'Booker', i::text, 'booker' || i || '-' || $2 || '@example.com', 'x', 25, NOW(), TRUE, 'player'
+            FROM generate_series(0, $1) AS g(i)
+            RETURNING user_id
+            ''',
+            bookers,
+            str(int(time.time())),
+        )
+    ]
+    host_id, user_ids = user_ids[0], user_ids[1:]
+    game_id = await conn.fetchval(
+        '''
+        INSERT INTO public."Game_instance" (
+            host_id, sport_id, start_time, duration_minutes, location, skill_level, max_players, cost, status
+        )
+        VALUES ($1, $2, NOW() + INTERVAL '1 day', 60, 'Bench court', 'Any', $3, 0, 'Open')
+        RETURNING game_id
+        ''',
+        host_id, sport_id, capacity,
+    )
+    return game_id, host_id, user_ids
+
+
+async def cleanup(conn, game_id: int, host_id: int, user_ids):
+    await conn.execute('DELETE FROM public."Game_participants" WHERE game_id = $1', game_id)
+    await conn.execute('DELETE FROM public."Game_instance" WHERE game_id = $1', game_id)
+    await conn.execute('DELETE FROM public."Users" WHERE user_id = ANY($1::int[])', [host_id, *user_ids])
+
+
+async def run(bookers: int, capacity: int, pool_size: int) -> bool:
+    pool = await create_pool(min_size=pool_size, max_size=pool_size)
+    async with pool.acquire() as conn:
+        game_id, host_id, user_ids = await seed(conn, bookers, capacity)
+    try:
+        async def book(uid):
+            async with pool.acquire() as conn:
+                return (await book_spot(conn, game_id, uid)).outcome
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(book(uid) for uid in user_ids))
+        elapsed = time.perf_counter() - start
+
+        async with pool.acquire() as conn:
+            seated = await conn.fetchval(
+                'SELECT COUNT(*) FROM public."Game_participants" WHERE game_id = $1', game_id
+            )
+        counts = collections.Counter(outcomes)
+        print(f"{bookers} bookers / {capacity} spots in {elapsed * 1000:.1f} ms: {dict(counts)}; seated={seated}")
+        return seated == capacity and counts["booked"] == capacity
+    finally:
+        async with pool.acquire() as conn:
+            await cleanup(conn, game_id, host_id, user_ids)
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookers", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.bookers, args.capacity, args.pool_size))
+    if not ok:
+        print("OVERBOOKED or under-filled")
+        sys.exit(1)
+    print("OK: no overbooking")
+
+
+if __name__ == "__main__":
+    main()
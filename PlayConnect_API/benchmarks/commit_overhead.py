@@ -0,0 +1,102 @@
+"""Benchmark: statement-per-commit vs. one transaction per request.
+
+    python -m PlayConnect_API.benchmarks.commit_overhead --requests 500 --statements 4 --concurrency 8
+
+Simulates write requests shaped like a game join (insert a participant row,
+upsert a stats row, read it back, ...) against scratch tables, first with each
+statement committing on its own (the old handlers) and then inside one
+transaction per request (Database.UnitOfWork). Reports wall time, requests/s,
+commits (pg_stat_database.xact_commit) and WAL bytes written per request. The
+scratch tables are dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import time
+
+from PlayConnect_API.benchmarks.common import create_pool
+
+SETUP = '''
+    DROP TABLE IF EXISTS bench_uow_rows, bench_uow_stats;
+    CREATE TABLE bench_uow_rows (id BIGSERIAL PRIMARY KEY, req INTEGER NOT NULL, step INTEGER NOT NULL);
+    CREATE TABLE bench_uow_stats (req INTEGER PRIMARY KEY, n INTEGER NOT NULL DEFAULT 0);
+'''
+TEARDOWN = 'DROP TABLE IF EXISTS bench_uow_rows, bench_uow_stats'
+
+
+async def one_request(conn, req: int, statements: int):
+    for step in range(statements):
+        if step % 2 == 0:
+            await conn.execute('INSERT INTO bench_uow_rows (req, step) VALUES ($1, $2)', req, step)
+        else:
+            await conn.execute(
+                'INSERT INTO bench_uow_stats (req, n) VALUES ($1, 1) '
+                'ON CONFLICT (req) DO UPDATE SET n = bench_uow_stats.n + 1',
+                req,
+            )
+    await conn.fetchval('SELECT n FROM bench_uow_stats WHERE req = $1', req)
+
+
+async def counters(conn):
+    return await conn.fetchrow(
+        '''
+        SELECT pg_current_wal_lsn() AS lsn,
+               (SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()) AS commits
+        '''
+    )
+
+
+async def run_mode(pool, mode: str, requests: int, statements: int, concurrency: int):
+    async with pool.acquire() as conn:
+        await conn.execute('TRUNCATE bench_uow_rows, bench_uow_stats')
+        before = await counters(conn)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def request(req):
+        async with sem, pool.acquire() as conn:
+            if mode == "autocommit":
+                await one_request(conn, req, statements)
+            else:
+                async with conn.transaction():
+                    await one_request(conn, req, statements)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(r) for r in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    async with pool.acquire() as conn:
+        await asyncio.sleep(0.6)  # pg_stat counters are flushed asynchronously
+        after = await counters(conn)
+        wal = await conn.fetchval('SELECT pg_wal_lsn_diff($1::pg_lsn, $2::pg_lsn)', str(after["lsn"]), str(before["lsn"]))
+    commits = after["commits"] - before["commits"]
+    print(
+        f"{mode:>11}: {requests} requests x {statements + 1} statements in {elapsed:.2f}s "
+        f"({requests / elapsed:.0f} req/s), commits/request={commits / requests:.2f}, "
+        f"WAL bytes/request={float(wal) / requests:.0f}"
+    )
+
+
+async def run(requests: int, statements: int, concurrency: int):
+    pool = await create_pool(min_size=concurrency, max_size=concurrency)
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(SETUP)
+        await run_mode(pool, "autocommit", requests, statements, concurrency)
+        await run_mode(pool, "unit-of-work", requests, statements, concurrency)
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute(TEARDOWN)
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--statements", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.statements, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
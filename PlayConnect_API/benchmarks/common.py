@@ -0,0 +1,57 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway database that already has the PlayConnect
+schema (e.g. restored from `pg_dump --schema-only`) plus the SQL files under
+migrations/. Point BENCH_DATABASE_URL at it; DATABASE_URL is used as a fallback.
+Never point these at production: they insert synthetic rows.
+"""
+
+import json
+import os
+import statistics
+import time
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+
+
+async def connect() -> asyncpg.Connection:
+    if not BENCH_DATABASE_URL:
+        raise SystemExit("Set BENCH_DATABASE_URL to a local Postgres with the PlayConnect schema.")
+    return await asyncpg.connect(BENCH_DATABASE_URL)
+
+
+async def create_pool(**kwargs) -> asyncpg.Pool:
+    if not BENCH_DATABASE_URL:
+        raise SystemExit("Set BENCH_DATABASE_URL to a local Postgres with the PlayConnect schema.")
+    return await asyncpg.create_pool(BENCH_DATABASE_URL, **kwargs)
+
+
+async def time_query(conn, sql: str, *args, repeat: int = 7) -> float:
+    """Median wall time of `sql` in milliseconds (first run discarded as warm-up)."""
+    await conn.fetch(sql, *args)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await conn.fetch(sql, *args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def explain(conn, sql: str, *args) -> dict:
+    """Return the top plan node of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)."""
+    raw = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", *args)
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    return plan[0]
+
+
+def plan_nodes(plan: dict):
+    """Yield every node of an EXPLAIN JSON plan tree."""
+    stack = [plan["Plan"] if "Plan" in plan else plan]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get("Plans", []))
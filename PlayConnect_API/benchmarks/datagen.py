@@ -0,0 +1,303 @@
+"""Deterministic synthetic data set for load tests, bulk-loaded with COPY.
+
+    python -m PlayConnect_API.benchmarks.datagen --users 10000 --seed 1 --manifest datagen.json
+
+Generates, from one seed, N users with a power-law friend graph
+(preferential attachment, so a few hubs and a long tail), upcoming games
+with their participants, archived games in Match_games/Match_participants,
+notifications and recurring schedules, and COPYs everything into the
+database in one transaction. The same --users/--seed/--anchor always produce
+the same rows; only the bcrypt salt of the shared password differs.
+
+Times are relative to --anchor (default: today 00:00 UTC), so upcoming games
+stay upcoming on the day the data is loaded. The target needs the full schema
+(python -m PlayConnect_API.migrate) and at least one row in Sports. Load into
+a throwaway database: rows are added, never removed. Emails are
+<tag>-<n>@example.com, so a second load into the same database needs another
+--tag.
+
+The manifest written with --manifest (user ids and emails, the shared
+password, upcoming game ids, sport ids) is what benchmarks/loadtest.py reads.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from PlayConnect_API.benchmarks.common import connect
+from PlayConnect_API.security_utils import hash_password
+
+FIRST_NAMES = ["alice", "bob", "carla", "dani", "elie", "farah", "georges", "hala", "issa", "jana",
+               "karim", "lara", "maya", "nadim", "omar", "rana", "sami", "tala", "walid", "yara"]
+LAST_NAMES = ["haddad", "khoury", "saad", "nassar", "karam", "aoun", "salem", "fares", "chahine", "mansour"]
+TIMEZONES = ["UTC", "Asia/Beirut", "Europe/Paris", "America/New_York", "Asia/Dubai"]
+LOCATIONS = ["Court", "Field", "Arena", "Club", "Park"]
+SKILL_LEVELS = ["Beginner", "Intermediate", "Advanced", "Any"]
+NOTIFICATION_TYPES = ["game_update", "reminder", "waitlist", "game_full", "system"]
+RRULES = ["FREQ=WEEKLY;BYDAY=MO", "FREQ=WEEKLY;BYDAY=WE", "FREQ=WEEKLY;BYDAY=SA", "FREQ=DAILY;INTERVAL=2"]
+
+USER_COLUMNS = ["user_id", "first_name", "last_name", "email", "password", "age", "created_at",
+                "isverified", "role", "favorite_sport", "timezone"]
+FRIEND_COLUMNS = ["user_id", "friend_id", "status", "created_at"]
+GAME_COLUMNS = ["game_id", "host_id", "sport_id", "start_time", "duration_minutes", "location",
+                "skill_level", "max_players", "cost", "status", "created_at"]
+PARTICIPANT_COLUMNS = ["game_id", "user_id", "role", "joined_at"]
+MATCH_GAME_COLUMNS = ["match_game_id", "game_id", "host_id", "sport_id", "played_at",
+                      "duration_minutes", "location", "cost"]
+MATCH_PARTICIPANT_COLUMNS = ["match_game_id", "user_id", "score", "result", "played_at", "sport_id"]
+NOTIFICATION_COLUMNS = ["user_id", "message", "type", "is_read", "created_at"]
+SCHEDULE_COLUMNS = ["host_id", "sport_id", "rrule", "dtstart", "next_run", "timezone", "duration_minutes",
+                    "max_players", "location", "skill_level", "cost", "status", "occurrences_left",
+                    "active", "created_at", "updated_at"]
+
+
+def power_law_edges(rng: random.Random, n: int, m: int):
+    """Barabasi-Albert graph over 0..n-1: each node links to m earlier nodes
+    picked proportionally to their degree. Returns (newer, older) pairs."""
+    edges = []
+    endpoints = []  # every node once per incident edge: degree-weighted sampling
+    seed_nodes = min(m + 1, n)
+    for a in range(seed_nodes):
+        for b in range(a):
+            edges.append((a, b))
+            endpoints += [a, b]
+    for node in range(seed_nodes, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(endpoints[rng.randrange(len(endpoints))])
+        for t in sorted(targets):
+            edges.append((node, t))
+            endpoints += [node, t]
+    return edges
+
+
+def generate(rng: random.Random, *, users: int, sport_ids, anchor: datetime, tag: str, password_hash: str,
+             friends_per_user: int, games_per_user: float, upcoming_share: float,
+             notifications_per_user: float, schedules_per_user: float):
+    """Plain row tuples per table, with ids as 0-based indexes to be mapped to reserved keys."""
+    data = {}
+
+    data["users"] = [
+        (
+            FIRST_NAMES[i % len(FIRST_NAMES)].title(),
+            LAST_NAMES[rng.randrange(len(LAST_NAMES))].title(),
+            f"{tag}-{i}@example.com",
+            password_hash,
+            rng.randint(16, 55),
+            anchor - timedelta(days=rng.randint(1, 720)),
+            True,
+            "player",
+            None,
+            TIMEZONES[rng.randrange(len(TIMEZONES))],
+        )
+        for i in range(users)
+    ]
+
+    edges = power_law_edges(rng, users, friends_per_user)
+    friends_of = [[] for _ in range(users)]
+    data["friends"] = []
+    for a, b in edges:
+        status = "pending" if rng.random() < 0.1 else "accepted"
+        data["friends"].append((a, b, status, anchor - timedelta(minutes=rng.randint(1, 525_600))))
+        if status == "accepted":
+            friends_of[a].append(b)
+            friends_of[b].append(a)
+
+    def pick_players(host: int, count: int):
+        players = {host}
+        pool = friends_of[host]
+        count = min(count, users)
+        while len(players) < count:
+            # mostly the host's friends, as on the real feed
+            if pool and rng.random() < 0.7:
+                players.add(pool[rng.randrange(len(pool))])
+            else:
+                players.add(rng.randrange(users))
+        return sorted(players - {host})
+
+    total_games = max(1, int(users * games_per_user))
+    data["games"], data["participants"] = [], []
+    data["match_games"], data["match_participants"] = [], []
+    for _ in range(total_games):
+        host = rng.randrange(users)
+        sport_id = sport_ids[rng.randrange(len(sport_ids))]
+        duration = rng.choice([60, 90, 120])
+        location = f"{LOCATIONS[rng.randrange(len(LOCATIONS))]} {rng.randint(1, 200)}"
+        cost = Decimal(rng.choice([0, 0, 5, 10, 15]))
+        max_players = rng.choice([4, 6, 10, 12, 22])
+        if rng.random() < upcoming_share:
+            start = anchor + timedelta(days=1 + rng.randrange(30), hours=rng.randrange(8, 22))
+            filled = rng.randint(1, max_players)
+            players = pick_players(host, filled)
+            status = "Full" if filled >= max_players else "Open"
+            data["games"].append((host, sport_id, start, duration, location, rng.choice(SKILL_LEVELS),
+                                  max_players, cost, status, start - timedelta(days=rng.randint(1, 14))))
+            index = len(data["games"]) - 1
+            data["participants"].append((index, host, "HOST", start - timedelta(days=14)))
+            for p in players:
+                data["participants"].append((index, p, "PLAYER", start - timedelta(days=rng.randint(1, 13))))
+        else:
+            played_at = anchor - timedelta(days=rng.randrange(365), hours=rng.randrange(8, 22))
+            players = [host] + pick_players(host, rng.randint(2, max_players))
+            data["match_games"].append((host, sport_id, played_at, duration, location, cost))
+            index = len(data["match_games"]) - 1
+            winners = set(players[: len(players) // 2]) if rng.random() < 0.85 else None
+            for p in players:
+                result = "draw" if winners is None else ("win" if p in winners else "loss")
+                data["match_participants"].append((index, p, rng.randint(0, 21), result, played_at, sport_id))
+
+    data["notifications"] = []
+    for u in range(users):
+        # heavy tail: most users have a few, some have hundreds
+        count = min(int(rng.paretovariate(1.5) * notifications_per_user / 3), 500)
+        for _ in range(count):
+            kind = NOTIFICATION_TYPES[rng.randrange(len(NOTIFICATION_TYPES))]
+            data["notifications"].append((u, f"{kind.replace('_', ' ')} #{rng.randrange(10_000)}", kind,
+                                          rng.random() < 0.7, anchor - timedelta(minutes=rng.randint(1, 43_200))))
+
+    data["schedules"] = []
+    for _ in range(int(users * schedules_per_user)):
+        host = rng.randrange(users)
+        dtstart = anchor + timedelta(days=rng.randrange(7), hours=rng.randrange(8, 22))
+        data["schedules"].append((host, sport_ids[rng.randrange(len(sport_ids))], rng.choice(RRULES),
+                                  dtstart, dtstart, "UTC", rng.choice([60, 90]), rng.choice([6, 10, 12]),
+                                  f"{LOCATIONS[rng.randrange(len(LOCATIONS))]} {rng.randint(1, 200)}",
+                                  rng.choice(SKILL_LEVELS), Decimal(rng.choice([0, 5, 10])), "open",
+                                  rng.choice([None, 10, 20]), True, anchor, anchor))
+    return data
+
+
+async def reserve_ids(conn, table: str, column: str, count: int):
+    """Take `count` values from the table's serial sequence, in order."""
+    if count == 0:
+        return []
+    rows = await conn.fetch(
+        "SELECT nextval(pg_get_serial_sequence($1, $2)) AS id FROM generate_series(1, $3)",
+        f'public."{table}"', column, count,
+    )
+    return [r["id"] for r in rows]
+
+
+async def copy(conn, table: str, columns, records) -> int:
+    if records:
+        await conn.copy_records_to_table(table, schema_name="public", columns=columns, records=records)
+    return len(records)
+
+
+async def load(conn, data):
+    """COPY the generated rows in one transaction. Returns (counts, user ids, upcoming game ids)."""
+    counts = {}
+    async with conn.transaction():
+        user_ids = await reserve_ids(conn, "Users", "user_id", len(data["users"]))
+        counts["Users"] = await copy(conn, "Users", USER_COLUMNS,
+                                     [(uid, *row) for uid, row in zip(user_ids, data["users"])])
+        counts["Friends"] = await copy(conn, "Friends", FRIEND_COLUMNS,
+                                       [(user_ids[a], user_ids[b], s, at) for a, b, s, at in data["friends"]])
+
+        game_ids = await reserve_ids(conn, "Game_instance", "game_id", len(data["games"]))
+        counts["Game_instance"] = await copy(conn, "Game_instance", GAME_COLUMNS, [
+            (gid, user_ids[row[0]], *row[1:]) for gid, row in zip(game_ids, data["games"])
+        ])
+        counts["Game_participants"] = await copy(conn, "Game_participants", PARTICIPANT_COLUMNS, [
+            (game_ids[g], user_ids[u], role, at) for g, u, role, at in data["participants"]
+        ])
+
+        match_ids = await reserve_ids(conn, "Match_games", "match_game_id", len(data["match_games"]))
+        counts["Match_games"] = await copy(conn, "Match_games", MATCH_GAME_COLUMNS, [
+            (mid, None, user_ids[row[0]], *row[1:]) for mid, row in zip(match_ids, data["match_games"])
+        ])
+        counts["Match_participants"] = await copy(conn, "Match_participants", MATCH_PARTICIPANT_COLUMNS, [
+            (match_ids[m], user_ids[u], *rest) for m, u, *rest in data["match_participants"]
+        ])
+        # keep User_match_stats / Head_to_head in step, as the archiver does
+        await conn.execute(
+            "SELECT public.match_stats_apply(id, 1) FROM unnest($1::bigint[]) AS t(id)", match_ids
+        )
+
+        counts["Notifications"] = await copy(conn, "Notifications", NOTIFICATION_COLUMNS,
+                                             [(user_ids[u], *rest) for u, *rest in data["notifications"]])
+        counts["Recurring_Schedules"] = await copy(conn, "Recurring_Schedules", SCHEDULE_COLUMNS,
+                                                   [(user_ids[h], *rest) for h, *rest in data["schedules"]])
+
+    for table in counts:
+        await conn.execute(f'ANALYZE public."{table}"')
+    return counts, user_ids, game_ids
+
+
+async def run(args):
+    anchor = (datetime.fromisoformat(args.anchor) if args.anchor
+              else datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0))
+    if anchor.tzinfo is None:
+        anchor = anchor.replace(tzinfo=timezone.utc)
+
+    conn = await connect()
+    try:
+        sport_ids = [r["sport_id"] for r in await conn.fetch('SELECT sport_id FROM public."Sports" ORDER BY sport_id')]
+        if not sport_ids:
+            raise SystemExit("Need at least one row in Sports.")
+
+        started = time.perf_counter()
+        data = generate(
+            random.Random(args.seed),
+            users=args.users,
+            sport_ids=sport_ids,
+            anchor=anchor,
+            tag=args.tag,
+            password_hash=hash_password(args.password),
+            friends_per_user=args.friends_per_user,
+            games_per_user=args.games_per_user,
+            upcoming_share=args.upcoming_share,
+            notifications_per_user=args.notifications_per_user,
+            schedules_per_user=args.schedules_per_user,
+        )
+        generated = time.perf_counter()
+        counts, user_ids, game_ids = await load(conn, data)
+        loaded = time.perf_counter()
+    finally:
+        await conn.close()
+
+    for table, n in counts.items():
+        print(f"{table:<22} {n:>10} rows")
+    print(f"generated in {generated - started:.1f}s, loaded in {loaded - generated:.1f}s")
+
+    if args.manifest:
+        manifest = {
+            "seed": args.seed,
+            "anchor": anchor.isoformat(),
+            "tag": args.tag,
+            "password": args.password,
+            "users": [{"user_id": uid, "email": row[2]} for uid, row in zip(user_ids, data["users"])],
+            "upcoming_game_ids": game_ids,
+            "sport_ids": sport_ids,
+            "counts": counts,
+        }
+        with open(args.manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        print(f"manifest written to {args.manifest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--anchor", help="ISO datetime the generated times are relative to (default: today 00:00 UTC)")
+    parser.add_argument("--tag", default="dg", help="email prefix, change it to load a second data set")
+    parser.add_argument("--password", default="LoadTest-123", help="password shared by every generated user")
+    parser.add_argument("--friends-per-user", type=int, default=3, help="edges added per user (graph parameter m)")
+    parser.add_argument("--games-per-user", type=float, default=0.5)
+    parser.add_argument("--upcoming-share", type=float, default=0.3, help="fraction of games not played yet")
+    parser.add_argument("--notifications-per-user", type=float, default=10)
+    parser.add_argument("--schedules-per-user", type=float, default=0.02)
+    parser.add_argument("--manifest", help="write user/game ids for loadtest.py to this file")
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Check that the hot handler queries use the indexes of migrations/0012_add_query_pattern_indexes.sql.
+
+    python -m PlayConnect_API.benchmarks.explain_indexes --users 20000
+
+Seeds users, games, participants, notifications, friendships and activity
+logs into the real tables inside a transaction, ANALYZEs them, then runs
+EXPLAIN (ANALYZE, BUFFERS) on each query and checks that the expected index
+appears in the plan (for the partitioned activity_logs, any partition's copy
+of it). Prints one line per query with the index used, execution time and
+shared buffers hit/read. Everything is rolled back; exits non-zero if a
+plan misses its index.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from PlayConnect_API import queries
+from PlayConnect_API.benchmarks.common import connect, explain, plan_nodes
+
+SEED = '''
+    CREATE TEMP TABLE bench_users ON COMMIT DROP AS
+    WITH inserted AS (
+        INSERT INTO public."Users" (first_name, last_name, email, password, age, created_at, isverified, role)
+        SELECT 'Idx', i::text, 'idx' || i || '-' || md5(random()::text) || '@example.com', 'x', 25, NOW(), TRUE, 'player'
+        FROM generate_series(1, {users}) AS g(i)
+        RETURNING user_id
+    )
+    SELECT user_id, ROW_NUMBER() OVER (ORDER BY user_id) AS n FROM inserted;
+
+    CREATE TEMP TABLE bench_games ON COMMIT DROP AS
+    WITH inserted AS (
+        INSERT INTO public."Game_instance"
+            (host_id, sport_id, start_time, duration_minutes, location, skill_level, max_players, cost, status)
+        SELECT u.user_id, {sport_id}, NOW() + (g.i % 720) * INTERVAL '1 hour', 60,
+               'Court ' || g.i % 50, 'Any', 10, 0, 'Open'
+        FROM generate_series(1, {games}) AS g(i)
+        JOIN bench_users u ON u.n = 1 + (g.i * 7919) % {users}
+        RETURNING game_id
+    )
+    SELECT game_id, ROW_NUMBER() OVER (ORDER BY game_id) AS n FROM inserted;
+
+    INSERT INTO public."Game_participants" (game_id, user_id, role, joined_at)
+    SELECT g.game_id, u.user_id, 'PLAYER', NOW()
+    FROM bench_games g
+    CROSS JOIN generate_series(0, 7) AS k(i)
+    JOIN bench_users u ON u.n = 1 + (g.n * 13 + k.i * 101) % {users}
+    ON CONFLICT (game_id, user_id) DO NOTHING;
+
+    INSERT INTO public."Notifications" (user_id, message, type, is_read, created_at)
+    SELECT u.user_id, 'bench', 'system', (k.i % 5) <> 0, NOW()
+    FROM bench_users u CROSS JOIN generate_series(1, {per_user}) AS k(i);
+
+    INSERT INTO public."Friends" (user_id, friend_id, status, created_at)
+    SELECT a.user_id, b.user_id, CASE WHEN k.i % 3 = 0 THEN 'pending' ELSE 'accepted' END, NOW()
+    FROM bench_users a
+    CROSS JOIN generate_series(1, 5) AS k(i)
+    JOIN bench_users b ON b.n = 1 + (a.n + k.i * 37) % {users}
+    WHERE b.user_id <> a.user_id
+    ON CONFLICT DO NOTHING;
+
+    INSERT INTO public."activity_logs" (user_id, action, created_at)
+    SELECT u.user_id, CASE WHEN k.i % 4 = 0 THEN 'login' ELSE 'view' END,
+           NOW() - (k.i * 61) * INTERVAL '1 second'
+    FROM bench_users u CROSS JOIN generate_series(1, {per_user}) AS k(i);
+
+    ANALYZE public."Users";
+    ANALYZE public."Game_instance";
+    ANALYZE public."Game_participants";
+    ANALYZE public."Notifications";
+    ANALYZE public."Friends";
+    ANALYZE public."activity_logs";
+'''
+
+# (label, sql, expected index); $1 is a seeded user_id
+CHECKS = [
+    (
+        "participants by user",
+        'SELECT game_id FROM public."Game_participants" WHERE user_id = $1',
+        "idx_game_participants_user",
+    ),
+    (
+        "notifications feed",
+        '''SELECT notification_id, user_id, message, type, metadata, is_read, created_at
+           FROM public."Notifications" WHERE user_id = $1 ORDER BY notification_id DESC LIMIT 21''',
+        "idx_notifications_user_id_desc",
+    ),
+    (
+        "notifications unread count",
+        queries.sql(queries.NOTIFICATIONS_UNREAD_COUNT),
+        "idx_notifications_user_unread",
+    ),
+    (
+        "friend requests received",
+        queries.sql(queries.FRIENDS_PENDING_RECEIVED),
+        "idx_friends_friend_status",
+    ),
+    (
+        "friend requests sent",
+        queries.sql(queries.FRIENDS_PENDING_SENT),
+        "idx_friends_user_status",
+    ),
+    (
+        "recent logins of a user",
+        '''SELECT id, created_at FROM public."activity_logs"
+           WHERE user_id = $1 AND action = 'login' ORDER BY created_at DESC LIMIT 20''',
+        "idx_activity_logs_user_action_created",
+    ),
+    (
+        "games hosted by a user",
+        '''SELECT game_id, start_time FROM public."Game_instance"
+           WHERE host_id = $1 ORDER BY start_time LIMIT 20''',
+        "idx_game_instance_host_start",
+    ),
+]
+
+
+async def index_names(conn, index: str) -> set:
+    """The index and, for a partitioned index, its per-partition copies."""
+    rows = await conn.fetch(
+        '''
+        SELECT c.relname
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('public.' || quote_ident($1))
+        ''',
+        index,
+    )
+    return {index, *(r["relname"] for r in rows)}
+
+
+async def run(users: int, games: int, per_user: int) -> bool:
+    conn = await connect()
+    tx = conn.transaction()
+    await tx.start()
+    ok = True
+    try:
+        sport_id = await conn.fetchval('SELECT sport_id FROM public."Sports" ORDER BY sport_id LIMIT 1')
+        if sport_id is None:
+            raise SystemExit("Need at least one row in Sports.")
+        await conn.execute(SEED.format(users=users, games=games, per_user=per_user, sport_id=sport_id))
+        probe = await conn.fetchval("SELECT user_id FROM bench_users WHERE n = $1", max(users // 2, 1))
+
+        for label, sql, index in CHECKS:
+            expected = await index_names(conn, index)
+            plan = await explain(conn, sql, probe)
+            used = {n["Index Name"] for n in plan_nodes(plan) if "Index Name" in n}
+            hit = bool(used & expected)
+            ok &= hit
+            top = plan["Plan"]
+            print(f"{'ok  ' if hit else 'MISS'} {label:<28} {plan['Execution Time']:8.3f} ms"
+                  f"  hit={top.get('Shared Hit Blocks', 0)} read={top.get('Shared Read Blocks', 0)}"
+                  f"  index={', '.join(sorted(used)) or '-'}")
+    finally:
+        await tx.rollback()
+        await conn.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--games", type=int, default=5_000)
+    parser.add_argument("--per-user", type=int, default=10, help="notifications and activity log rows per user")
+    args = parser.parse_args()
+    ok = asyncio.run(run(max(args.users, 10), args.games, args.per_user))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
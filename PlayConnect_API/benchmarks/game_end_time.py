@@ -0,0 +1,127 @@
+"""Benchmark: computed end-of-game predicate vs. the stored, indexed end_time.
+
+    python -m PlayConnect_API.benchmarks.game_end_time --games 200000 --upcoming 0.05
+
+Needs migrations/0013_add_game_end_time.sql. Seeds games across a few sports
+and statuses, most of them already over (the shape of a table the archiver
+can't keep empty: games with fewer than two players are never archived),
+inside a transaction that is rolled back afterwards. For the upcoming list,
+the dashboard filter and the archiver's past-games scan it prints the median
+latency and the scan nodes of the old and the new predicate.
+"""
+
+import argparse
+import asyncio
+import json
+
+from PlayConnect_API.benchmarks.common import connect, explain, plan_nodes, time_query
+
+SEED_HOSTS = '''
+    CREATE TEMP TABLE bench_hosts ON COMMIT DROP AS
+    WITH inserted AS (
+        INSERT INTO public."Users" (first_name, last_name, email, password, age, created_at, isverified, role)
+        SELECT 'End', i::text, 'end' || i || '-' || md5(random()::text) || '@example.com', 'x', 30, NOW(), TRUE, 'player'
+        FROM generate_series(1, 200) AS g(i)
+        RETURNING user_id
+    )
+    SELECT user_id, ROW_NUMBER() OVER (ORDER BY user_id) AS n FROM inserted
+'''
+
+# A fraction `upcoming` of the games start within the next 30 days, the rest
+# ended some time in the past year.
+SEED_GAMES = '''
+    INSERT INTO public."Game_instance"
+        (host_id, sport_id, start_time, duration_minutes, location, skill_level, max_players, cost, status)
+    SELECT h.user_id,
+           (SELECT array_agg(sport_id ORDER BY sport_id) FROM public."Sports")[1 + g.i % $3],
+           CASE WHEN (g.i % 1000) < $2::float8 * 1000
+                THEN NOW() + (g.i % 720) * INTERVAL '1 hour'
+                ELSE NOW() - (1 + g.i % 8760) * INTERVAL '1 hour'
+           END,
+           30 + 30 * (g.i % 4),
+           'Court ' || g.i % 50, 'Any', 10, 0,
+           (ARRAY['Open', 'Full', 'Cancelled'])[1 + g.i % 3]
+    FROM generate_series(1, $1) AS g(i)
+    JOIN bench_hosts h ON h.n = 1 + g.i % 200
+'''
+
+OLD_END = "(start_time + INTERVAL '1 minute' * duration_minutes)"
+
+# (label, sql with {end} for the end-of-game expression, takes sport_id as $1)
+CASES = [
+    (
+        "upcoming list",
+        '''SELECT game_id FROM public."Game_instance"
+           WHERE {end} >= NOW()
+           ORDER BY created_at DESC, game_id DESC LIMIT 21''',
+        False,
+    ),
+    (
+        "dashboard sport+status",
+        '''SELECT game_id, start_time FROM public."Game_instance"
+           WHERE {end} >= NOW() AND sport_id = $1 AND status = 'Open'
+           ORDER BY start_time LIMIT 10''',
+        True,
+    ),
+    (
+        "archiver past scan",
+        '''SELECT game_id FROM public."Game_instance"
+           WHERE {end} < NOW() - INTERVAL '330 days'
+        ''',
+        False,
+    ),
+]
+
+
+def scans(plan: dict):
+    out = []
+    for node in plan_nodes(plan):
+        if "Scan" in node["Node Type"]:
+            out.append(node["Node Type"] + (f" {node['Index Name']}" if "Index Name" in node else ""))
+    return sorted(set(out))
+
+
+async def run(games: int, upcoming: float):
+    conn = await connect()
+    tx = conn.transaction()
+    await tx.start()
+    results = []
+    try:
+        sports = await conn.fetchval('SELECT COUNT(*) FROM public."Sports"')
+        if not sports:
+            raise SystemExit("Need at least one row in Sports.")
+        await conn.execute(SEED_HOSTS)
+        await conn.execute(SEED_GAMES, games, upcoming, min(sports, 4))
+        await conn.execute('ANALYZE public."Game_instance"')
+        sport_id = await conn.fetchval('SELECT sport_id FROM public."Sports" ORDER BY sport_id LIMIT 1')
+
+        for label, sql, with_sport in CASES:
+            params = [sport_id] if with_sport else []
+            row = {"case": label}
+            for variant, end in (("computed", OLD_END), ("end_time", "end_time")):
+                query = sql.format(end=end)
+                ms = await time_query(conn, query, *params)
+                plan = await explain(conn, query, *params)
+                row[variant] = {"ms": round(ms, 3), "scans": scans(plan)}
+                print(f"{label:<24} {variant:<9} {ms:9.3f} ms  {', '.join(row[variant]['scans'])}")
+            results.append(row)
+    finally:
+        await tx.rollback()
+        await conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=200_000)
+    parser.add_argument("--upcoming", type=float, default=0.05, help="fraction of games not over yet")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    results = asyncio.run(run(args.games, args.upcoming))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""HTTP load harness for a running API, reporting latency percentiles per endpoint.
+
+    python -m PlayConnect_API.benchmarks.loadtest --base-url http://localhost:8000 \\
+        --manifest datagen.json --concurrency 50 --duration 30 --out run.json
+    python -m PlayConnect_API.benchmarks.loadtest ... --baseline before.json
+
+Needs a data set loaded by benchmarks/datagen.py (its --manifest file gives
+the users, their password and the upcoming games). Scenarios, run one after
+the other, each with --concurrency asyncio workers for --duration seconds:
+
+    login         POST /login with distinct users, all workers at once
+    dashboard     GET /dashboard/games with random sport/status filters and pages
+    joins         POST /game-participants/join on upcoming games
+    notifications GET /notifications/unread_count, every 4th poll also the feed
+
+Prints and writes (--out) JSON with, per scenario and endpoint, the request
+count, errors (5xx and transport failures), status codes, throughput and
+p50/p95/p99/max latency. With --baseline, also prints the p95 and throughput
+change against an earlier run. Expected refusals (a full game, a duplicate
+join) are counted by status but are not errors.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import random
+import sys
+import time
+
+import httpx
+
+SCENARIOS = ("login", "dashboard", "joins", "notifications")
+
+
+def percentile(ordered, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.statuses = collections.defaultdict(collections.Counter)
+        self.errors = collections.Counter()
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.latencies[label].append((time.perf_counter() - start) * 1000)
+            self.statuses[label][type(e).__name__] += 1
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+        self.statuses[label][str(response.status_code)] += 1
+        if response.status_code >= 500:
+            self.errors[label] += 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        out = {}
+        for label, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            out[label] = {
+                "count": len(ordered),
+                "errors": self.errors[label],
+                "status": dict(self.statuses[label]),
+                "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+        return out
+
+
+class Context:
+    """What the scenarios draw from: the manifest plus a shared login cursor."""
+
+    def __init__(self, manifest: dict):
+        self.users = manifest["users"]
+        self.password = manifest["password"]
+        self.game_ids = manifest["upcoming_game_ids"]
+        self.sport_ids = manifest["sport_ids"]
+        self._next_login = 0
+
+    def next_login_user(self) -> dict:
+        # distinct users, so the per-email failed-login throttle never kicks in
+        user = self.users[self._next_login % len(self.users)]
+        self._next_login += 1
+        return user
+
+
+async def login(client, rng, ctx: Context, rec: Recorder):
+    user = ctx.next_login_user()
+    await rec.call(client, "POST /login", "POST", "/login",
+                   json={"email": user["email"], "password": ctx.password})
+
+
+async def dashboard(client, rng, ctx: Context, rec: Recorder):
+    params = {"page": rng.choice([1, 1, 1, 2, 3]), "page_size": 10}
+    if rng.random() < 0.6:
+        params["sport_id"] = rng.choice(ctx.sport_ids)
+    if rng.random() < 0.5:
+        params["status"] = "Open"
+    if rng.random() < 0.2:
+        params["spots"] = "available"
+    await rec.call(client, "GET /dashboard/games", "GET", "/dashboard/games", params=params)
+
+
+async def joins(client, rng, ctx: Context, rec: Recorder):
+    if not ctx.game_ids:
+        raise SystemExit("The manifest has no upcoming games to join.")
+    user = ctx.users[rng.randrange(len(ctx.users))]
+    await rec.call(client, "POST /game-participants/join", "POST", "/game-participants/join",
+                   json={"game_id": rng.choice(ctx.game_ids), "user_id": user["user_id"]})
+
+
+async def notifications(client, rng, ctx: Context, rec: Recorder):
+    user_id = ctx.users[rng.randrange(len(ctx.users))]["user_id"]
+    await rec.call(client, "GET /notifications/unread_count", "GET", "/notifications/unread_count",
+                   params={"user_id": user_id})
+    if rng.random() < 0.25:
+        await rec.call(client, "GET /notifications", "GET", "/notifications",
+                       params={"user_id": user_id, "limit": 20})
+
+
+STEPS = {
+    "login": login,
+    "dashboard": dashboard,
+    "joins": joins,
+    "notifications": notifications,
+}
+
+
+async def run_scenario(name: str, client, ctx: Context, *, concurrency: int, duration: float, seed: int) -> dict:
+    rec = Recorder()
+    step = STEPS[name]
+    gate = asyncio.Event()  # released once every worker exists: the first requests arrive as a burst
+    deadline = None
+
+    async def worker(index: int):
+        rng = random.Random(seed * 1_000 + index)
+        await gate.wait()
+        while time.perf_counter() < deadline:
+            await step(client, rng, ctx, rec)
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+    started = time.perf_counter()
+    deadline = started + duration
+    gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": round(elapsed, 2), "endpoints": rec.summary(elapsed)}
+
+
+async def run(args) -> dict:
+    with open(args.manifest, encoding="utf-8") as f:
+        ctx = Context(json.load(f))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    report = {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "scenarios": {},
+    }
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for name in args.scenarios:
+            print(f"[loadtest] {name}: {args.concurrency} workers for {args.duration:g}s", file=sys.stderr)
+            report["scenarios"][name] = await run_scenario(
+                name, client, ctx, concurrency=args.concurrency, duration=args.duration, seed=args.seed
+            )
+    return report
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Print p95 / throughput change per endpoint against an earlier report."""
+    for name, scenario in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {}).get("endpoints", {})
+        for label, now in scenario["endpoints"].items():
+            old = before.get(label)
+            if not old:
+                continue
+            p95 = (now["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            rps = (now["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            print(f"{name:<14} {label:<34} p95 {old['p95_ms']:>9.2f} -> {now['p95_ms']:>9.2f} ms ({p95:+6.1f}%)"
+                  f"  rps {old['rps']:>8.2f} -> {now['rps']:>8.2f} ({rps:+6.1f}%)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", required=True, help="file written by datagen.py --manifest")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: pairwise Match_Histories vs. Match_games + Match_participants.
+
+    python -m PlayConnect_API.benchmarks.match_history --games 2000 --players 20
+
+Builds both layouts for the same synthetic history (`games` games of `players`
+players each, drawn from a pool of users) as temp tables inside a transaction
+that is rolled back. Prints rows and on-disk size of each layout and the median
+time of one user's history page, the old DISTINCT ON query against the new
+game-level one.
+"""
+
+import argparse
+import asyncio
+
+from PlayConnect_API.benchmarks.common import connect, time_query
+
+SETUP = '''
+    CREATE TEMP TABLE pair_hist (
+        match_id BIGSERIAL PRIMARY KEY, player_id INT NOT NULL, opponent_id INT NOT NULL,
+        score_player INT NOT NULL DEFAULT 0, score_opponent INT NOT NULL DEFAULT 0,
+        result TEXT NOT NULL DEFAULT 'draw', duration_minute INT NOT NULL,
+        location TEXT, cost NUMERIC, played_at TIMESTAMPTZ NOT NULL
+    );
+    CREATE TEMP TABLE m_games (
+        match_game_id BIGSERIAL PRIMARY KEY, played_at TIMESTAMPTZ NOT NULL,
+        duration_minutes INT NOT NULL, location TEXT, cost NUMERIC
+    );
+    CREATE TEMP TABLE m_parts (
+        match_game_id BIGINT NOT NULL, user_id INT NOT NULL,
+        score INT NOT NULL DEFAULT 0, result TEXT NOT NULL DEFAULT 'draw',
+        PRIMARY KEY (match_game_id, user_id)
+    );
+'''
+
+# game g has players (g * 7 + k) % users for k < players: distinct as long as users >= players
+SEED = '''
+    INSERT INTO m_games (match_game_id, played_at, duration_minutes, location, cost)
+    SELECT g, NOW() - g * INTERVAL '1 hour', 60, 'Court ' || g % 40, (g % 25)::numeric
+    FROM generate_series(1, $1) AS g;
+
+    INSERT INTO m_parts (match_game_id, user_id)
+    SELECT g, (g * 7 + k) % $3
+    FROM generate_series(1, $1) AS g, generate_series(0, $2 - 1) AS k;
+
+    INSERT INTO pair_hist (player_id, opponent_id, duration_minute, location, cost, played_at)
+    SELECT a.user_id, b.user_id, g.duration_minutes, g.location, g.cost, g.played_at
+    FROM m_games g
+    JOIN m_parts a ON a.match_game_id = g.match_game_id
+    JOIN m_parts b ON b.match_game_id = g.match_game_id AND b.user_id > a.user_id;
+
+    CREATE INDEX ON pair_hist (player_id);
+    CREATE INDEX ON pair_hist (opponent_id);
+    CREATE INDEX ON m_parts (user_id, match_game_id);
+    ANALYZE pair_hist; ANALYZE m_games; ANALYZE m_parts;
+'''
+
+OLD_QUERY = '''
+    SELECT * FROM (
+        SELECT DISTINCT ON (played_at, location, COALESCE(cost, 0), duration_minute)
+               match_id, player_id, opponent_id, score_player, score_opponent,
+               result, duration_minute, location, cost, played_at
+        FROM pair_hist
+        WHERE (player_id = $1 OR opponent_id = $1)
+        ORDER BY played_at DESC, location, COALESCE(cost, 0), duration_minute, match_id
+    ) d
+    ORDER BY played_at DESC
+    LIMIT 50
+'''
+
+NEW_QUERY = '''
+    SELECT mg.match_game_id, me.user_id, opp.user_id, me.score, opp.score, me.result,
+           mg.duration_minutes, mg.location, mg.cost, mg.played_at
+    FROM m_parts me
+    JOIN m_games mg ON mg.match_game_id = me.match_game_id
+    JOIN LATERAL (
+        SELECT p.user_id, p.score FROM m_parts p
+        WHERE p.match_game_id = me.match_game_id AND p.user_id <> me.user_id
+        ORDER BY p.user_id LIMIT 1
+    ) opp ON TRUE
+    WHERE me.user_id = $1
+    ORDER BY mg.played_at DESC, mg.match_game_id DESC
+    LIMIT 50
+'''
+
+
+async def run(games: int, players: int, users: int):
+    conn = await connect()
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        await conn.execute(SETUP)
+        # asyncpg can't bind parameters in a multi-statement string; inline the ints
+        await conn.execute(SEED.replace("$1", str(games)).replace("$2", str(players)).replace("$3", str(users)))
+        sizes = await conn.fetchrow(
+            '''
+            SELECT (SELECT COUNT(*) FROM pair_hist) AS pair_rows,
+                   pg_total_relation_size('pair_hist') AS pair_bytes,
+                   (SELECT COUNT(*) FROM m_games) + (SELECT COUNT(*) FROM m_parts) AS game_rows,
+                   pg_total_relation_size('m_games') + pg_total_relation_size('m_parts') AS game_bytes
+            '''
+        )
+        old_ms = await time_query(conn, OLD_QUERY, 7)
+        new_ms = await time_query(conn, NEW_QUERY, 7)
+        print(f"{games} games x {players} players")
+        print(f"  pairwise   {sizes['pair_rows']:>10} rows {sizes['pair_bytes'] / 1e6:9.2f} MB  history page {old_ms:8.3f} ms")
+        print(f"  game-level {sizes['game_rows']:>10} rows {sizes['game_bytes'] / 1e6:9.2f} MB  history page {new_ms:8.3f} ms")
+    finally:
+        await tx.rollback()
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.games, args.players, max(args.users, args.players)))
+
+
+if __name__ == "__main__":
+    main()
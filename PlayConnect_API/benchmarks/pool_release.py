@@ -0,0 +1,89 @@
+"""Check that slow side effects don't hold pool connections (Database.scope).
+
+    python -m PlayConnect_API.benchmarks.pool_release --pool-size 2 --writers 4 --mail-seconds 2
+
+Runs `writers` concurrent join-like requests against a pool of `pool-size`
+connections. Each does one query, then a slow mail stand-in (asyncio.sleep).
+Meanwhile a probe issues `SELECT 1` every 50 ms and records how long it waited
+for a connection. This runs in two modes:
+
+  held    the mail is awaited inside the acquired connection (old behaviour)
+  scoped  the mail is queued with scope.after_release() and runs after release
+
+Exits non-zero if, in scoped mode, any probe waited longer than a quarter of
+the mail duration. Nothing is written to the database.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from PlayConnect_API import Database
+from PlayConnect_API.benchmarks.common import create_pool
+
+
+async def slow_mail(seconds: float):
+    await asyncio.sleep(seconds)
+
+
+async def writer(pool: Database.InstrumentedPool, mode: str, mail_seconds: float):
+    if mode == "held":
+        async with pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+            await slow_mail(mail_seconds)
+    else:
+        async with Database.Scope(pool) as scope:
+            await scope.connection.fetchval("SELECT 1")
+            scope.after_release(slow_mail, mail_seconds)
+
+
+async def probe(pool: Database.InstrumentedPool, until: float, waits: list):
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        async with pool.acquire(timeout=60) as conn:
+            waits.append((time.perf_counter() - start) * 1000)
+            await conn.fetchval("SELECT 1")
+        await asyncio.sleep(0.05)
+
+
+async def run_mode(raw, mode: str, writers: int, mail_seconds: float) -> float:
+    pool = Database.InstrumentedPool(raw, acquire_timeout=60)
+    waits = []
+    start = time.perf_counter()
+    probe_task = asyncio.create_task(probe(pool, start + mail_seconds, waits))
+    await asyncio.sleep(0)  # let the writers grab connections first
+    await asyncio.gather(*(writer(pool, mode, mail_seconds) for _ in range(writers)))
+    await probe_task
+    elapsed = time.perf_counter() - start
+    worst = max(waits) if waits else float("inf")
+    print(f"{mode:>6}: {writers} writers in {elapsed:.2f}s; probe acquires={len(waits)} "
+          f"max wait={worst:.1f} ms; pool {pool.stats()['peak_in_use']} peak in use")
+    return worst
+
+
+async def run(pool_size: int, writers: int, mail_seconds: float) -> bool:
+    raw = await create_pool(min_size=pool_size, max_size=pool_size)
+    try:
+        await run_mode(raw, "held", writers, mail_seconds)
+        worst = await run_mode(raw, "scoped", writers, mail_seconds)
+    finally:
+        await raw.close()
+    return worst < mail_seconds * 1000 / 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--mail-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.pool_size, args.writers, args.mail_seconds))
+    if not ok:
+        print("FAIL: probe blocked while mail was in flight")
+        sys.exit(1)
+    print("OK: pool stayed available during slow mail")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: leading-wildcard ILIKE vs. indexed search, by table size.
+
+    python -m PlayConnect_API.benchmarks.search --sizes 1000 10000 100000
+
+For every size, synthetic users are inserted inside a transaction that is
+rolled back afterwards, so the target database is left untouched. Prints one
+line per size with the median latency of both predicates and whether the new
+one was served by an index.
+"""
+
+import argparse
+import asyncio
+import json
+
+from PlayConnect_API.benchmarks.common import connect, explain, plan_nodes, time_query
+from PlayConnect_API.services.search import parse_search, search_predicate, search_rank
+
+SEED_USERS = '''
+    INSERT INTO public."Users" (first_name, last_name, email, password, age, created_at, isverified, role)
+    SELECT
+        (ARRAY['alice','bob','carla','dani','elie','farah','georges','hala','issa','jana'])[1 + i % 10] || i,
+        (ARRAY['haddad','khoury','saad','nassar','karam','aoun','salem','fares'])[1 + i % 8],
+        'bench' || i || '@example.com',
+        'x', 20 + i % 30, NOW(), TRUE, 'player'
+    FROM generate_series(1, $1) AS g(i)
+'''
+
+LEGACY_SQL = '''
+    SELECT user_id FROM public."Users" AS u
+    WHERE u.email ILIKE $1 OR u.first_name ILIKE $1 OR u.last_name ILIKE $1
+    LIMIT 20
+'''
+
+
+def indexed_sql(query: str):
+    terms = parse_search(query)
+    params = []
+    predicate = search_predicate("u", terms, params)
+    rank = search_rank("u", terms, params)
+    sql = f'''
+        SELECT user_id FROM public."Users" AS u
+        WHERE {predicate}
+        ORDER BY {rank} DESC
+        LIMIT 20
+    '''
+    return sql, params
+
+
+async def run(sizes, query):
+    conn = await connect()
+    results = []
+    try:
+        for size in sizes:
+            tx = conn.transaction()
+            await tx.start()
+            try:
+                await conn.execute(SEED_USERS, size)
+                await conn.execute('ANALYZE public."Users"')
+                legacy_ms = await time_query(conn, LEGACY_SQL, f"%{query}%")
+                sql, params = indexed_sql(query)
+                indexed_ms = await time_query(conn, sql, *params)
+                plan = await explain(conn, sql, *params)
+                used = sorted({n["Index Name"] for n in plan_nodes(plan) if "Index Name" in n})
+                results.append({
+                    "rows": size,
+                    "legacy_ilike_ms": round(legacy_ms, 3),
+                    "indexed_ms": round(indexed_ms, 3),
+                    "indexes": used,
+                })
+                print(f"{size:>9} rows  ILIKE {legacy_ms:9.3f} ms  indexed {indexed_ms:9.3f} ms  {used}")
+            finally:
+                await tx.rollback()
+    finally:
+        await conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--query", default="hala12")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    results = asyncio.run(run(args.sizes, args.query))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
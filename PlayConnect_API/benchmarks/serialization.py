@@ -0,0 +1,96 @@
+"""Benchmark: model-per-row + response_model vs. services/serialization.rows_response.
+
+    python -m PlayConnect_API.benchmarks.serialization --rows 10000
+
+No database needed. Builds `rows` synthetic Game_instance rows (Decimal cost,
+timezone-aware datetimes, as asyncpg returns them) and times turning them
+into response bytes two ways:
+
+  models   GameInstanceResponse(**row) per row, then what FastAPI does for a
+           response_model: validate the list again, jsonable_encoder, json.dumps
+  direct   rows_response(rows, GameInstanceResponse)
+
+Prints median milliseconds of each and the speed-up, and checks that both
+decode to the same JSON modulo number/datetime formatting.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from PlayConnect_API.schemas.Game_Instance import GameInstanceResponse
+from PlayConnect_API.services import serialization
+
+
+def make_rows(n: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "game_id": i,
+            "host_id": 1000 + i % 97,
+            "sport_id": 1 + i % 7,
+            "start_time": now + timedelta(hours=i),
+            "duration_minutes": 60 + i % 4 * 30,
+            "location": f"Court {i % 40}",
+            "skill_level": ("Beginner", "Intermediate", "Advanced")[i % 3],
+            "max_players": 10,
+            "cost": Decimal(i % 25) + Decimal("0.50"),
+            "status": "Open",
+            "notes": None if i % 2 else "Bring water",
+            "created_at": now - timedelta(days=1),
+            "updated_at": now,
+            "search_vector": "'court':1",  # an extra column that must not leak
+        }
+        for i in range(n)
+    ]
+
+
+def via_models(rows) -> bytes:
+    adapter = TypeAdapter(List[GameInstanceResponse])
+    models = [GameInstanceResponse(**row) for row in rows]
+    validated = adapter.validate_python(models)
+    return JSONResponse(jsonable_encoder(adapter.dump_python(validated, mode="json"))).body
+
+
+def direct(rows) -> bytes:
+    return serialization.rows_response(rows, GameInstanceResponse).body
+
+
+def timed(fn, rows, repeat: int) -> float:
+    fn(rows)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    old, new = json.loads(via_models(rows)), json.loads(direct(rows))
+    assert len(old) == len(new) and set(old[0]) == set(new[0]), "response shapes differ"
+    assert all(float(a["cost"]) == b["cost"] for a, b in zip(old, new)), "cost mismatch"
+
+    t_old = timed(via_models, rows, args.repeat)
+    t_new = timed(direct, rows, args.repeat)
+    backend = "orjson" if serialization.orjson is not None else "stdlib json"
+    print(f"{args.rows} rows: models {t_old:.1f} ms, direct ({backend}) {t_new:.1f} ms, "
+          f"{t_old / t_new:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,17 +19,32 @@ from PlayConnect_API.schemas.EmailVerificationRequest import EmailVerificationRe
 from PlayConnect_API.schemas.sport import SportRead, SportCreate
 from PlayConnect_API.schemas.Profile import ProfileCreate, ProfileRead
 from PlayConnect_API.schemas.Game_participants import GameParticipantJoin, GameParticipantLeave
-from PlayConnect_API.schemas.Waitlist import WaitlistRead  
+from PlayConnect_API.schemas.Waitlist import WaitlistPosition
 from PlayConnect_API.schemas.report import ReportCreate, ReportRead, ReportUpdate
 from PlayConnect_API.schemas.Notifications import NotificationCreate, NotificationRead, NotificationType
 from PlayConnect_API.schemas.Friends import FriendCreate, FriendRead
 from PlayConnect_API.schemas.Match_Histories import MatchHistoryCreate, MatchHistoryRead
+from PlayConnect_API.schemas.match_stats import HeadToHeadRead, MatchResultsUpdate, UserMatchStatsRead
 from PlayConnect_API.schemas.user_badging import UserBadgeCreate, UserBadgeRead, UserBadgeUpdate
 from PlayConnect_API.schemas.activity_log import ActivityLogCreate, ActivityLogRead, ActivityLogUpdate
 
 from PlayConnect_API.security_utils import hash_password, verify_password
+from PlayConnect_API.sql_utils import build_set_clause, changed_fields
+from PlayConnect_API import queries
+from PlayConnect_API import migrate
 
 from PlayConnect_API.services.mailer import render_template, send_email
+from PlayConnect_API.services.search import parse_search, search_predicate, search_rank
+from PlayConnect_API.services import booking as booking_engine
+from PlayConnect_API.services.booking import book_spot, lock_game
+from PlayConnect_API.services.waitlist import promote_waitlist, fetch_game_queue, fetch_user_waitlists
+from PlayConnect_API.services.coach_directory import SORTS as COACH_SORTS, build_coach_search
+from PlayConnect_API.services.storage import FileTooLarge, get_storage, iter_upload
+from PlayConnect_API.services import avatars
+from PlayConnect_API.services import activity_log
+from PlayConnect_API.services import streaks
+from PlayConnect_API.services.pagination import DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, page_rows, stream_ndjson
+from PlayConnect_API.services.serialization import json_response, rows_response
 import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -37,6 +52,7 @@ from PlayConnect_API.recurrence_worker import process_due_schedules
 
 
 from datetime import date, datetime, timezone, timedelta
+from decimal import Decimal
 import os, secrets, hashlib
 import jwt
 from fastapi import Request
@@ -44,6 +60,7 @@ import json
 from fastapi import Body
 from typing import List
 from fastapi import UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 import os, shutil
 
 # =======================
@@ -124,12 +141,17 @@ BADGE_DEFINITIONS = [
 ]
 
 
-async def log_activity(connection, user_id: int, action: str):
-    await connection.execute(
-        '''
-        INSERT INTO public."activity_logs" (user_id, action, created_at)
-        VALUES ($1, $2, NOW())
-        ''',
+async def log_activity(connection, user_id: int, action: str, *, durable: bool = False):
+    """
+    Record an activity. By default the event is queued for the batched writer
+    (services/activity_log.py) and written within ACTIVITY_LOG_FLUSH_MS;
+    durable=True INSERTs it on `connection`, inside the caller's transaction.
+    """
+    if not durable and activity_log.writer.running:
+        await activity_log.writer.log(user_id, action)
+        return
+    await queries.execute(
+        connection, queries.ACTIVITY_LOG_APPEND,
         user_id, action
     )
 
@@ -141,110 +163,64 @@ async def upsert_user_stats_delta(
     sport_id: int | None,
     games_played_delta: int = 0,
     games_hosted_delta: int = 0,
-    xp_delta: int = 0
+    xp_delta: int = 0,
+    joins_delta: int = 0,
+    left_delta: int = 0
 ):
+    """
+    Add deltas to the user's User_stats row for a sport. joins_delta and
+    left_delta feed attendance_rate (see migrations/0009_add_attendance_rate.sql);
+    attendance itself is credited in bulk by archive_past_games.
+    """
     sport = sport_id if sport_id is not None else 0
-    if games_played_delta == 0 and games_hosted_delta == 0 and xp_delta == 0:
+    if not any((games_played_delta, games_hosted_delta, xp_delta, joins_delta, left_delta)):
         return None
 
-    row = await connection.fetchrow(
-        '''
-        INSERT INTO public."User_stats" (user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level)
-        VALUES ($1, $2, $3, $4, NULL, $5, FLOOR(GREATEST($5, 0)::numeric / $6))
-        ON CONFLICT (user_id, sport_id)
-        DO UPDATE SET
-            games_played = GREATEST(public."User_stats".games_played + EXCLUDED.games_played, 0),
-            games_hosted = GREATEST(public."User_stats".games_hosted + EXCLUDED.games_hosted, 0),
-            xp = GREATEST(public."User_stats".xp + EXCLUDED.xp, 0),
-            level = FLOOR(GREATEST(public."User_stats".xp + EXCLUDED.xp, 0)::numeric / $6)
-        RETURNING user_id, sport_id, games_played, games_hosted, xp, level
-        ''',
+    row = await queries.fetchrow(
+        connection, queries.USER_STATS_ADD_DELTA,
         user_id,
         sport,
         games_played_delta,
         games_hosted_delta,
         xp_delta,
-        XP_PER_LEVEL
+        XP_PER_LEVEL,
+        joins_delta,
+        left_delta
     )
     return row
 
 
 async def get_user_progress_context(connection, user_id: int):
-    stat_totals = await connection.fetchrow(
-        '''
-        SELECT
-            COALESCE(SUM(games_played), 0) AS total_games_played,
-            COALESCE(SUM(games_hosted), 0) AS total_games_hosted,
-            COALESCE(SUM(xp), 0) AS total_xp,
-            COALESCE(MAX(level), 0) AS current_level
-        FROM public."User_stats"
-        WHERE user_id = $1
-        ''',
+    stat_totals = await queries.fetchrow(
+        connection, queries.PROGRESS_STAT_TOTALS,
         user_id
     ) or {"total_games_played": 0, "total_games_hosted": 0, "total_xp": 0, "current_level": 0}
 
-    games_played_total = await connection.fetchval(
-        'SELECT COUNT(*) FROM public."Game_participants" WHERE user_id = $1',
+    games_played_total = await queries.fetchval(
+        connection, queries.PROGRESS_GAMES_PLAYED,
         user_id
     ) or 0
 
-    games_hosted_total = await connection.fetchval(
-        'SELECT COUNT(*) FROM public."Game_instance" WHERE host_id = $1',
+    games_hosted_total = await queries.fetchval(
+        connection, queries.PROGRESS_GAMES_HOSTED,
         user_id
     ) or 0
 
-    friend_count = await connection.fetchval(
-        '''
-        SELECT COUNT(*)
-        FROM public."Friends"
-        WHERE status = 'accepted' AND ($1 = user_id OR $1 = friend_id)
-        ''',
+    friend_count = await queries.fetchval(
+        connection, queries.PROGRESS_FRIEND_COUNT,
         user_id
     ) or 0
 
-    is_verified_coach = bool(await connection.fetchval(
-        '''
-        SELECT 1 FROM public."Coaches"
-        WHERE coach_id = $1 AND isverified = TRUE
-        LIMIT 1
-        ''',
+    is_verified_coach = bool(await queries.fetchval(
+        connection, queries.PROGRESS_VERIFIED_COACH,
         user_id
     ))
 
-    login_days = await connection.fetch(
-        '''
-        SELECT DISTINCT DATE(created_at) AS day
-        FROM public."activity_logs"
-        WHERE user_id = $1 AND action = 'login' AND created_at >= NOW() - INTERVAL '14 days'
-        ORDER BY day DESC
-        ''',
-        user_id
-    )
-    login_day_set = {row["day"] for row in login_days}
-    streak = 0
-    current_day = date.today()
-    while current_day in login_day_set:
-        streak += 1
-        current_day = current_day - timedelta(days=1)
-
-    xp_row = await connection.fetchrow(
-        '''
-        WITH totals AS (
-            SELECT user_id, COALESCE(SUM(xp), 0) AS total_xp
-            FROM public."User_stats"
-            GROUP BY user_id
-        ), ranked AS (
-            SELECT
-                user_id,
-                total_xp,
-                ROW_NUMBER() OVER (ORDER BY total_xp DESC) AS rk,
-                COUNT(*) OVER () AS total_users
-            FROM totals
-        )
-        SELECT total_xp, rk, total_users
-        FROM ranked
-        WHERE user_id = $1
-        ''',
+    streak_row = await streaks.fetch_streak(connection, user_id)
+    streak = streak_row["current_streak"] if streak_row else 0
+
+    xp_row = await queries.fetchrow(
+        connection, queries.PROGRESS_XP_RANK,
         user_id
     )
     total_users = xp_row["total_users"] if xp_row else 0
@@ -270,8 +246,8 @@ async def ensure_user_badges(connection, user_id: int, context: dict | None = No
 
     existing = {
         row["badge_name"]
-        for row in await connection.fetch(
-            'SELECT badge_name FROM public."user_badges" WHERE user_id = $1',
+        for row in await queries.fetch(
+            connection, queries.USER_BADGE_NAMES,
             user_id
         )
     }
@@ -281,11 +257,8 @@ async def ensure_user_badges(connection, user_id: int, context: dict | None = No
         if name in existing:
             continue
         if badge["check"](context):
-            await connection.execute(
-                '''
-                INSERT INTO public."user_badges" (user_id, badge_name, earned_on, seen)
-                VALUES ($1, $2, NOW(), FALSE)
-                ''',
+            await queries.execute(
+                connection, queries.USER_BADGE_AWARD,
                 user_id,
                 name
             )
@@ -300,7 +273,9 @@ async def apply_progress(
     sport_id: int | None = None,
     games_played_delta: int = 0,
     games_hosted_delta: int = 0,
-    xp_delta: int = 0
+    xp_delta: int = 0,
+    joins_delta: int = 0,
+    left_delta: int = 0
 ):
     await upsert_user_stats_delta(
         connection,
@@ -308,11 +283,28 @@ async def apply_progress(
         sport_id=sport_id,
         games_played_delta=games_played_delta,
         games_hosted_delta=games_hosted_delta,
-        xp_delta=xp_delta
+        xp_delta=xp_delta,
+        joins_delta=joins_delta,
+        left_delta=left_delta
     )
     await ensure_user_badges(connection, user_id)
 
 
+async def promote_from_waitlist(connection, game_id: int):
+    """Admit waitlisted users into freed spots of a game and credit them like a join."""
+    promoted = await promote_waitlist(connection, game_id)
+    for row in promoted:
+        await apply_progress(
+            connection,
+            user_id=row["user_id"],
+            sport_id=row["sport_id"],
+            games_played_delta=1,
+            xp_delta=XP_REWARDS["play_game"],
+            joins_delta=1
+        )
+    return [row["user_id"] for row in promoted]
+
+
 app = FastAPI()
 
 # APScheduler instance used to run the recurrence worker in-process
@@ -332,6 +324,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -358,7 +351,7 @@ async def ensure_password_reset_table():
         )
 
 
-async def send_verification_email(connection, user_id: int, email: str, first_name: str):
+async def send_verification_email(user_id: int, email: str, first_name: str):
     """Send email verification to user"""
     try:
         # Create verification URL with email parameter
@@ -383,10 +376,38 @@ async def send_verification_email(connection, user_id: int, email: str, first_na
     except Exception as e:
         print(f"[DEV ONLY] Failed to send verification email: {repr(e)}")
 
+
+async def send_game_email(template: str, subject: str, email: str, first_name: Optional[str], game) -> None:
+    """Render one of the game_*.html templates for `game` (needs sport_name, location,
+    start_time, duration_minutes, skill_level) and send it. Errors are logged, not raised."""
+    try:
+        sport_name = game["sport_name"] or "Game"
+        start_time_dt = game["start_time"]
+        if isinstance(start_time_dt, datetime):
+            start_time_str = start_time_dt.strftime("%A, %B %d, %Y at %I:%M %p")
+        else:
+            start_time_str = str(start_time_dt)
+
+        frontend_url = os.getenv("APP_URL") or os.getenv("FRONTEND_URL", "https://cmps271-group3-cbl2.vercel.app")
+        context = {
+            "first_name": first_name or "Player",
+            "sport_name": sport_name,
+            "location": game["location"] or "Location TBD",
+            "start_time": start_time_str,
+            "duration_minutes": game["duration_minutes"],
+            "skill_level": game["skill_level"] or "N/A",
+            "dashboard_url": f"{frontend_url}/dashboard",
+        }
+        html = render_template(f"PlayConnect_API/templates/emails/{template}", context)
+        await send_email(email, subject.format(sport_name=sport_name), html)
+    except Exception as email_err:
+        # Log but don't fail the request if email fails
+        print(f"[WARNING] Failed to send {template} email: {repr(email_err)}")
+
 @app.post("/register")
 async def register_user(reg: RegisterRequest):
     try:
-        async with Database.pool.acquire() as connection:
+        async with Database.scope() as scope:
             query = '''
                 INSERT INTO public."Users" (first_name, last_name, email, password, age, created_at, isverified, role)
                 VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
@@ -400,7 +421,7 @@ async def register_user(reg: RegisterRequest):
             print("[DEBUG] /register password raw:", raw_pw)
             print("[DEBUG] /register password byte len:", len(raw_pw.encode("utf-8")))
             hashed_pw = hash_password(raw_pw)
-            row = await connection.fetchrow(
+            row = await scope.connection.fetchrow(
                 query,
                 reg.first_name,
                 reg.last_name,
@@ -413,10 +434,12 @@ async def register_user(reg: RegisterRequest):
             )
             
             if row:
-                # Send email verification after registration
-                await send_verification_email(connection, row["user_id"], row["email"], row["first_name"])
+                # Send email verification once the connection is back in the pool
+                scope.after_release(send_verification_email, row["user_id"], row["email"], row["first_name"])
                 return dict(row)
             return None
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -447,97 +470,64 @@ async def get_game_participants(game_id: Union[int, None] = None, user_id: Union
 
             rows = await connection.fetch(query, *params)
             return [dict(row) for row in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/game-participants/join", status_code=201)
-async def join_game_participant(payload: GameParticipantJoin):
+@Database.writes(lambda kw: kw["payload"].user_id, topics=("games",))
+async def join_game_participant(payload: GameParticipantJoin, uow: Database.UnitOfWork = Depends(Database.unit_of_work)):
     """
     Add a participant to a game (idempotent on game_id, user_id).
+    Capacity is enforced atomically, see services/booking.py.
     """
-    try:
-        async with Database.pool.acquire() as connection:
-            # Ensure game exists and get full details including sport name
-            game = await connection.fetchrow(
-                '''
-                SELECT gi.game_id, gi.sport_id, gi.location, gi.start_time, gi.duration_minutes, 
-                       gi.skill_level, s.name AS sport_name
-                FROM public."Game_instance" AS gi
-                JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
-                WHERE gi.game_id = $1 LIMIT 1
-                ''',
-                payload.game_id,
+    async def work(connection):
+        result = await book_spot(
+            connection,
+            payload.game_id,
+            payload.user_id,
+            role=payload.role,
+            require_open=False,
+        )
+        if result.outcome == booking_engine.GAME_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Game not found")
+        if result.outcome == booking_engine.USER_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="User not found")
+        if result.outcome == booking_engine.FULL:
+            raise HTTPException(status_code=400, detail="This game is already full")
+
+        game = result.booking
+        inserted = result.booked
+        if inserted:
+            await apply_progress(
+                connection,
+                user_id=payload.user_id,
+                sport_id=game["sport_id"],
+                games_played_delta=1,
+                xp_delta=XP_REWARDS["play_game"],
+                joins_delta=1
             )
-            if not game:
-                raise HTTPException(status_code=404, detail="Game not found")
-
-            # Ensure user exists and get email/first_name for email
-            user = await connection.fetchrow(
-                'SELECT user_id, email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
-                payload.user_id,
+            
+            uow.after_commit(
+                send_game_email,
+                "game_joined.html",
+                "Successfully Joined {sport_name} Game!",
+                game["user_email"],
+                game["user_first_name"],
+                game,
             )
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
 
-            result = await connection.execute(
-                '''
-                INSERT INTO public."Game_participants" (game_id, user_id, role, joined_at)
-                VALUES ($1, $2, $3, NOW())
-                ON CONFLICT (game_id, user_id) DO NOTHING
-                ''',
-                payload.game_id,
-                payload.user_id,
-                payload.role,
-            )
-            inserted = result and result.startswith("INSERT")
-            if inserted:
-                await apply_progress(
-                    connection,
-                    user_id=payload.user_id,
-                    sport_id=game["sport_id"],
-                    games_played_delta=1,
-                    xp_delta=XP_REWARDS["play_game"]
-                )
-                
-                # Send email notification when user successfully joins
-                try:
-                    user_email = user["email"]
-                    first_name = user["first_name"] or "Player"
-                    sport_name = game["sport_name"] or "Game"
-                    location = game["location"] or "Location TBD"
-                    
-                    # Format start_time
-                    start_time_dt = game["start_time"]
-                    if isinstance(start_time_dt, datetime):
-                        start_time_str = start_time_dt.strftime("%A, %B %d, %Y at %I:%M %p")
-                    else:
-                        start_time_str = str(start_time_dt)
-                    
-                    frontend_url = os.getenv("APP_URL") or os.getenv("FRONTEND_URL", "https://cmps271-group3-cbl2.vercel.app")
-                    dashboard_url = f"{frontend_url}/dashboard"
-                    
-                    context = {
-                        "first_name": first_name,
-                        "sport_name": sport_name,
-                        "location": location,
-                        "start_time": start_time_str,
-                        "duration_minutes": game["duration_minutes"],
-                        "skill_level": game["skill_level"] or "N/A",
-                        "dashboard_url": dashboard_url,
-                    }
-                    html = render_template("PlayConnect_API/templates/emails/game_joined.html", context)
-                    await send_email(user_email, f"Successfully Joined {sport_name} Game!", html)
-                except Exception as email_err:
-                    # Log but don't fail the request if email fails
-                    print(f"[WARNING] Failed to send join game email: {repr(email_err)}")
-            
-            return {
-                "message": "Joined game" if inserted else "Already participating",
-                "game_id": payload.game_id,
-                "user_id": payload.user_id,
-                "role": payload.role,
-            }
+        return {
+            "message": "Joined game" if inserted else "Already participating",
+            "game_id": payload.game_id,
+            "user_id": payload.user_id,
+            "role": payload.role,
+        }
+
+    try:
+        return await uow.run(work)
     except HTTPException:
         raise
     except Exception as e:
@@ -545,76 +535,61 @@ async def join_game_participant(payload: GameParticipantJoin):
 
 
 @app.post("/game-participants/leave", status_code=200)
-async def leave_game_participant(payload: GameParticipantLeave):
+@Database.writes(lambda kw: kw["payload"].user_id, topics=("games",))
+async def leave_game_participant(payload: GameParticipantLeave, uow: Database.UnitOfWork = Depends(Database.unit_of_work)):
     """
-    Remove a participant from a game.
+    Remove a participant from a game and hand the freed spot to the waitlist.
     """
-    try:
-        async with Database.pool.acquire() as connection:
-            # First, fetch game details and user info before deleting (for email)
-            game = await connection.fetchrow(
-                '''
-                SELECT gi.game_id, gi.sport_id, gi.location, gi.start_time, gi.duration_minutes, 
-                       gi.skill_level, s.name AS sport_name
-                FROM public."Game_instance" AS gi
-                JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
-                WHERE gi.game_id = $1 LIMIT 1
-                ''',
-                payload.game_id,
-            )
-            
-            user = await connection.fetchrow(
-                'SELECT user_id, email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
-                payload.user_id,
-            )
-            
-            result = await connection.execute(
-                'DELETE FROM public."Game_participants" WHERE game_id = $1 AND user_id = $2',
-                payload.game_id,
-                payload.user_id,
+    async def work(connection):
+        # First, fetch game details and user info before deleting (for email)
+        game = await queries.fetchrow(
+            connection, queries.GAME_WITH_SPORT,
+            payload.game_id,
+        )
+        
+        user = await queries.fetchrow(
+            connection, queries.USER_CONTACT_BY_ID,
+            payload.user_id,
+        )
+        
+        # Leaving and promoting the next waitlisted user commit together. Take
+        # the game lock before touching its participants, in the same order as
+        # book_spot, so a concurrent leave and re-join can't deadlock.
+        await lock_game(connection, payload.game_id)
+        result = await queries.execute(
+            connection, queries.GAME_PARTICIPANT_DELETE,
+            payload.game_id,
+            payload.user_id,
+        )
+        deleted = result.split(" ")[-1]
+        if deleted == "0":
+            raise HTTPException(status_code=404, detail="Participant not found for game")
+        if game:
+            # A join that ends in a leave counts against attendance_rate
+            await upsert_user_stats_delta(
+                connection, user_id=payload.user_id, sport_id=game["sport_id"], left_delta=1
+            )
+        promoted = await promote_from_waitlist(connection, payload.game_id)
+        
+        if game and user:
+            uow.after_commit(
+                send_game_email,
+                "game_left.html",
+                "You Left {sport_name} Game",
+                user["email"],
+                user["first_name"],
+                game,
             )
-            deleted = result.split(" ")[-1]
-            if deleted == "0":
-                raise HTTPException(status_code=404, detail="Participant not found for game")
-            
-            # Send email notification when user successfully leaves
-            if game and user:
-                try:
-                    user_email = user["email"]
-                    first_name = user["first_name"] or "Player"
-                    sport_name = game["sport_name"] or "Game"
-                    location = game["location"] or "Location TBD"
-                    
-                    # Format start_time
-                    start_time_dt = game["start_time"]
-                    if isinstance(start_time_dt, datetime):
-                        start_time_str = start_time_dt.strftime("%A, %B %d, %Y at %I:%M %p")
-                    else:
-                        start_time_str = str(start_time_dt)
-                    
-                    frontend_url = os.getenv("APP_URL") or os.getenv("FRONTEND_URL", "https://cmps271-group3-cbl2.vercel.app")
-                    dashboard_url = f"{frontend_url}/dashboard"
-                    
-                    context = {
-                        "first_name": first_name,
-                        "sport_name": sport_name,
-                        "location": location,
-                        "start_time": start_time_str,
-                        "duration_minutes": game["duration_minutes"],
-                        "skill_level": game["skill_level"] or "N/A",
-                        "dashboard_url": dashboard_url,
-                    }
-                    html = render_template("PlayConnect_API/templates/emails/game_left.html", context)
-                    await send_email(user_email, f"You Left {sport_name} Game", html)
-                except Exception as email_err:
-                    # Log but don't fail the request if email fails
-                    print(f"[WARNING] Failed to send leave game email: {repr(email_err)}")
-            
-            return {
-                "message": "Left game",
-                "game_id": payload.game_id,
-                "user_id": payload.user_id,
-            }
+
+        return {
+            "message": "Left game",
+            "game_id": payload.game_id,
+            "user_id": payload.user_id,
+            "promoted_user_ids": promoted,
+        }
+
+    try:
+        return await uow.run(work)
     except HTTPException:
         raise
     except Exception as e:
@@ -629,9 +604,10 @@ async def forgot_password(payload: ForgotPasswordRequestCreate):
     reset_url = None
 
     try:
-        async with Database.pool.acquire() as connection:
-            user = await connection.fetchrow(
-                'SELECT user_id, email, first_name FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1',
+        async with Database.scope() as scope:
+            connection = scope.connection
+            user = await queries.fetchrow(
+                connection, queries.USER_CONTACT_BY_EMAIL,
                 payload.email,
             )
 
@@ -640,8 +616,8 @@ async def forgot_password(payload: ForgotPasswordRequestCreate):
                 token_hash = _sha256_hex(raw_token)
                 expires_at = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
 
-                await connection.execute(
-                    'INSERT INTO public."Password_reset_tokens" (user_id, token_hash, expires_at) VALUES ($1, $2, $3)',
+                await queries.execute(
+                    connection, queries.RESET_TOKEN_INSERT,
                     user["user_id"],
                     token_hash,
                     expires_at,
@@ -654,12 +630,7 @@ async def forgot_password(payload: ForgotPasswordRequestCreate):
                     "PlayConnect_API/templates/emails/reset_password.html",
                     {"first_name": first_name, "reset_url": reset_url}
                 )
-                try:
-                    await send_email(user["email"], "Reset Your Password", html)
-                    if os.getenv("ENV", "dev").lower() != "production":
-                        print(f"[DEV ONLY] Email sent to {user['email']}")
-                except Exception as send_err:
-                    print(f"[DEV ONLY] Email send failed: {repr(send_err)}")
+                scope.after_release(send_email, user["email"], "Reset Your Password", html)
                 if os.getenv("ENV", "dev").lower() != "production":
                     print(f"[DEV ONLY] Password reset link for {user['email']}: {reset_url}")
                 preview_html = html
@@ -673,6 +644,8 @@ async def forgot_password(payload: ForgotPasswordRequestCreate):
             }
         return {"message": "If an account exists for that email, you will receive a reset link shortly."}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -707,13 +680,8 @@ async def reset_password(body: PasswordResetPayload):
     try:
         async with Database.pool.acquire() as connection:
             # 2) find token row
-            token_row = await connection.fetchrow(
-                '''
-                SELECT id, user_id, expires_at, used_at
-                FROM public."Password_reset_tokens"
-                WHERE token_hash = $1
-                LIMIT 1
-                ''',
+            token_row = await queries.fetchrow(
+                connection, queries.RESET_TOKEN_BY_HASH,
                 token_hash,
             )
             if not token_row:
@@ -729,23 +697,15 @@ async def reset_password(body: PasswordResetPayload):
 
             # 3) hash new password and update user
             hashed_pw = hash_password(new_pw)
-            await connection.execute(
-                '''
-                UPDATE public."Users"
-                SET password = $1
-                WHERE user_id = $2
-                ''',
+            await queries.execute(
+                connection, queries.USER_SET_PASSWORD,
                 hashed_pw,
                 user_id,
             )
 
             # 4) mark token as used
-            await connection.execute(
-                '''
-                UPDATE public."Password_reset_tokens"
-                SET used_at = NOW()
-                WHERE id = $1
-                ''',
+            await queries.execute(
+                connection, queries.RESET_TOKEN_MARK_USED,
                 token_row["id"],
             )
 
@@ -778,8 +738,8 @@ async def verify_email(request: EmailVerificationRequest):
         print(f"[DEBUG] Verifying email: {request.email}")
         async with Database.pool.acquire() as connection:
             # Find user by email
-            user = await connection.fetchrow(
-                'SELECT user_id, email, isverified FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1',
+            user = await queries.fetchrow(
+                connection, queries.USER_VERIFICATION_BY_EMAIL,
                 request.email
             )
             
@@ -792,8 +752,8 @@ async def verify_email(request: EmailVerificationRequest):
                 return {"message": "Email is already verified!"}
             
             # Update user verification status
-            await connection.execute(
-                'UPDATE public."Users" SET isverified = TRUE WHERE user_id = $1',
+            await queries.execute(
+                connection, queries.USER_MARK_VERIFIED,
                 user["user_id"]
             )
             
@@ -810,10 +770,11 @@ async def verify_email(request: EmailVerificationRequest):
 async def resend_verification_email(request: EmailVerificationRequest):
     """Resend verification email for unverified users"""
     try:
-        async with Database.pool.acquire() as connection:
+        async with Database.scope() as scope:
+            connection = scope.connection
             # Find user by email
-            user = await connection.fetchrow(
-                'SELECT user_id, email, first_name, isverified FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1',
+            user = await queries.fetchrow(
+                connection, queries.USER_VERIFICATION_CONTACT_BY_EMAIL,
                 request.email
             )
             
@@ -829,19 +790,31 @@ async def resend_verification_email(request: EmailVerificationRequest):
                 }
             
             # Send verification email
-            await send_verification_email(connection, user["user_id"], user["email"], user["first_name"])
+            scope.after_release(send_verification_email, user["user_id"], user["email"], user["first_name"])
             
             return {
                 "message": "Verification email sent successfully!"
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.on_event("startup")
 async def startup():
+    if migrate.DB_MIGRATE_ON_STARTUP:
+        await migrate.run_on_startup()
     await connect_to_db()
     await ensure_password_reset_table()
+    try:
+        await activity_log.maintain_partitions()
+    except Exception as e:
+        print(f"[activity_logs] partition maintenance failed: {e}")
+    activity_log.writer.start()
+    scheduler.add_job(activity_log.maintain_partitions, "cron", hour=3, id="activity_log_partitions", replace_existing=True)
+    if not scheduler.running:
+        scheduler.start()
 #:(
 @app.on_event("shutdown")
 async def shutdown():
@@ -850,6 +823,9 @@ async def shutdown():
         scheduler.shutdown(wait=False)
     except Exception:
         pass
+    avatars.shutdown_executor()
+    # flush queued activity logs while the pool is still open
+    await activity_log.writer.stop()
     await disconnect_db()
 
 
@@ -866,13 +842,54 @@ async def run_recurring_now():
 def read_root():
     return {"Hello": "World"}
 
+USER_READ_COLUMNS = (
+    "user_id, email, first_name, last_name, age, avatar_url, bio, favorite_sport, "
+    "isverified, num_of_strikes, created_at, role"
+)
+
+
 @app.get("/users", response_model=List[UserRead])
-async def get_users():
+@Database.read_only("user_id")
+async def get_users(
+    response: Response,
+    user_id: Optional[int] = None,
+    email: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """
+    Users ordered by user_id, one page at a time (next page in X-Next-Cursor).
+    Filter by user_id or email to look up a single user.
+    """
+    after = decode_cursor(cursor, int)
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch('SELECT * FROM public."Users"')
-            users = [UserRead(**dict(row)) for row in rows]
-            return users
+            conditions, params = [], []
+            if user_id is not None:
+                params.append(user_id)
+                conditions.append(f"user_id = ${len(params)}")
+            if email:
+                params.append(email.strip().lower())
+                conditions.append(f"LOWER(email) = ${len(params)}")
+            if after:
+                params.append(after[0])
+                conditions.append(f"user_id > ${len(params)}")
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            params.append(limit + 1)
+            rows = await connection.fetch(
+                f'''
+                SELECT {USER_READ_COLUMNS}
+                FROM public."Users"
+                {where}
+                ORDER BY user_id
+                LIMIT ${len(params)}
+                ''',
+                *params,
+            )
+            rows = page_rows(rows, limit, response, lambda r: (r["user_id"],))
+            return rows_response(rows, UserRead, response=response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -904,15 +921,30 @@ async def create_user(user: UserCreate):
                 user.role
             )
             return UserRead(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 #coaches endpoints
 @app.get("/coaches")
-async def get_coaches():
+@Database.read_only(topics=("coaches",))
+async def get_coaches(
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    after = decode_cursor(cursor, datetime.fromisoformat, int)
     try:
         async with Database.pool.acquire() as connection:
-            query = '''
+            params = [limit + 1]
+            keyset = ""
+            if after:
+                params += list(after)
+                # created_at is nullable: NULLs sort last as -infinity, and a
+                # cursor taken on such a row carries null
+                keyset = "WHERE (COALESCE(c.created_at, '-infinity'), c.coach_id) < (COALESCE($2::timestamptz, '-infinity'), $3)"
+            query = f'''
                 SELECT 
                     c.coach_id,
                     c.experience_yrs,
@@ -928,40 +960,74 @@ async def get_coaches():
                     u.email
                 FROM public."Coaches" c
                 LEFT JOIN public."Users" u ON c.coach_id = u.user_id
-                ORDER BY c.created_at DESC
+                {keyset}
+                ORDER BY COALESCE(c.created_at, '-infinity') DESC, c.coach_id DESC
+                LIMIT $1
             '''
-            rows = await connection.fetch(query)
+            rows = await connection.fetch(query, *params)
+            rows = page_rows(rows, limit, response, lambda r: (r["created_at"], r["coach_id"]))
             return [dict(row) for row in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         print("🔥 ERROR in /coaches:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/coaches/search")
+@Database.read_only(topics=("coaches",))
+async def search_coaches(
+    response: Response,
+    verified: Optional[bool] = None,
+    sport: Optional[str] = Query(None, description="Matches the coach's favorite_sport, case-insensitive"),
+    min_rate: Optional[Decimal] = Query(None, ge=0),
+    max_rate: Optional[Decimal] = Query(None, ge=0),
+    min_experience: Optional[int] = Query(None, ge=0),
+    sort: str = Query("newest", pattern="^(" + "|".join(COACH_SORTS) + ")$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    Coach directory with server-side filters and keyset pagination (next page
+    in X-Next-Cursor). sessions_hosted / participants_coached come from the
+    trigger-maintained Coach_summary table.
+    """
+    after = decode_cursor(cursor, COACH_SORTS[sort].kind, int)
+    try:
+        async with Database.pool.acquire() as connection:
+            query, params = build_coach_search(
+                sort=sort,
+                verified=verified,
+                sport=sport,
+                min_rate=min_rate,
+                max_rate=max_rate,
+                min_experience=min_experience,
+                after=after,
+                limit=limit,
+            )
+            rows = await connection.fetch(query, *params)
+            rows = page_rows(rows, limit, response, lambda r: (r["sort_key"], r["coach_id"]))
+            coaches = []
+            for row in rows:
+                coach = dict(row)
+                coach.pop("sort_key")
+                coaches.append(coach)
+            return coaches
+    except HTTPException:
+        raise
+    except Exception as e:
+        print("🔥 ERROR in /coaches/search:", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/coaches/{coach_id}")
 async def get_coach_by_id(coach_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            query = '''
-                SELECT 
-                    c.coach_id,
-                    c.experience_yrs,
-                    c.certifications,
-                    c.isverified,
-                    c.hourly_rate,
-                    c.created_at,
-                    u.first_name,
-                    u.last_name,
-                    u.avatar_url,
-                    u.bio,
-                    u.favorite_sport,
-                    u.email
-                FROM public."Coaches" c
-                LEFT JOIN public."Users" u ON c.coach_id = u.user_id
-                WHERE c.coach_id = $1
-            '''
-            row = await connection.fetchrow(query, coach_id)
+            row = await queries.fetchrow(connection, queries.COACH_BY_ID, coach_id)
             if not row:
                 raise HTTPException(status_code=404, detail="Coach not found")
             return dict(row)
+    except HTTPException:
+        raise
     except Exception as e:
         print("🔥 ERROR:", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -971,30 +1037,14 @@ async def get_coach_by_id(coach_id: int):
 
 @app.post("/profile-creation", response_model=UserRead, status_code=200)
 async def create_profile(profile: ProfileCreate, user_id: int):
+    if profile.timezone is not None and not streaks.is_valid_timezone(profile.timezone):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {profile.timezone}")
+    profile.avatar_url = await resolve_avatar(profile.avatar_url)
     try:
         async with Database.pool.acquire() as connection:
-            # Ensure user exists
-            existing = await connection.fetchrow(
-                'SELECT user_id, email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
-                user_id
-            )
-            if not existing:
-                raise HTTPException(status_code=404, detail="User not found")
-
-            # Update user profile fields in Users table
-            row = await connection.fetchrow(
-                '''
-                UPDATE public."Users"
-                SET first_name = $1,
-                    last_name = $2,
-                    age = $3,
-                    favorite_sport = $4,
-                    bio = $5,
-                    avatar_url = $6,
-                    role = $7
-                WHERE user_id = $8
-                RETURNING user_id, email, first_name, last_name, age, avatar_url, bio, favorite_sport, isverified, num_of_strikes, created_at, role
-                ''',
+            # Update user profile fields in Users table (no row -> no such user)
+            row = await queries.fetchrow(
+                connection, queries.PROFILE_CREATE,
                 profile.first_name,
                 profile.last_name,
                 profile.age,
@@ -1003,8 +1053,10 @@ async def create_profile(profile: ProfileCreate, user_id: int):
                 profile.avatar_url,
                 profile.role,
                 user_id,
+                profile.timezone,
             )
-            
+            if not row:
+                raise HTTPException(status_code=404, detail="User not found")
             return UserRead(**dict(row))
     except HTTPException:
         raise
@@ -1016,50 +1068,47 @@ async def get_profile(user_id: int):
     """Get user profile by user_id"""
     try:
         async with Database.pool.acquire() as connection:
-            row = await connection.fetchrow(
-                '''
-                SELECT user_id, first_name, last_name, age, favorite_sport, bio, avatar_url, role
-                FROM public."Users"
-                WHERE user_id = $1
-                ''',
-                user_id
-            )
+            row = await queries.fetchrow(connection, queries.PROFILE_BY_ID, user_id)
             if not row:
                 raise HTTPException(status_code=404, detail="Profile not found")
-            return ProfileRead(**dict(row))
+            data = dict(row)
+            data["current_streak"] = streaks.current(row["current_streak"], row["last_login_date"], row["timezone"])
+            return ProfileRead(**data)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/profile/{user_id}", response_model=ProfileRead)
-async def update_profile(user_id: int, profile: ProfileCreate):
-    """Update user profile by user_id"""
+@app.get("/users/{user_id}/streak")
+@Database.read_only("user_id")
+async def get_login_streak(user_id: int):
+    """
+    Login streak of a user: consecutive days (in the user's timezone) with a
+    login. current_streak is 0 once a day has been missed.
+    """
     try:
         async with Database.pool.acquire() as connection:
-            # Check if user exists
-            existing = await connection.fetchrow(
-                'SELECT user_id, bio FROM public."Users" WHERE user_id = $1 LIMIT 1',
-                user_id
-            )
-            if not existing:
+            streak = await streaks.fetch_streak(connection, user_id)
+            if streak is None:
                 raise HTTPException(status_code=404, detail="User not found")
-            previous_bio = (existing["bio"] or "").strip() if "bio" in existing else ""
+            return streak
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Update user profile fields
-            row = await connection.fetchrow(
-                '''
-                UPDATE public."Users"
-                SET first_name = $1,
-                    last_name = $2,
-                    age = $3,
-                    favorite_sport = $4,
-                    bio = $5,
-                    avatar_url = $6,
-                    role = $7
-                WHERE user_id = $8
-                RETURNING user_id, first_name, last_name, age, favorite_sport, bio, avatar_url, role
-                ''',
+@app.put("/profile/{user_id}", response_model=ProfileRead)
+@Database.writes(lambda kw: kw["user_id"])
+async def update_profile(user_id: int, profile: ProfileCreate):
+    """Update user profile by user_id"""
+    if profile.timezone is not None and not streaks.is_valid_timezone(profile.timezone):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {profile.timezone}")
+    profile.avatar_url = await resolve_avatar(profile.avatar_url)
+    try:
+        async with Database.pool.acquire() as connection, connection.transaction():
+            # Update user profile fields; `prev` hands back the old bio in the same statement
+            row = await queries.fetchrow(
+                connection, queries.PROFILE_UPDATE,
                 profile.first_name,
                 profile.last_name,
                 profile.age,
@@ -1068,8 +1117,12 @@ async def update_profile(user_id: int, profile: ProfileCreate):
                 profile.avatar_url,
                 profile.role,
                 user_id,
+                profile.timezone,
             )
-            updated_bio = (row["bio"] or "").strip() if "bio" in row else ""
+            if not row:
+                raise HTTPException(status_code=404, detail="User not found")
+            previous_bio = (row["previous_bio"] or "").strip()
+            updated_bio = (row["bio"] or "").strip()
             if not previous_bio and updated_bio:
                 await apply_progress(
                     connection,
@@ -1083,7 +1136,78 @@ async def update_profile(user_id: int, profile: ProfileCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# -------------------------------
+# Avatars (pre-sized, content-hashed thumbnails)
+# -------------------------------
+async def resolve_avatar(value: Optional[str]) -> Optional[str]:
+    """Process an inline base64 avatar into an /avatars URL; other values pass through."""
+    try:
+        return await avatars.ingest_avatar_value(value)
+    except avatars.AvatarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/users/{user_id}/avatar")
+async def upload_avatar(user_id: int, file: UploadFile = File(...)):
+    """
+    Upload a profile picture. It is cropped square and stored as WebP/JPEG
+    thumbnails; Users.avatar_url is set to the resulting /avatars URL.
+    """
+    try:
+        data = bytearray()
+        async for chunk in iter_upload(file):
+            data += chunk
+            if len(data) > avatars.AVATAR_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Avatar is too large")
+        avatar_hash = await avatars.process_avatar(bytes(data))
+        url = avatars.avatar_url(avatar_hash)
+
+        async with Database.pool.acquire() as connection:
+            row = await queries.fetchrow(
+                connection, queries.USER_SET_AVATAR,
+                url, user_id
+            )
+            if not row:
+                raise HTTPException(status_code=404, detail="User not found")
+        return {"user_id": user_id, "avatar_url": url, "sizes": list(avatars.SIZES)}
+    except avatars.AvatarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/avatars/{avatar_hash}")
+async def get_avatar(
+    avatar_hash: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1, le=1024),
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(webp|jpg)$"),
+):
+    """
+    Serve the smallest pre-rendered variant >= size. WebP when the client
+    accepts it, JPEG otherwise. Content never changes for a given hash, so
+    responses are cacheable forever.
+    """
+    if not avatars.is_avatar_hash(avatar_hash):
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    fmt = fmt or ("webp" if "image/webp" in request.headers.get("accept", "") else "jpg")
+    px = avatars.pick_size(size)
+    etag = f'"{avatar_hash}-{px}.{fmt}"'
+    headers = {"Cache-Control": avatars.CACHE_CONTROL, "ETag": etag, "Vary": "Accept"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    storage = get_storage()
+    key = avatars.variant_key(avatar_hash, px, fmt)
+    if not await storage.exists(key):
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    return StreamingResponse(storage.read_chunks(key), media_type=avatars.FORMATS[fmt], headers=headers)
+
+
 @app.post("/coaches", response_model=CoachRead)
+@Database.writes(topics=("coaches",))
 async def create_coach(coach: CoachCreate):
     try:
         async with Database.pool.acquire() as connection:
@@ -1101,108 +1225,71 @@ async def create_coach(coach: CoachCreate):
                 coach.hourly_rate
             )
             return CoachRead(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Single-statement coach writes: CTE `c` yields the (updated) Coaches row and
+# `u` the (updated) Users row, so the joined CoachRead comes back in the same
+# round trip. Rows changed inside a CTE are only visible through its RETURNING.
+COACH_COLUMNS = "coach_id, experience_yrs, certifications, isverified, hourly_rate, created_at"
+COACH_USER_COLUMNS = "user_id, first_name, last_name, avatar_url, bio, favorite_sport, email"
+COACH_UPDATABLE = ("experience_yrs", "certifications", "hourly_rate")
+COACH_USER_UPDATABLE = ("first_name", "last_name", "favorite_sport", "avatar_url", "bio")
+COACH_READ_FROM_CTES = '''
+    SELECT
+      c.coach_id, c.experience_yrs, c.certifications, c.isverified,
+      c.hourly_rate, c.created_at,
+      u.first_name, u.last_name, u.avatar_url, u.bio, u.favorite_sport, u.email
+    FROM c
+    LEFT JOIN u ON u.user_id = c.coach_id
+'''
+
+
 @app.put("/coaches/{coach_id}", response_model=CoachRead)
+@Database.writes(topics=("coaches",))
 async def update_coach(coach_id: int, coach_update: CoachUpdate):
+    coach_update.avatar_url = await resolve_avatar(coach_update.avatar_url)
     try:
         async with Database.pool.acquire() as connection:
-            # Check if coach exists
-            coach_exists = await connection.fetchrow(
-                '''
-                SELECT coach_id FROM public."Coaches"
-                WHERE coach_id = $1
-                ''',
-                coach_id
-            )
-            if not coach_exists:
-                raise HTTPException(status_code=404, detail="Coach not found")
-
-            # Build dynamic UPDATE query for Coaches table
-            coach_updates = []
-            coach_params = []
-            param_num = 1
-
-            if coach_update.experience_yrs is not None:
-                coach_updates.append("experience_yrs = $" + str(param_num))
-                coach_params.append(coach_update.experience_yrs)
-                param_num += 1
-
-            if coach_update.certifications is not None:
-                coach_updates.append("certifications = $" + str(param_num))
-                coach_params.append(coach_update.certifications)
-                param_num += 1
-
-            if coach_update.hourly_rate is not None:
-                coach_updates.append("hourly_rate = $" + str(param_num))
-                coach_params.append(coach_update.hourly_rate)
-                param_num += 1
-
             # Note: isverified is intentionally excluded - use /coaches/{coach_id}/verification endpoint instead
+            params = [coach_id]
+            coach_fields = changed_fields(coach_update, COACH_UPDATABLE)
+            user_fields = changed_fields(coach_update, COACH_USER_UPDATABLE)
 
-            # Update Coaches table if there are fields to update
-            if coach_updates:
-                coach_query = f'''
+            # Coaches: update if anything changed, else just read the row.
+            if coach_fields:
+                coach_cte = f'''
                     UPDATE public."Coaches"
-                    SET {', '.join(coach_updates)}
-                    WHERE coach_id = $''' + str(param_num)
-                coach_params.append(coach_id)
-                await connection.execute(coach_query, *coach_params)
-
-            # Build dynamic UPDATE query for Users table
-            user_updates = []
-            user_params = []
-            user_param_num = 1
-
-            if coach_update.first_name is not None:
-                user_updates.append("first_name = $" + str(user_param_num))
-                user_params.append(coach_update.first_name)
-                user_param_num += 1
-
-            if coach_update.last_name is not None:
-                user_updates.append("last_name = $" + str(user_param_num))
-                user_params.append(coach_update.last_name)
-                user_param_num += 1
-
-            if coach_update.favorite_sport is not None:
-                user_updates.append("favorite_sport = $" + str(user_param_num))
-                user_params.append(coach_update.favorite_sport)
-                user_param_num += 1
-
-            if coach_update.avatar_url is not None:
-                user_updates.append("avatar_url = $" + str(user_param_num))
-                user_params.append(coach_update.avatar_url)
-                user_param_num += 1
-
-            if coach_update.bio is not None:
-                user_updates.append("bio = $" + str(user_param_num))
-                user_params.append(coach_update.bio)
-                user_param_num += 1
-
-            # Update Users table if there are fields to update
-            if user_updates:
-                user_query = f'''
+                    SET {build_set_clause(coach_fields, COACH_UPDATABLE, params)}
+                    WHERE coach_id = $1
+                    RETURNING {COACH_COLUMNS}
+                '''
+            else:
+                coach_cte = f'SELECT {COACH_COLUMNS} FROM public."Coaches" WHERE coach_id = $1'
+
+            # Users: only touched when the coach exists (joined through c).
+            if user_fields:
+                user_cte = f'''
                     UPDATE public."Users"
-                    SET {', '.join(user_updates)}
-                    WHERE user_id = $''' + str(user_param_num)
-                user_params.append(coach_id)
-                await connection.execute(user_query, *user_params)
+                    SET {build_set_clause(user_fields, COACH_USER_UPDATABLE, params)}
+                    WHERE user_id IN (SELECT coach_id FROM c)
+                    RETURNING {COACH_USER_COLUMNS}
+                '''
+            else:
+                user_cte = f'SELECT {COACH_USER_COLUMNS} FROM public."Users" WHERE user_id = $1'
 
-            # Return the updated coach with joined user data
             full = await connection.fetchrow(
-                '''
-                SELECT
-                  c.coach_id, c.experience_yrs, c.certifications, c.isverified,
-                  c.hourly_rate, c.created_at,
-                  u.first_name, u.last_name, u.avatar_url, u.bio, u.favorite_sport, u.email
-                FROM public."Coaches" c
-                LEFT JOIN public."Users" u ON c.coach_id = u.user_id
-                WHERE c.coach_id = $1
+                f'''
+                WITH c AS ({coach_cte}),
+                     u AS ({user_cte})
+                {COACH_READ_FROM_CTES}
                 ''',
-                coach_id
+                *params
             )
-
+            if not full:
+                raise HTTPException(status_code=404, detail="Coach not found")
             return CoachRead(**dict(full))
     except HTTPException:
         raise
@@ -1211,20 +1298,21 @@ async def update_coach(coach_id: int, coach_update: CoachUpdate):
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.delete("/coaches/{coach_id}", status_code=200)
+@Database.writes(topics=("coaches",))
 async def delete_coach(coach_id: int):
     try:
         async with Database.pool.acquire() as connection:
             # Ensure coach exists
-            exists = await connection.fetchrow(
-                'SELECT coach_id FROM public."Coaches" WHERE coach_id = $1 LIMIT 1',
+            exists = await queries.fetchrow(
+                connection, queries.COACH_EXISTS,
                 coach_id
             )
             if not exists:
                 raise HTTPException(status_code=404, detail="Coach not found")
 
             # Delete coach record
-            await connection.execute(
-                'DELETE FROM public."Coaches" WHERE coach_id = $1',
+            await queries.execute(
+                connection, queries.COACH_DELETE,
                 coach_id
             )
             return {"message": "Coach listing deleted", "coach_id": coach_id}
@@ -1234,62 +1322,32 @@ async def delete_coach(coach_id: int):
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.put("/coaches/{coach_id}/verification", response_model=CoachRead)
+@Database.writes(topics=("coaches",))
 async def verify_coach(coach_id: int, body: CoachVerifyUpdate):
     try:
         async with Database.pool.acquire() as connection:
-            # Ensure the coach exists and check current status
-            row = await connection.fetchrow(
-                '''
-                SELECT c.coach_id, c.isverified
-                FROM public."Coaches" c
-                WHERE c.coach_id = $1
+            # pending(False) -> verified(True); already verified is idempotent and not rewritten
+            full = await connection.fetchrow(
+                f'''
+                WITH upd AS (
+                    UPDATE public."Coaches"
+                    SET isverified = TRUE
+                    WHERE coach_id = $1 AND isverified IS NOT TRUE
+                    RETURNING {COACH_COLUMNS}
+                ),
+                c AS (
+                    SELECT * FROM upd
+                    UNION ALL
+                    SELECT {COACH_COLUMNS} FROM public."Coaches"
+                    WHERE coach_id = $1 AND NOT EXISTS (SELECT 1 FROM upd)
+                ),
+                u AS (SELECT {COACH_USER_COLUMNS} FROM public."Users" WHERE user_id = $1)
+                {COACH_READ_FROM_CTES}
                 ''',
                 coach_id
             )
-            if not row:
+            if not full:
                 raise HTTPException(status_code=404, detail="Coach not found")
-
-            if row["isverified"] is True:
-                # Idempotent: already verified — return full resource
-                full = await connection.fetchrow(
-                    '''
-                    SELECT
-                      c.coach_id, c.experience_yrs, c.certifications, c.isverified,
-                      c.hourly_rate, c.created_at,
-                      u.first_name, u.last_name, u.avatar_url, u.bio, u.favorite_sport, u.email
-                    FROM public."Coaches" c
-                    LEFT JOIN public."Users" u ON c.coach_id = u.user_id
-                    WHERE c.coach_id = $1
-                    ''',
-                    coach_id
-                )
-                return CoachRead(**dict(full))
-
-            # Transition pending(False) -> verified(True)
-            updated = await connection.fetchrow(
-                '''
-                UPDATE public."Coaches"
-                SET isverified = TRUE
-                WHERE coach_id = $1
-                RETURNING coach_id, experience_yrs, certifications, isverified, hourly_rate, created_at
-                ''',
-                coach_id
-            )
-
-            # Return the joined shape your GETs already use
-            full = await connection.fetchrow(
-                '''
-                SELECT
-                  c.coach_id, c.experience_yrs, c.certifications, c.isverified,
-                  c.hourly_rate, c.created_at,
-                  u.first_name, u.last_name, u.avatar_url, u.bio, u.favorite_sport, u.email
-                FROM public."Coaches" c
-                LEFT JOIN public."Users" u ON c.coach_id = u.user_id
-                WHERE c.coach_id = $1
-                ''',
-                updated["coach_id"]
-            )
-
             return CoachRead(**dict(full))
     except HTTPException:
         raise
@@ -1299,6 +1357,7 @@ async def verify_coach(coach_id: int, body: CoachVerifyUpdate):
     
 
 @app.post("/coaches/request-verification", status_code=201)
+@Database.writes(topics=("coaches",))
 async def request_coach_verification(
     coach_id: int = Form(...),
     message: str = Form(""),
@@ -1306,46 +1365,56 @@ async def request_coach_verification(
 ):
     """
     Coaches submit a verification request (SCRUM-157)
-    Supports multiple file uploads.
+    Supports multiple file uploads. Files are streamed to content-addressed
+    storage (identical files are kept once) and recorded in
+    Coach_verification_documents.
     """
     try:
         # ✅ 1) verify coach exists
         async with Database.pool.acquire() as connection:
-            exists = await connection.fetchrow(
-                'SELECT coach_id FROM public."Coaches" WHERE coach_id = $1 LIMIT 1',
+            exists = await queries.fetchrow(
+                connection, queries.COACH_EXISTS,
                 coach_id
             )
             if not exists:
                 raise HTTPException(status_code=404, detail="Coach not found")
 
-        # ✅ 2) save uploaded files
-        upload_paths = []
+        # ✅ 2) stream uploaded files to storage (no DB connection held meanwhile)
+        stored = []
         if documents:
-            folder = "uploads/verification_docs"
-            os.makedirs(folder, exist_ok=True)
+            storage = get_storage()
             for doc in documents:
-                filename = f"{coach_id}_{int(datetime.utcnow().timestamp())}_{doc.filename}"
-                path = os.path.join(folder, filename)
-                with open(path, "wb") as buffer:
-                    shutil.copyfileobj(doc.file, buffer)
-                upload_paths.append(path)
+                obj = await storage.save_upload(doc, prefix="verification_docs")
+                stored.append((obj, doc.filename))
 
-        # ✅ 3) insert request into DB
+        # ✅ 3) insert request + document rows into DB
         async with Database.pool.acquire() as connection:
-            await connection.execute(
-                '''
-                INSERT INTO public."Coach_verification_requests" (coach_id, message, document_url, status)
-                VALUES ($1, $2, $3, 'pending')
-                ''',
-                coach_id, message, ", ".join(upload_paths) if upload_paths else None
-            )
+            async with connection.transaction():
+                await queries.execute(
+                    connection, queries.COACH_VERIFICATION_REQUEST_INSERT,
+                    coach_id, message
+                )
+                if stored:
+                    await connection.executemany(
+                        '''
+                        INSERT INTO public."Coach_verification_documents"
+                            (coach_id, sha256, storage_key, original_filename, content_type, size_bytes)
+                        VALUES ($1, $2, $3, $4, $5, $6)
+                        ON CONFLICT (coach_id, sha256) DO NOTHING
+                        ''',
+                        [(coach_id, obj.sha256, obj.key, filename, obj.content_type, obj.size)
+                         for obj, filename in stored]
+                    )
 
         return {
             "message": "Verification request submitted successfully!",
             "coach_id": coach_id,
-            "documents_saved": len(upload_paths)
+            "documents_saved": len(stored),
+            "documents": [obj.sha256 for obj, _ in stored]
         }
 
+    except FileTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -1353,20 +1422,90 @@ async def request_coach_verification(
         raise HTTPException(status_code=500, detail="Failed to submit verification request")
 
 
+@app.get("/coaches/{coach_id}/verification-documents")
+async def list_verification_documents(coach_id: int):
+    try:
+        async with Database.pool.acquire() as connection:
+            rows = await queries.fetch(
+                connection, queries.COACH_VERIFICATION_DOCUMENTS,
+                coach_id
+            )
+            return [dict(r) for r in rows]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/coaches/{coach_id}/verification-documents/{document_id}")
+async def download_verification_document(coach_id: int, document_id: int):
+    try:
+        async with Database.pool.acquire() as connection:
+            doc = await queries.fetchrow(
+                connection, queries.COACH_VERIFICATION_DOCUMENT,
+                coach_id, document_id
+            )
+        if not doc:
+            raise HTTPException(status_code=404, detail="Document not found")
+        storage = get_storage()
+        if not await storage.exists(doc["storage_key"]):
+            raise HTTPException(status_code=404, detail="Document file missing from storage")
+        filename = (doc["original_filename"] or "document").replace('"', "")
+        return StreamingResponse(
+            storage.read_chunks(doc["storage_key"]),
+            media_type=doc["content_type"] or "application/octet-stream",
+            headers={
+                "Content-Length": str(doc["size_bytes"]),
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
     
 #USER_STATS endpoints
 @app.get("/user_stats", response_model=List[UserStatRead])
-async def get_user_stats():
+@Database.read_only("user_id")
+async def get_user_stats(
+    response: Response,
+    user_id: Optional[int] = None,
+    sport_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    after = decode_cursor(cursor, int, int)
     try:
         async with Database.pool.acquire() as connection:
+            conditions, params = [], []
+            if user_id is not None:
+                params.append(user_id)
+                conditions.append(f"user_id = ${len(params)}")
+            if sport_id is not None:
+                params.append(sport_id)
+                conditions.append(f"sport_id = ${len(params)}")
+            if after:
+                params += list(after)
+                conditions.append(f"(user_id, sport_id) > (${len(params) - 1}, ${len(params)})")
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            params.append(limit + 1)
             rows = await connection.fetch(
-                '''
-                SELECT user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level
+                f'''
+                SELECT user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level,
+                       joins_total, games_attended, games_left
                 FROM public."User_stats"
-                '''
+                {where}
+                ORDER BY user_id, sport_id
+                LIMIT ${len(params)}
+                ''',
+                *params,
             )
-            stats = [UserStatRead(**dict(row)) for row in rows]
-            return stats
+            rows = page_rows(rows, limit, response, lambda r: (r["user_id"], r["sport_id"]))
+            return rows_response(rows, UserStatRead, response=response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1393,11 +1532,14 @@ async def create_user_stat(stat: UserStatCreate):
                 stat.level
             )
             return UserStatRead(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/game-instances", response_model=GameInstanceResponse)
+@Database.writes(topics=("games",))
 async def create_game_instance(game: GameInstanceCreate):
     try:
         async with Database.pool.acquire() as connection:
@@ -1439,14 +1581,25 @@ async def create_game_instance(game: GameInstanceCreate):
                 xp_delta=XP_REWARDS["host_game"]
             )
             return GameInstanceResponse(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
+BOOKING_FIELDS = (
+    "game_id", "location", "start_time", "duration_minutes", "skill_level",
+    "max_players", "status", "sport_id", "coach_first_name", "coach_last_name",
+    "sport_name", "participants_count", "joined_at",
+)
+
+
 @app.post("/book-session", status_code=201)
+@Database.writes(lambda kw: kw["user_id"], topics=("games",))
 async def book_session(
     game_id: int = Body(..., embed=True),
-    user_id: int = Body(..., embed=True)
+    user_id: int = Body(..., embed=True),
+    uow: Database.UnitOfWork = Depends(Database.unit_of_work),
 ):
     """
     Book a session for a user (SCRUM-156)
@@ -1454,115 +1607,44 @@ async def book_session(
     - Ensures the session isn't full.
     - Adds the user as a participant.
     - Returns game + booking info.
+    The booking and the join counter commit together.
     """
-    try:
-        async with Database.pool.acquire() as connection:
-            # 1️⃣ Ensure game exists
-            game = await connection.fetchrow(
-                '''
-                SELECT gi.*, 
-                       COALESCE(gp_count.cnt, 0) AS participants_count
-                FROM public."Game_instance" AS gi
-                LEFT JOIN (
-                    SELECT game_id, COUNT(*) AS cnt 
-                    FROM public."Game_participants"
-                    GROUP BY game_id
-                ) AS gp_count ON gp_count.game_id = gi.game_id
-                WHERE gi.game_id = $1
-                ''',
-                game_id
-            )
-            if not game:
-                raise HTTPException(status_code=404, detail="Session not found")
-
-            if game["status"].lower() != "open":
-                raise HTTPException(status_code=400, detail="This session is not open for booking")
-
-            if game["participants_count"] >= game["max_players"]:
-                raise HTTPException(status_code=400, detail="This session is already full")
-
-            # 2️⃣ Ensure user exists and get email/first_name for email
-            user = await connection.fetchrow(
-                'SELECT user_id, email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
-                user_id
-            )
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-
-            # 3️⃣ Check if user already joined
-            existing = await connection.fetchrow(
-                '''
-                SELECT 1 FROM public."Game_participants"
-                WHERE game_id = $1 AND user_id = $2
-                ''',
-                game_id, user_id
-            )
-            if existing:
-                raise HTTPException(status_code=400, detail="User already booked this session")
-
-            # 4️⃣ Insert into Game_participants
-            await connection.execute(
-                '''
-                INSERT INTO public."Game_participants" (game_id, user_id, role, joined_at)
-                VALUES ($1, $2, 'PLAYER', NOW())
-                ''',
-                game_id, user_id
-            )
-
-            # 5️⃣ Return full booking info
-            booking = await connection.fetchrow(
-                '''
-                SELECT 
-                    gi.game_id, gi.location, gi.start_time, gi.duration_minutes,
-                    gi.skill_level, gi.max_players, gi.status, gi.sport_id,
-                    u.first_name AS coach_first_name, u.last_name AS coach_last_name,
-                    s.name AS sport_name
-                FROM public."Game_instance" AS gi
-                JOIN public."Users" AS u ON u.user_id = gi.host_id
-                JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
-                WHERE gi.game_id = $1
-                ''',
-                game_id
-            )
-
-            # 6️⃣ Send email notification when user successfully books session
-            try:
-                user_email = user["email"]
-                first_name = user["first_name"] or "Player"
-                sport_name = booking["sport_name"] or "Game"
-                location = booking["location"] or "Location TBD"
-                
-                # Format start_time
-                start_time_dt = booking["start_time"]
-                if isinstance(start_time_dt, datetime):
-                    start_time_str = start_time_dt.strftime("%A, %B %d, %Y at %I:%M %p")
-                else:
-                    start_time_str = str(start_time_dt)
-                
-                frontend_url = os.getenv("APP_URL") or os.getenv("FRONTEND_URL", "https://cmps271-group3-cbl2.vercel.app")
-                dashboard_url = f"{frontend_url}/dashboard"
-                
-                context = {
-                    "first_name": first_name,
-                    "sport_name": sport_name,
-                    "location": location,
-                    "start_time": start_time_str,
-                    "duration_minutes": booking["duration_minutes"],
-                    "skill_level": booking["skill_level"] or "N/A",
-                    "dashboard_url": dashboard_url,
-                }
-                html = render_template("PlayConnect_API/templates/emails/game_joined.html", context)
-                await send_email(user_email, f"Successfully Joined {sport_name} Game!", html)
-            except Exception as email_err:
-                # Log but don't fail the request if email fails
-                print(f"[WARNING] Failed to send book session email: {repr(email_err)}")
+    async def work(connection):
+        # 1️⃣ Lock the game, check capacity, insert and fetch booking info atomically
+        result = await book_spot(connection, game_id, user_id)
+        if result.outcome == booking_engine.GAME_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if result.outcome == booking_engine.NOT_OPEN:
+            raise HTTPException(status_code=400, detail="This session is not open for booking")
+        if result.outcome == booking_engine.USER_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="User not found")
+        if result.outcome == booking_engine.ALREADY_BOOKED:
+            raise HTTPException(status_code=400, detail="User already booked this session")
+        if result.outcome == booking_engine.FULL:
+            raise HTTPException(status_code=400, detail="This session is already full")
+
+        row = result.booking
+        booking = {key: row[key] for key in BOOKING_FIELDS}
+        await upsert_user_stats_delta(connection, user_id=user_id, sport_id=row["sport_id"], joins_delta=1)
+
+        # 2️⃣ Email the confirmation once the transaction has committed
+        uow.after_commit(
+            send_game_email,
+            "game_joined.html",
+            "Successfully Joined {sport_name} Game!",
+            row["user_email"],
+            row["user_first_name"],
+            booking,
+        )
 
-            return {
-                "message": "Session booked successfully!",
-                "booking": dict(booking),
-                "user_id": user_id
-            }
+        return {
+            "message": "Session booked successfully!",
+            "booking": booking,
+            "user_id": user_id
+        }
 
+    try:
+        return await uow.run(work)
     except HTTPException:
         raise
     except Exception as e:
@@ -1571,6 +1653,7 @@ async def book_session(
 
 
 @app.put("/game-instances/{game_id}", response_model=GameInstanceResponse)
+@Database.writes(topics=("games",))
 async def update_game_instance(game_id: int, game: GameInstanceCreate):
     try:
         async with Database.pool.acquire() as connection:
@@ -1617,11 +1700,18 @@ async def update_game_instance(game_id: int, game: GameInstanceCreate):
                 raise HTTPException(status_code=404, detail="Game instance not found")
             
             return GameInstanceResponse(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/game-instances", response_model=List[GameInstanceResponse])
-async def get_game_instances():
+async def get_game_instances(
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    after = decode_cursor(cursor, datetime.fromisoformat, int)
     try:
         # Archive past games automatically before fetching
         try:
@@ -1631,14 +1721,24 @@ async def get_game_instances():
             print(f"Warning: Failed to archive past games: {e}")
         
         async with Database.pool.acquire() as connection:
-            # Filter out past games: only show games where start_time + duration_minutes >= NOW()
-            query = '''
+            # Filter out past games: only show games that haven't ended (end_time is indexed)
+            params = [limit + 1]
+            keyset = ""
+            if after:
+                params += list(after)
+                keyset = "AND (created_at, game_id) < ($2, $3)"
+            query = f'''
                 SELECT * FROM public."Game_instance"
-                WHERE (start_time + INTERVAL '1 minute' * duration_minutes) >= NOW()
-                ORDER BY created_at DESC
+                WHERE end_time >= NOW()
+                {keyset}
+                ORDER BY created_at DESC, game_id DESC
+                LIMIT $1
             '''
-            rows = await connection.fetch(query)
-            return [GameInstanceResponse(**dict(row)) for row in rows]
+            rows = await connection.fetch(query, *params)
+            rows = page_rows(rows, limit, response, lambda r: (r["created_at"], r["game_id"]))
+            return rows_response(rows, GameInstanceResponse, response=response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1647,11 +1747,12 @@ async def get_game_instances():
 async def get_game_instance(game_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            query = 'SELECT * FROM public."Game_instance" WHERE game_id = $1'
-            row = await connection.fetchrow(query, game_id)
+            row = await queries.fetchrow(connection, queries.GAME_BY_ID, game_id)
             if row is None:
                 raise HTTPException(status_code=404, detail="Game instance not found")
             return GameInstanceResponse(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1665,23 +1766,7 @@ async def api_get_game_participants(game_id: int):
     """
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch(
-                '''
-                SELECT 
-                    gp.participant_id,
-                    gp.game_id,
-                    gp.user_id,
-                    gp.joined_at,
-                    u.first_name,
-                    u.last_name,
-                    u.email
-                FROM public."Game_participants" AS gp
-                JOIN public."Users" AS u ON u.user_id = gp.user_id
-                WHERE gp.game_id = $1
-                ORDER BY gp.joined_at ASC
-                ''',
-                game_id,
-            )
+            rows = await queries.fetch(connection, queries.GAME_PARTICIPANTS, game_id)
             data = [dict(r) for r in rows]
             # normalize a handy display name
             for row in data:
@@ -1689,6 +1774,8 @@ async def api_get_game_participants(game_id: int):
                 ln = row.get("last_name") or ""
                 row["name"] = (fn + " " + ln).strip() or row.get("email")
             return data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1699,27 +1786,31 @@ async def api_get_game_participants(game_id: int):
 class WaitlistUserBody(BaseModel):
     user_id: int
 
-@app.get("/game-instances/{game_id}/waitlist")
-async def api_get_game_waitlist(game_id: int):
+@app.get("/game-instances/{game_id}/waitlist", response_model=List[WaitlistPosition])
+async def api_get_game_waitlist(
+    game_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
     """
-    Return waitlist entries for a single game instance, ordered by joined_at.
+    Return the waiting queue for a single game instance, ordered by joined_at,
+    with each entry's 1-based position. Admitted users are in the game, not the
+    queue. Next page (if any) is in the X-Next-Cursor header.
     """
+    after = decode_cursor(cursor, datetime.fromisoformat, int, int)
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch(
-                '''
-                SELECT game_id, user_id, joined_at, admitted
-                FROM public."Waitlist"
-                WHERE game_id = $1
-                ORDER BY joined_at ASC
-                ''',
-                game_id,
-            )
-            return [dict(r) for r in rows]
+            rows = await fetch_game_queue(connection, game_id, limit + 1, after)
+            rows = page_rows(rows, limit, response, lambda r: (r["joined_at"], r["user_id"], r["position"]))
+            return [WaitlistPosition(**dict(r)) for r in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/game-instances/{game_id}/waitlist", status_code=201)
+@Database.writes(lambda kw: kw["body"].user_id)
 async def api_join_game_waitlist(game_id: int, body: WaitlistUserBody):
     """
     Add a user to the waitlist for a game (idempotent).
@@ -1727,23 +1818,21 @@ async def api_join_game_waitlist(game_id: int, body: WaitlistUserBody):
     try:
         async with Database.pool.acquire() as connection:
             # ensure game exists
-            exists = await connection.fetchrow(
-                'SELECT game_id FROM public."Game_instance" WHERE game_id = $1 LIMIT 1',
+            exists = await queries.fetchrow(
+                connection, queries.GAME_EXISTS,
                 game_id,
             )
             if not exists:
                 raise HTTPException(status_code=404, detail="Game not found")
 
-            result = await connection.execute(
-                '''
-                INSERT INTO public."Waitlist" (game_id, user_id, joined_at, admitted)
-                VALUES ($1, $2, NOW(), FALSE)
-                ON CONFLICT (game_id, user_id) DO NOTHING
-                ''',
+            result = await queries.execute(
+                connection, queries.WAITLIST_JOIN,
                 game_id,
                 body.user_id,
             )
-            inserted = result and result.startswith("INSERT")
+            # "INSERT 0 1" for a new or re-queued (previously admitted) entry,
+            # "INSERT 0 0" when the user is still waiting
+            inserted = result and result.split(" ")[-1] != "0"
             return {
                 "message": "Joined waitlist" if inserted else "Already on waitlist",
                 "game_id": game_id,
@@ -1755,14 +1844,15 @@ async def api_join_game_waitlist(game_id: int, body: WaitlistUserBody):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/game-instances/{game_id}/waitlist/{user_id}", status_code=200)
+@Database.writes(lambda kw: kw["user_id"])
 async def api_leave_game_waitlist(game_id: int, user_id: int):
     """
     Remove user from a game's waitlist.
     """
     try:
         async with Database.pool.acquire() as connection:
-            result = await connection.execute(
-                'DELETE FROM public."Waitlist" WHERE game_id = $1 AND user_id = $2',
+            result = await queries.execute(
+                connection, queries.WAITLIST_LEAVE,
                 game_id,
                 user_id,
             )
@@ -1787,14 +1877,10 @@ async def login(login_request: LoginRequest, request: Request):
     check_login_attempt(email)
 
     try:
-        async with Database.pool.acquire() as connection:
+        async with Database.scope() as scope:
+            connection = scope.connection
             # Query user by email including verification status
-            query = '''
-                SELECT user_id, email, password, role, first_name, last_name, isverified
-                FROM public."Users"
-                WHERE LOWER(email) = LOWER($1)
-            '''
-            user = await connection.fetchrow(query, login_request.email)
+            user = await queries.fetchrow(connection, queries.USER_BY_EMAIL_FOR_LOGIN, login_request.email)
 
             # -----------------------------
             # ADD: record failed login if user not found
@@ -1820,12 +1906,14 @@ async def login(login_request: LoginRequest, request: Request):
 
             # Check if email is verified
             if not user["isverified"]:
-                await send_verification_email(connection, user["user_id"], user["email"], user["first_name"])
+                # Sent after the connection is released; the 403 still goes out
+                scope.after_release(send_verification_email, user["user_id"], user["email"], user["first_name"])
                 raise HTTPException(
                     status_code=403,
                     detail="Please verify your email address. A verification email has been sent to your inbox."
                 )
 
+            await streaks.record_login(connection, user["user_id"], user["timezone"])
             await log_activity(connection, user["user_id"], "login")
             await ensure_user_badges(connection, user["user_id"])
 
@@ -1861,9 +1949,11 @@ async def login(login_request: LoginRequest, request: Request):
 async def get_sports():
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch('SELECT * FROM public."Sports" ORDER BY name')
+            rows = await queries.fetch(connection, queries.SPORTS_ALL)
             sports = [SportRead(**dict(row)) for row in rows]
             return sports
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1874,35 +1964,28 @@ class WaitlistJoinRequest(BaseModel):
     user_id: int
 
 
-class WaitlistEntryRead(BaseModel):
-    game_id: int
-    user_id: int
-    joined_at: datetime
-    admitted: bool
-
-
 @app.post("/waitlist", status_code=201)
+@Database.writes(lambda kw: kw["payload"].user_id)
 async def join_waitlist(payload: WaitlistJoinRequest):
     try:
         async with Database.pool.acquire() as connection:
             # Ensure game exists
-            game = await connection.fetchrow(
-                'SELECT game_id FROM public."Game_instance" WHERE game_id = $1 LIMIT 1',
+            game = await queries.fetchrow(
+                connection, queries.GAME_EXISTS,
                 payload.game_id,
             )
             if not game:
                 raise HTTPException(status_code=404, detail="Game not found")
 
-            # Insert into waitlist; ignore if already present
-            result = await connection.execute(
-                'INSERT INTO public."Waitlist" (game_id, user_id, joined_at, admitted)\n'
-                'VALUES ($1, $2, NOW(), FALSE)\n'
-                'ON CONFLICT (game_id, user_id) DO NOTHING',
+            # Insert into waitlist; ignore if already waiting, re-queue at the
+            # back if an earlier entry was admitted (the user left the game since)
+            result = await queries.execute(
+                connection, queries.WAITLIST_JOIN,
                 payload.game_id,
                 payload.user_id,
             )
 
-            inserted = result and result.startswith("INSERT")
+            inserted = result and result.split(" ")[-1] != "0"
             return {
                 "message": "Joined waitlist" if inserted else "Already on waitlist",
                 "game_id": payload.game_id,
@@ -1914,40 +1997,33 @@ async def join_waitlist(payload: WaitlistJoinRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/waitlist", response_model=List[WaitlistEntryRead])
-async def get_waitlist(game_id: Union[int, None] = None, user_id: Union[int, None] = None):
-    try:
-        async with Database.pool.acquire() as connection:
-            query = 'SELECT game_id, user_id, joined_at, admitted FROM public."Waitlist"'
-            conditions = []
-            params = []
-
-            if game_id is not None:
-                conditions.append(f"game_id = ${len(params) + 1}")
-                params.append(game_id)
-
-            if user_id is not None:
-                conditions.append(f"user_id = ${len(params) + 1}")
-                params.append(user_id)
-
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-
-            query += " ORDER BY joined_at ASC"
-
-            rows = await connection.fetch(query, *params)
-            return [WaitlistEntryRead(**dict(row)) for row in rows]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
+@app.get("/waitlist", response_model=List[WaitlistPosition])
+async def get_waitlist(
+    response: Response,
+    game_id: Union[int, None] = None,
+    user_id: Union[int, None] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    Waitlist read model with queue positions.
+      - game_id only: that game's waiting queue (same as /game-instances/{id}/waitlist)
+      - user_id (optionally with game_id): the user's waitlists and their place in each
+    At least one filter is required; the whole table is never returned.
+    """
+    if game_id is None and user_id is None:
+        raise HTTPException(status_code=400, detail="game_id or user_id is required")
+    if user_id is None:
+        return await api_get_game_waitlist(game_id, response, limit, cursor)
 
-@app.get("/waitlist", response_model=List[WaitlistRead])
-async def get_waitlist():
+    after = decode_cursor(cursor, datetime.fromisoformat, int)
     try:
         async with Database.pool.acquire() as connection:
-            query = 'SELECT * FROM public."Waitlist" ORDER BY joined_at DESC'
-            rows = await connection.fetch(query)
-            return [WaitlistRead(**dict(row)) for row in rows]
+            rows = await fetch_user_waitlists(connection, user_id, limit + 1, after, game_id=game_id)
+            rows = page_rows(rows, limit, response, lambda r: (r["joined_at"], r["game_id"]))
+            return [WaitlistPosition(**dict(r)) for r in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1956,8 +2032,8 @@ async def get_waitlist():
 async def leave_waitlist(game_id: int, user_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            result = await connection.execute(
-                'DELETE FROM public."Waitlist" WHERE game_id = $1 AND user_id = $2',
+            result = await queries.execute(
+                connection, queries.WAITLIST_LEAVE,
                 game_id,
                 user_id,
             )
@@ -1975,32 +2051,40 @@ async def leave_waitlist(game_id: int, user_id: int):
 
 
 @app.delete("/waitlist/by-user", status_code=200)
+@Database.writes(lambda kw: kw["user_id"])
 async def remove_user_from_waitlist(user_id: int, game_id: Union[int, None] = None):
     try:
         async with Database.pool.acquire() as connection:
-            if game_id is None:
-                result = await connection.execute(
-                    'DELETE FROM public."Waitlist" WHERE user_id = $1',
-                    user_id,
-                )
-            else:
-                result = await connection.execute(
-                    'DELETE FROM public."Waitlist" WHERE user_id = $1 AND game_id = $2',
-                    user_id,
-                    game_id,
-                )
-
-            deleted_count_str = result.split(" ")[-1]
-            deleted_count = int(deleted_count_str) if deleted_count_str.isdigit() else 0
-
-            if deleted_count == 0:
-                raise HTTPException(status_code=404, detail="No waitlist entries found for user")
+            async with connection.transaction():
+                if game_id is None:
+                    rows = await queries.fetch(
+                        connection, queries.WAITLIST_REMOVE_USER,
+                        user_id,
+                    )
+                else:
+                    rows = await queries.fetch(
+                        connection, queries.WAITLIST_REMOVE_USER_GAME,
+                        user_id,
+                        game_id,
+                    )
+
+                deleted_count = len(rows)
+                if deleted_count == 0:
+                    raise HTTPException(status_code=404, detail="No waitlist entries found for user")
+
+                # Re-run promotion for each touched game; no-op when there is no free spot
+                promoted = {}
+                for game in sorted({r["game_id"] for r in rows}):
+                    admitted = await promote_from_waitlist(connection, game)
+                    if admitted:
+                        promoted[game] = admitted
 
             return {
                 "message": "Removed from waitlist",
                 "user_id": user_id,
                 "game_id": game_id,
                 "deleted": deleted_count,
+                "promoted": promoted,
             }
     except HTTPException:
         raise
@@ -2009,35 +2093,38 @@ async def remove_user_from_waitlist(user_id: int, game_id: Union[int, None] = No
     
 
 @app.delete("/game-instances/{game_id}", status_code=200)
-async def delete_game_instance(game_id: int):
-    try:
-        async with Database.pool.acquire() as connection:
-            existing = await connection.fetchrow(
-                'SELECT game_id, host_id, sport_id FROM public."Game_instance" WHERE game_id = $1',
-                game_id
-            )
-            
-            if not existing:
-                raise HTTPException(status_code=404, detail="Game instance not found")
-            
-            await connection.execute(
-                'DELETE FROM public."Game_instance" WHERE game_id = $1',
-                game_id
+@Database.writes(topics=("games",))
+async def delete_game_instance(game_id: int, uow: Database.UnitOfWork = Depends(Database.unit_of_work)):
+    async def work(connection):
+        existing = await queries.fetchrow(
+            connection, queries.GAME_HOST_SPORT,
+            game_id
+        )
+        
+        if not existing:
+            raise HTTPException(status_code=404, detail="Game instance not found")
+        
+        await queries.execute(
+            connection, queries.GAME_DELETE,
+            game_id
+        )
+
+        if existing["host_id"]:
+            await apply_progress(
+                connection,
+                user_id=existing["host_id"],
+                sport_id=existing["sport_id"],
+                games_hosted_delta=-1,
+                xp_delta=-XP_REWARDS["host_game"]
             )
+        
+        return {
+            "message": "Game instance deleted successfully",
+            "game_id": game_id
+        }
 
-            if existing["host_id"]:
-                await apply_progress(
-                    connection,
-                    user_id=existing["host_id"],
-                    sport_id=existing["sport_id"],
-                    games_hosted_delta=-1,
-                    xp_delta=-XP_REWARDS["host_game"]
-                )
-            
-            return {
-                "message": "Game instance deleted successfully",
-                "game_id": game_id
-            }
+    try:
+        return await uow.run(work)
     except HTTPException:
         raise
     except Exception as e:
@@ -2046,12 +2133,14 @@ async def delete_game_instance(game_id: int):
 from typing import Optional
 
 @app.get("/dashboard/games")
+@Database.read_only("user_id", topics=("games",))
 async def dashboard_games(
+    user_id: Optional[int] = None,           # caller, for read-your-writes routing
     sport_id: Optional[int] = None,
     status: Optional[str] = None,
     skill_level: Optional[str] = None,
     host_id: Optional[int] = None,
-    search: Optional[str] = None,        # matches location or notes (ILIKE)
+    search: Optional[str] = None,        # matches location or notes (prefix/substring, indexed)
     from_: Optional[str] = None,         # ISO datetime string (e.g., 2025-10-06T18:00:00Z)
     to: Optional[str] = None,            # ISO datetime string
     spots: Optional[str] = None,         # "available" | "full"
@@ -2065,9 +2154,9 @@ async def dashboard_games(
     Query params:
       - sport_id, status, skill_level, host_id
       - from_ (start_time >=), to (start_time <=)
-      - search (ILIKE over location + notes)
+      - search (prefix/substring match over location + notes)
       - spots: "available" (players < max) or "full" (players >= max)
-      - sort: "start_time:asc|desc" or "created_at:asc|desc"
+      - sort: "start_time:asc|desc", "created_at:asc|desc" or "relevance" (with search)
       - page (1-based), page_size
     """
     try:
@@ -2093,26 +2182,31 @@ async def dashboard_games(
         order_by_sql = allowed_sort.get(sort or "", 'gi.start_time ASC')
 
         # --- base SELECT w/ participant count and spots_left ---
-        # count players via LEFT JOIN subquery; adjust if you want to exclude HOST
+        # count players per matching game (LATERAL, served by the (game_id, user_id)
+        # key) instead of aggregating all of Game_participants; adjust if you want
+        # to exclude HOST
         base_select = '''
             SELECT
-                gi.*,
+                gi.game_id, gi.host_id, gi.sport_id, gi.start_time, gi.duration_minutes,
+                gi.end_time, gi.location, gi.skill_level, gi.max_players, gi.cost,
+                gi.status, gi.notes, gi.created_at, gi.updated_at,
                 COALESCE(gpc.cnt, 0) AS participants_count,
                 (gi.max_players - COALESCE(gpc.cnt, 0)) AS spots_left
             FROM public."Game_instance" AS gi
-            LEFT JOIN (
-                SELECT gp.game_id, COUNT(*) AS cnt
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) AS cnt
                 FROM public."Game_participants" AS gp
-                GROUP BY gp.game_id
-            ) AS gpc ON gpc.game_id = gi.game_id
+                WHERE gp.game_id = gi.game_id
+            ) AS gpc ON TRUE
         '''
 
         # --- dynamic WHERE ---
         conditions = []
         params = []
 
-        # Filter out past games: only show games where start_time + duration_minutes >= NOW()
-        conditions.append("(gi.start_time + INTERVAL '1 minute' * gi.duration_minutes) >= NOW()")
+        # Filter out past games; with sport_id/status this is a range scan of
+        # idx_game_instance_sport_status_end
+        conditions.append("gi.end_time >= NOW()")
 
         if sport_id is not None:
             conditions.append(f"gi.sport_id = ${len(params) + 1}")
@@ -2139,11 +2233,9 @@ async def dashboard_games(
             conditions.append(f"gi.start_time <= ${len(params) + 1}")
             params.append(to)
 
-        if search:
-            conditions.append(
-                f"(gi.location ILIKE ${len(params) + 1} OR gi.notes ILIKE ${len(params) + 1})"
-            )
-            params.append(f"%{search}%")
+        terms = parse_search(search)
+        if terms:
+            conditions.append(search_predicate("gi", terms, params))
 
         if spots:
             if spots.lower() == "available":
@@ -2156,6 +2248,11 @@ async def dashboard_games(
         if conditions:
             where_sql = " WHERE " + " AND ".join(conditions)
 
+        # relevance ordering adds its own params, so the COUNT query gets the filter params only
+        count_params = list(params)
+        if terms and sort == "relevance":
+            order_by_sql = f"{search_rank('gi', terms, params)} DESC, gi.start_time ASC"
+
         # --- final queries: count + page ---
         count_sql = f'''
             SELECT COUNT(*)::INT AS total
@@ -2174,31 +2271,24 @@ async def dashboard_games(
 
         async with Database.pool.acquire() as connection:
             # total count
-            total_row = await connection.fetchrow(count_sql, *params)
+            total_row = await connection.fetchrow(count_sql, *count_params)
             total = int(total_row["total"]) if total_row else 0
 
-            # page items
+            # page items (Decimal cost is written as a JSON number by the serializer)
             rows = await connection.fetch(page_sql, *params)
             items = [dict(r) for r in rows]
 
-            # optional: normalize/ensure serializable types (e.g., Decimal)
-            for it in items:
-                # Convert Decimal cost -> float for JSON friendliness (optional)
-                if "cost" in it and it["cost"] is not None:
-                    try:
-                        it["cost"] = float(it["cost"])
-                    except Exception:
-                        pass
-
             has_next = (offset + len(items)) < total
 
-            return {
+            return json_response({
                 "items": items,
                 "page": page,
                 "page_size": page_size,
                 "total": total,
                 "has_next": has_next,
-            }
+            })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -2209,7 +2299,8 @@ async def create_report(report: ReportCreate):
     Create a new report entry (SCRUM-103)
     """
     try:
-        async with Database.pool.acquire() as connection:
+        async with Database.scope() as scope:
+            connection = scope.connection
             query = '''
                 INSERT INTO public."Reports" (reporter_id, reported_user_id, report_game_id, reason, created_at)
                 VALUES ($1, $2, $3, $4, NOW())
@@ -2228,13 +2319,13 @@ async def create_report(report: ReportCreate):
             # --- Send confirmation email ---
             try:
                 # Fetch reporter info
-                user_row = await connection.fetchrow(
-                    'SELECT email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
+                user_row = await queries.fetchrow(
+                    connection, queries.USER_EMAIL_NAME,
                     report.reporter_id
                 )
                 # Fetch reported user info
-                reported_row = await connection.fetchrow(
-                    'SELECT first_name FROM public."Users" WHERE user_id = $1 LIMIT 1',
+                reported_row = await queries.fetchrow(
+                    connection, queries.USER_FIRST_NAME,
                     report.reported_user_id
                 )
 
@@ -2250,9 +2341,10 @@ async def create_report(report: ReportCreate):
                         "reason": report.reason
                     }
                     html = render_template("PlayConnect_API/templates/emails/report_receipt.html", context)
-                    await send_email(user_email, "Your report has been received", html)
+                    # delivered once the connection is back in the pool
+                    scope.after_release(send_email, user_email, "Your report has been received", html)
             except Exception as email_err:
-                print(f"[DEV ONLY] Failed to send report receipt email: {repr(email_err)}")
+                print(f"[DEV ONLY] Failed to prepare report receipt email: {repr(email_err)}")
 
             return ReportRead(**dict(row))
     except HTTPException:
@@ -2261,20 +2353,34 @@ async def create_report(report: ReportCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/reports", response_model=List[ReportRead])
-async def get_reports():
+async def get_reports(
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
     """
-    Retrieve all report entries (SCRUM-104)
+    Retrieve report entries, newest first, one page at a time (SCRUM-104)
     """
+    after = decode_cursor(cursor, datetime.fromisoformat, int)
     try:
         async with Database.pool.acquire() as connection:
-            query = '''
+            params = [limit + 1]
+            keyset = ""
+            if after:
+                params += list(after)
+                # created_at is nullable: NULLs sort last as -infinity, and a
+                # cursor taken on such a row carries null
+                keyset = "WHERE (COALESCE(created_at, '-infinity'), report_id) < (COALESCE($2::timestamp, '-infinity'), $3)"
+            query = f'''
                 SELECT report_id, reporter_id, reported_user_id, report_game_id, reason, created_at
                 FROM public."Reports"
-                ORDER BY created_at DESC
+                {keyset}
+                ORDER BY COALESCE(created_at, '-infinity') DESC, report_id DESC
+                LIMIT $1
             '''
-            rows = await connection.fetch(query)
-            reports = [ReportRead(**dict(row)) for row in rows]
-            return reports
+            rows = await connection.fetch(query, *params)
+            rows = page_rows(rows, limit, response, lambda r: (r["created_at"], r["report_id"]))
+            return rows_response(rows, ReportRead, response=response)
     except HTTPException:
         raise
     except Exception as e:
@@ -2287,12 +2393,7 @@ async def get_report_by_id(report_id: int):
     """
     try:
         async with Database.pool.acquire() as connection:
-            query = '''
-                SELECT report_id, reporter_id, reported_user_id, report_game_id, reason, created_at
-                FROM public."Reports"
-                WHERE report_id = $1
-            '''
-            row = await connection.fetchrow(query, report_id)
+            row = await queries.fetchrow(connection, queries.REPORT_BY_ID, report_id)
             if not row:
                 raise HTTPException(status_code=404, detail="Report not found")
             return ReportRead(**dict(row))
@@ -2301,6 +2402,9 @@ async def get_report_by_id(report_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+REPORT_UPDATABLE = ("reporter_id", "reported_user_id", "report_game_id", "reason")
+
+
 @app.put("/reports/{report_id}", response_model=ReportRead)
 async def update_report(report_id: int, report_update: ReportUpdate):
     """
@@ -2308,53 +2412,20 @@ async def update_report(report_id: int, report_update: ReportUpdate):
     """
     try:
         async with Database.pool.acquire() as connection:
-            # Check if report exists
-            existing = await connection.fetchrow(
-                'SELECT report_id FROM public."Reports" WHERE report_id = $1 LIMIT 1',
-                report_id
-            )
-            if not existing:
-                raise HTTPException(status_code=404, detail="Report not found")
-
-            update_fields = []
-            values = []
-            param_count = 1
-
-            if report_update.reporter_id is not None:
-                update_fields.append(f"reporter_id = ${param_count}")
-                values.append(report_update.reporter_id)
-                param_count += 1
-
-            if report_update.reported_user_id is not None:
-                update_fields.append(f"reported_user_id = ${param_count}")
-                values.append(report_update.reported_user_id)                  #anoying little shit made me make error reports to make me know what was wrong
-                param_count += 1                                               #also its weird, cuz i made it so that it updates only the changed fields
-                                                                               #cuz its really annoying to update the whole report when only one field is changed
-            if report_update.report_game_id is not None:
-                update_fields.append(f"report_game_id = ${param_count}")
-                values.append(report_update.report_game_id)
-                param_count += 1
-
-            if report_update.reason is not None:
-                update_fields.append(f"reason = ${param_count}")
-                values.append(report_update.reason)
-                param_count += 1
-
-            if not update_fields:
+            fields = changed_fields(report_update, REPORT_UPDATABLE)
+            if not fields:
                 raise HTTPException(status_code=400, detail="No fields provided for update")
-
-            values.append(report_id)
-
+            values = [report_id]
             query = f'''
-                UPDATE public."Reports" 
-                SET {', '.join(update_fields)}
-                WHERE report_id = ${param_count}
+                UPDATE public."Reports"
+                SET {build_set_clause(fields, REPORT_UPDATABLE, values)}
+                WHERE report_id = $1
                 RETURNING report_id, reporter_id, reported_user_id, report_game_id, reason, created_at
             '''
 
             row = await connection.fetchrow(query, *values)
             if not row:
-                raise HTTPException(status_code=500, detail="Failed to update report")
+                raise HTTPException(status_code=404, detail="Report not found")
             return ReportRead(**dict(row))
     except HTTPException:
         raise
@@ -2371,10 +2442,12 @@ def _normalize_metadata(value):
         return value
     return None
 
-def _row_to_notification(row):
-    d = dict(row)
+def _with_metadata(d: dict) -> dict:
     d["metadata"] = _normalize_metadata(d.get("metadata"))
-    return NotificationRead(**d)
+    return d
+
+def _row_to_notification(row):
+    return NotificationRead(**_with_metadata(dict(row)))
 
 @app.post("/notifications", response_model=NotificationRead, status_code=201)
 async def create_notification(notification: NotificationCreate):
@@ -2416,25 +2489,6 @@ async def create_notification(notification: NotificationCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/notifications", response_model=List[NotificationRead])
-async def get_notifications():
-    """
-    Retrieve all notification entries (SCRUM-107)
-    """
-    try:
-        async with Database.pool.acquire() as connection:
-            query = '''
-                SELECT notification_id, user_id, message, type, metadata, is_read, created_at
-                FROM public."Notifications"
-                ORDER BY created_at DESC
-            '''
-            rows = await connection.fetch(query)
-
-            notifications = [_row_to_notification(r) for r in rows]
-            return notifications
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
 @app.get("/notifications/{notification_id}", response_model=NotificationRead)
 async def get_notification_by_id(notification_id: int):
     """
@@ -2459,35 +2513,47 @@ async def get_notification_by_id(notification_id: int):
     
 @app.get("/notifications", response_model=List[NotificationRead])
 async def list_notifications(
-    user_id: int = Query(..., description="Target user"),
+    response: Response,
+    user_id: Optional[int] = Query(None, description="Target user; omit to list every user's (SCRUM-107)"),
     unread_only: bool = Query(False),
     since_id: Optional[int] = Query(None, description="Return rows with id > since_id"),
-    limit: int = Query(20, ge=1, le=100),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
 ):
+    after = decode_cursor(cursor, int)
     try:
         async with Database.pool.acquire() as conn:
-            clauses = ['user_id = $1']
-            params = [user_id]
-            idx = 2
+            clauses = []
+            params = []
+            idx = 1
 
+            if user_id is not None:
+                clauses.append(f'user_id = ${idx}')
+                params.append(user_id); idx += 1
             if unread_only:
                 clauses.append('is_read = FALSE')
             if since_id is not None:
                 clauses.append(f'notification_id > ${idx}')
                 params.append(since_id); idx += 1
+            if after:
+                clauses.append(f'notification_id < ${idx}')
+                params.append(after[0]); idx += 1
 
-            where_sql = " AND ".join(clauses)
+            where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
             rows = await conn.fetch(
                 f'''
                 SELECT notification_id, user_id, message, type, metadata, is_read, created_at
                 FROM public."Notifications"
-                WHERE {where_sql}
+                {where_sql}
                 ORDER BY notification_id DESC
                 LIMIT ${idx}
                 ''',
-                *params, limit
+                *params, limit + 1
             )
-            return [NotificationRead(**dict(r)) for r in rows]
+            rows = page_rows(rows, limit, response, lambda r: (r["notification_id"],))
+            return rows_response(rows, NotificationRead, response=response, transform=_with_metadata)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -2495,15 +2561,7 @@ async def list_notifications(
 async def mark_notification_read(notification_id: int):
     try:
         async with Database.pool.acquire() as conn:
-            row = await conn.fetchrow(
-                '''
-                UPDATE public."Notifications"
-                SET is_read = TRUE
-                WHERE notification_id = $1
-                RETURNING notification_id, user_id, message, type, metadata, is_read, created_at
-                ''',
-                notification_id
-            )
+            row = await queries.fetchrow(conn, queries.NOTIFICATION_MARK_READ, notification_id)
             if not row:
                 raise HTTPException(status_code=404, detail="Notification not found")
             return NotificationRead(**dict(row))
@@ -2517,95 +2575,71 @@ async def mark_notification_read(notification_id: int):
 async def unread_count(user_id: int = Query(...)):
     try:
         async with Database.pool.acquire() as conn:
-            cnt = await conn.fetchval(
-                'SELECT COUNT(*) FROM public."Notifications" WHERE user_id = $1 AND is_read = FALSE',
-                user_id
-            )
+            cnt = await queries.fetchval(conn, queries.NOTIFICATIONS_UNREAD_COUNT, user_id)
             return {"user_id": user_id, "unread_count": int(cnt)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     
 @app.get("/match-histories", response_model=List[MatchHistoryRead])
+@Database.read_only("user_id")
 async def get_match_histories(
+    response: Response,
     user_id: Union[int, None] = None,
     player_id: Union[int, None] = None,
     opponent_id: Union[int, None] = None,
-    limit: int = 50,
-    offset: int = 0,
+    sport_id: Optional[int] = None,
+    from_: Optional[datetime] = Query(None, alias="from", description="played_at >= from"),
+    to: Optional[datetime] = Query(None, description="played_at < to"),
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, description="Deprecated, use cursor (ignored with user_id)"),
 ):
     """
     Retrieve match history records, optionally filtered by user_id (shows matches where user is player_id OR opponent_id).
     If user_id is provided, it takes precedence over player_id/opponent_id.
+
+    With user_id, results are newest first, one page at a time (X-Next-Cursor),
+    and can be narrowed by sport_id and a played_at range.
     """
     try:
         async with Database.pool.acquire() as connection:
-            # Filter to show only matches where the user participated
-            # Match histories are only created from games the user joined (from Game_participants)
-            # Group by game (played_at, location, cost, duration_minutes) to show one entry per game
             if user_id is not None:
-                # Use DISTINCT ON to get one match per game (grouped by played_at, location, cost, duration_minutes)
-                # This ensures users see one entry per game they joined, not one per opponent
-                # DISTINCT ON requires ORDER BY to start with the DISTINCT ON columns
-                base_query = """
-                    SELECT DISTINCT ON (played_at, location, COALESCE(cost, 0), duration_minute)
-                           match_id, player_id, opponent_id, score_player, score_opponent,
-                           result, duration_minute AS duration_minutes, location, cost, played_at
-                    FROM public."Match_Histories"
-                    WHERE (player_id = $1 OR opponent_id = $2)
-                    ORDER BY played_at DESC, location, COALESCE(cost, 0), duration_minute, match_id
-                """
-                params = [user_id, user_id]
-            elif player_id is not None:
-                base_query = """
-                    SELECT DISTINCT ON (played_at, location, COALESCE(cost, 0), duration_minute)
-                           match_id, player_id, opponent_id, score_player, score_opponent,
-                           result, duration_minute AS duration_minutes, location, cost, played_at
-                    FROM public."Match_Histories"
-                    WHERE player_id = $1
-                    ORDER BY played_at DESC, location, COALESCE(cost, 0), duration_minute, match_id
-                """
-                params = [player_id]
-            elif opponent_id is not None:
-                base_query = """
-                    SELECT DISTINCT ON (played_at, location, COALESCE(cost, 0), duration_minute)
-                           match_id, player_id, opponent_id, score_player, score_opponent,
-                           result, duration_minute AS duration_minutes, location, cost, played_at
-                    FROM public."Match_Histories"
-                    WHERE opponent_id = $1
-                    ORDER BY played_at DESC, location, COALESCE(cost, 0), duration_minute, match_id
-                """
-                params = [opponent_id]
-            else:
+                rows = await fetch_user_match_history(
+                    connection, user_id, sport_id=sport_id, from_=from_, to=to,
+                    after=decode_cursor(cursor, datetime.fromisoformat, int), limit=limit,
+                )
+                rows = page_rows(rows, limit, response, lambda r: (r["played_at"], r["match_id"]))
+                return rows_response(rows, MatchHistoryRead, response=response)
+
+            if player_id is None and opponent_id is None:
                 # No filter provided - return empty (security: don't show all matches)
                 return []
-            
-            # Wrap in subquery to apply LIMIT and OFFSET after DISTINCT ON
-            query = f"""
+
+            # Pairwise filters keep their old meaning via the compat view,
+            # one row per game
+            column = "player_id" if player_id is not None else "opponent_id"
+            rows = await connection.fetch(
+                f"""
                 SELECT * FROM (
-                    {base_query}
-                ) AS distinct_matches
-                ORDER BY played_at DESC
-                LIMIT {limit} OFFSET {offset}
-            """
-
-            # Debug: print query and params
-            print(f"DEBUG Query: {query}")
-            print(f"DEBUG Params: {params}")
-            
-            rows = await connection.fetch(query, *params)
-            # Convert Decimal cost to float for JSON serialization (like dashboard endpoint)
-            matches = []
-            for row in rows:
-                match_dict = dict(row)
-                if match_dict.get("cost") is not None:
-                    try:
-                        match_dict["cost"] = float(match_dict["cost"])
-                    except Exception:
-                        pass
-                matches.append(MatchHistoryRead(**match_dict))
-            return matches
+                    SELECT DISTINCT ON (match_id)
+                           match_id, player_id, opponent_id, score_player, score_opponent,
+                           result, duration_minute AS duration_minutes, location, cost, played_at
+                    FROM public."Match_Histories"
+                    WHERE {column} = $1
+                    ORDER BY match_id, opponent_id, player_id
+                ) AS per_game
+                ORDER BY played_at DESC, match_id DESC
+                LIMIT $2 OFFSET $3
+                """,
+                player_id if player_id is not None else opponent_id, limit, offset,
+            )
+            return rows_response(rows, MatchHistoryRead)
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = str(e)
@@ -2615,156 +2649,340 @@ async def get_match_histories(
         raise HTTPException(status_code=500, detail=f"Failed to fetch match histories: {error_type}: {error_detail}")
 
 
+async def fetch_user_match_history(
+    connection,
+    user_id: int,
+    *,
+    sport_id: Optional[int] = None,
+    from_: Optional[datetime] = None,
+    to: Optional[datetime] = None,
+    after: Optional[tuple] = None,
+    limit: int = 50,
+):
+    """
+    Up to limit + 1 games of user_id, newest first, each seen from the user's
+    side (opponent = lowest other participant, the legacy pairwise shape).
+
+    Every filter is on the user's own Match_participants rows, so a page is
+    one range scan of idx_match_participants_user[_sport]_played.
+    """
+    conditions, params = ["me.user_id = $1"], [user_id]
+    if sport_id is not None:
+        params.append(sport_id)
+        conditions.append(f"me.sport_id = ${len(params)}")
+    if from_ is not None:
+        params.append(from_)
+        conditions.append(f"me.played_at >= ${len(params)}")
+    if to is not None:
+        params.append(to)
+        conditions.append(f"me.played_at < ${len(params)}")
+    if after:
+        params += list(after)
+        conditions.append(f"(me.played_at, me.match_game_id) < (${len(params) - 1}, ${len(params)})")
+    params.append(limit + 1)
+    return await connection.fetch(
+        f"""
+        SELECT
+            me.match_game_id AS match_id,
+            me.user_id AS player_id,
+            opp.user_id AS opponent_id,
+            me.score AS score_player,
+            opp.score AS score_opponent,
+            me.result,
+            mg.duration_minutes,
+            mg.location,
+            mg.cost,
+            me.played_at,
+            me.sport_id
+        FROM public."Match_participants" me
+        JOIN public."Match_games" mg ON mg.match_game_id = me.match_game_id
+        JOIN LATERAL (
+            SELECT p.user_id, p.score
+            FROM public."Match_participants" p
+            WHERE p.match_game_id = me.match_game_id AND p.user_id <> me.user_id
+            ORDER BY p.user_id
+            LIMIT 1
+        ) opp ON TRUE
+        WHERE {' AND '.join(conditions)}
+        ORDER BY me.played_at DESC, me.match_game_id DESC
+        LIMIT ${len(params)}
+        """,
+        *params,
+    )
+
+
 @app.get("/match-history/{user_id}", response_model=List[MatchHistoryRead])
-async def get_match_history_by_user(user_id: int, limit: int = 50, offset: int = 0):
+@Database.read_only("user_id")
+async def get_match_history_by_user(
+    response: Response,
+    user_id: int,
+    sport_id: Optional[int] = None,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
     """
     Get match history for a specific user.
     Only returns matches where the user participated (user is either player_id OR opponent_id).
     This ensures only games the user actually joined are shown.
     """
     # Ensure user_id is always provided to filter by user
-    return await get_match_histories(user_id=user_id, limit=limit, offset=offset)
+    return await get_match_histories(
+        response=response, user_id=user_id, player_id=None, opponent_id=None,
+        sport_id=sport_id, from_=from_, to=to, limit=limit, cursor=cursor, offset=0,
+    )
+
+
+# ========================
+# MATCH STATS
+# ========================
+# Running totals kept in User_match_stats / Head_to_head (see
+# migrations/0008_add_match_stats.sql), so these are primary-key lookups.
+
+STAT_COUNTERS = ("games", "wins", "draws", "losses", "minutes_played", "spend")
+
+
+@app.get("/stats/head-to-head", response_model=HeadToHeadRead)
+@Database.read_only("user_id")
+async def get_head_to_head(user_id: int, opponent_id: int):
+    """
+    Record of user_id against opponent_id over the games they both played.
+    wins/losses are from user_id's side.
+    """
+    if user_id == opponent_id:
+        raise HTTPException(status_code=400, detail="user_id and opponent_id must differ")
+
+    try:
+        async with Database.pool.acquire() as connection:
+            row = await queries.fetchrow(
+                connection, queries.HEAD_TO_HEAD,
+                min(user_id, opponent_id), max(user_id, opponent_id),
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if row is None:
+        return HeadToHeadRead(user_id=user_id, opponent_id=opponent_id)
+    mine, theirs = ("low_wins", "high_wins") if user_id < opponent_id else ("high_wins", "low_wins")
+    return json_response({
+        "user_id": user_id,
+        "opponent_id": opponent_id,
+        "games": row["games"],
+        "wins": row[mine],
+        "losses": row[theirs],
+        "draws": row["draws"],
+        "minutes_played": row["minutes_played"],
+        "spend": row["spend"],
+        "last_played_at": row["last_played_at"],
+    })
+
+
+@app.get("/stats/{user_id}", response_model=UserMatchStatsRead)
+@Database.read_only("user_id")
+async def get_user_match_stats(user_id: int):
+    """
+    Win/draw/loss record, minutes played and spend of user_id, overall and per
+    sport (sport_id null for games archived without a sport).
+    """
+    try:
+        async with Database.pool.acquire() as connection:
+            rows = await queries.fetch(
+                connection, queries.USER_MATCH_STATS,
+                user_id,
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    by_sport = [dict(r) for r in rows]
+    totals = {name: sum(r[name] for r in by_sport) for name in STAT_COUNTERS}
+    totals["sport_id"] = None
+    totals["last_played_at"] = max((r["last_played_at"] for r in by_sport if r["last_played_at"]), default=None)
+    return json_response({"user_id": user_id, "totals": totals, "by_sport": by_sport})
+
+
+@app.put("/match-games/{match_game_id}/results")
+@Database.writes(lambda kw: [r.user_id for r in kw["body"].results])
+async def update_match_results(
+    match_game_id: int,
+    body: MatchResultsUpdate,
+    uow: Database.UnitOfWork = Depends(Database.unit_of_work),
+):
+    """
+    Correct scores/results of an archived game. The game's contribution to the
+    stats rollups is taken out, the rows updated and the contribution added
+    back, all in one transaction.
+    """
+    user_ids = [r.user_id for r in body.results]
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="results must not be empty")
+    if len(set(user_ids)) != len(user_ids):
+        raise HTTPException(status_code=400, detail="Duplicate user_id in results")
+
+    async def work(connection):
+        # Serializes edits of the same game so rollups see one before/after each.
+        game = await queries.fetchval(
+            connection, queries.MATCH_GAME_LOCK,
+            match_game_id,
+        )
+        if game is None:
+            raise HTTPException(status_code=404, detail="Match game not found")
+
+        await queries.execute(connection, queries.MATCH_STATS_RETRACT, match_game_id)
+        updated = await queries.fetch(
+            connection, queries.MATCH_RESULTS_UPDATE,
+            match_game_id,
+            user_ids,
+            [r.score for r in body.results],
+            [r.result for r in body.results],
+        )
+        if len(updated) != len(user_ids):
+            missing = sorted(set(user_ids) - {r["user_id"] for r in updated})
+            raise HTTPException(status_code=400, detail=f"Users {missing} did not play in this game")
+        await queries.execute(connection, queries.MATCH_STATS_APPLY, match_game_id)
+        return [dict(r) for r in updated]
+
+    try:
+        return await uow.run(work)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/archive-past-games")
 async def archive_past_games():
     """
-    Archive past games to Match_Histories table and remove them from Game_instance.
-    This creates match history entries for each pair of participants in past games.
+    Archive past games into Match_games / Match_participants (one row per game
+    and one per player) and remove them from Game_instance. Games with fewer
+    than two participants are left in place, as before.
     """
+    # Not a route dependency: the dashboard also calls this directly.
+    uow = Database.UnitOfWork()
+
+    async def work(connection):
+        # Concurrent archivers (every dashboard load runs one) skip games
+        # another transaction is already archiving instead of duplicating them.
+        summary = await queries.fetchrow(connection, queries.ARCHIVE_PAST_GAMES)
+        if summary["match_game_ids"]:
+            # Roll the new games into User_match_stats / Head_to_head. A separate
+            # statement: rows inserted by the CTEs above aren't visible inside it.
+            await queries.execute(
+                connection, queries.ARCHIVE_MATCH_STATS_APPLY,
+                summary["match_game_ids"],
+            )
+            # Everyone still in a game when it's archived attended it:
+            # credit them per (user, sport) in one statement.
+            await queries.execute(
+                connection, queries.ARCHIVE_USER_STATS,
+                summary["match_game_ids"],
+            )
+        game_ids = summary["game_ids"]
+        if game_ids:
+            # Reports and participants reference the game, remove them first
+            await queries.execute(connection, queries.ARCHIVE_DELETE_REPORTS, game_ids)
+            await queries.execute(connection, queries.ARCHIVE_DELETE_PARTICIPANTS, game_ids)
+            await queries.execute(connection, queries.ARCHIVE_DELETE_GAMES, game_ids)
+
+        return {
+            "message": "Past games archived successfully",
+            "games_archived": summary["games_archived"],
+            "participants_archived": summary["participants_archived"],
+            "games_deleted": len(game_ids),
+            "past_games_found": summary["past_games_found"],
+        }
+
     try:
-        async with Database.pool.acquire() as connection:
-            # Find all past games (where start_time + duration_minutes < NOW())
-            # Note: Table name might be case-sensitive, try both variations
-            past_games_query = """
-                SELECT game_id, host_id, sport_id, start_time, duration_minutes, location, cost
-                FROM public."Game_instance"
-                WHERE (start_time + INTERVAL '1 minute' * duration_minutes) < NOW()
-            """
-            past_games = await connection.fetch(past_games_query)
-            
-            print(f"DEBUG: Found {len(past_games)} past games to archive")
-            
-            # Also check total games for debugging
-            total_games = await connection.fetchval('SELECT COUNT(*) FROM public."Game_instance"')
-            print(f"DEBUG: Total games in database: {total_games}")
-            
-            # Check current time for debugging
-            current_time = await connection.fetchval('SELECT NOW()')
-            print(f"DEBUG: Current time: {current_time}")
-            
-            archived_count = 0
-            deleted_count = 0
-            
-            for game in past_games:
-                print(f"DEBUG: Processing game_id={game['game_id']}")
-                game_id = game['game_id']
-                
-                # Get all participants for this game
-                participants_query = """
-                    SELECT user_id
-                    FROM public."Game_participants"
-                    WHERE game_id = $1
-                    ORDER BY user_id
-                """
-                participants = await connection.fetch(participants_query, game_id)
-                
-                print(f"DEBUG: Game {game_id} has {len(participants)} participants")
-                
-                if len(participants) < 2:
-                    # Skip games with less than 2 participants
-                    print(f"DEBUG: Skipping game {game_id} - less than 2 participants")
-                    continue
-                
-                # Create match history entries for each pair of participants
-                participant_ids = [p['user_id'] for p in participants]
-                played_at = game['start_time']
-                duration_minutes = game['duration_minutes']
-                location = game.get('location')
-                cost = game.get('cost')
-                
-                # Create entries for each pair (avoid duplicates)
-                for i in range(len(participant_ids)):
-                    for j in range(i + 1, len(participant_ids)):
-                        player_id = participant_ids[i]
-                        opponent_id = participant_ids[j]
-                        
-                        # Check if this match history already exists
-                        check_query = """
-                            SELECT match_id FROM public."Match_Histories"
-                            WHERE player_id = $1 AND opponent_id = $2
-                            AND played_at = $3
-                        """
-                        existing = await connection.fetchrow(
-                            check_query, player_id, opponent_id, played_at
-                        )
-                        
-                        if not existing:
-                            # Insert match history (note: column is duration_minute, not duration_minutes)
-                            # Use default values since columns have NOT NULL constraints
-                            insert_query = """
-                                INSERT INTO public."Match_Histories"
-                                (player_id, opponent_id, score_player, score_opponent, 
-                                 result, duration_minute, location, cost, played_at)
-                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                            """
-                            print(f"DEBUG: Inserting match history: player_id={player_id}, opponent_id={opponent_id}, location={location}, cost={cost}, played_at={played_at}")
-                            await connection.execute(
-                                insert_query,
-                                player_id,
-                                opponent_id,
-                                0,  # score_player (default to 0 since NOT NULL)
-                                0,  # score_opponent (default to 0 since NOT NULL)
-                                'draw',  # result (default to 'draw' since NOT NULL - can be updated later)
-                                duration_minutes,
-                                location,  # location from game
-                                cost,  # cost from game
-                                played_at
-                            )
-                            archived_count += 1
-                            print(f"DEBUG: Successfully inserted match history entry")
-                
-                # Delete associated records that reference this game first
-                # Delete reports that reference this game
-                delete_reports_query = """
-                    DELETE FROM public."Reports"
-                    WHERE report_game_id = $1
-                """
-                reports_deleted = await connection.execute(delete_reports_query, game_id)
-                print(f"DEBUG: Deleted reports for game {game_id}: {reports_deleted}")
-                
-                # Delete game participants (they should cascade, but being explicit)
-                delete_participants_query = """
-                    DELETE FROM public."Game_participants"
-                    WHERE game_id = $1
-                """
-                participants_deleted = await connection.execute(delete_participants_query, game_id)
-                print(f"DEBUG: Deleted participants for game {game_id}: {participants_deleted}")
-                
-                # Now delete the game instance after archiving
-                delete_query = """
-                    DELETE FROM public."Game_instance"
-                    WHERE game_id = $1
-                """
-                await connection.execute(delete_query, game_id)
-                deleted_count += 1
-                print(f"DEBUG: Deleted game instance {game_id}")
-            
-            print(f"DEBUG: Archive complete - {archived_count} match histories created, {deleted_count} games deleted")
-            
-            return {
-                "message": "Past games archived successfully",
-                "games_archived": archived_count,
-                "games_deleted": deleted_count,
-                "past_games_found": len(past_games)
-            }
-    
+        return await uow.run(work)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to archive past games: {str(e)}")
     
 
+# ========================
+# ADMIN EXPORTS (NDJSON)
+# ========================
+# Full-table dumps for admins. Rows are streamed from a server-side cursor
+# (see services/pagination.stream_ndjson) instead of being fetched into memory.
+
+EXPORT_QUERIES = {
+    "users": f'''
+        SELECT {USER_READ_COLUMNS} FROM public."Users" ORDER BY user_id
+    ''',
+    "coaches": '''
+        SELECT coach_id, experience_yrs, certifications, isverified, hourly_rate, created_at
+        FROM public."Coaches" ORDER BY coach_id
+    ''',
+    "reports": '''
+        SELECT report_id, reporter_id, reported_user_id, report_game_id, reason, created_at
+        FROM public."Reports" ORDER BY report_id
+    ''',
+    "notifications": '''
+        SELECT notification_id, user_id, message, type, metadata, is_read, created_at
+        FROM public."Notifications" ORDER BY notification_id
+    ''',
+    "user_stats": '''
+        SELECT user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level
+        FROM public."User_stats" ORDER BY user_id, sport_id
+    ''',
+    "game-instances": '''
+        SELECT game_id, host_id, sport_id, start_time, duration_minutes, location, skill_level,
+               max_players, cost, status, notes, created_at, updated_at
+        FROM public."Game_instance" ORDER BY game_id
+    ''',
+}
+
+
+@app.get("/admin/export/{dataset}")
+async def export_dataset(dataset: str):
+    """
+    Stream every row of `dataset` as application/x-ndjson, one JSON object per line.
+    """
+    query = EXPORT_QUERIES.get(dataset)
+    if query is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export. Choose one of: {', '.join(EXPORT_QUERIES)}")
+    return StreamingResponse(
+        stream_ndjson(Database.pool, query),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.ndjson"'},
+    )
+
+
+@app.get("/admin/query-stats")
+async def query_stats():
+    """
+    Per-statement call counts and timings for the named statements in queries.py.
+    """
+    return queries.stats()
+
+
+@app.get("/admin/pool-stats")
+async def pool_stats():
+    """
+    Connection pool gauges (size, idle, in use) and acquire-wait counters,
+    plus read-replica lag and routing counters when DATABASE_READ_URL is set,
+    and the activity log writer's queue.
+    """
+    if Database.pool is None:
+        raise HTTPException(status_code=503, detail="Database pool not initialised")
+    return {
+        **Database.pool.stats(),
+        "read_replica": Database.replica_stats(),
+        "activity_log_writer": activity_log.writer.stats(),
+    }
+
+
+@app.delete("/admin/query-stats", status_code=204)
+async def reset_query_stats():
+    queries.reset_stats()
+    return Response(status_code=204)
+
+
 # ===============================
 # FRIENDS API (one-row per friendship)
 # - requester stored as user_id, receiver as friend_id
@@ -2784,6 +3002,7 @@ class FriendPerson(BaseModel):
     avatar_url: Optional[str] = None
     favorite_sport: Optional[str] = None
     mutual_count: int = 0
+    attendance_rate: Optional[float] = None
 
 
 class FriendEdge(BaseModel):
@@ -2791,6 +3010,23 @@ class FriendEdge(BaseModel):
     created_at: Optional[datetime] = None
     friend: FriendPerson
 
+
+def _friend_edge(r) -> dict:
+    """FriendEdge-shaped dict from a friends.* catalogue row (the other user's columns)."""
+    return {
+        "status": r["status"],
+        "created_at": r["created_at"],
+        "friend": {
+            "user_id": r["user_id"],
+            "email": r["email"],
+            "first_name": r["first_name"],
+            "last_name": r["last_name"],
+            "avatar_url": r["avatar_url"],
+            "favorite_sport": r["favorite_sport"],
+            "mutual_count": 0,
+        },
+    }
+
 # ---------- Request bodies ----------
 class FriendCreateBody(BaseModel):
     user_id: int      # requester
@@ -2805,6 +3041,7 @@ class FriendStatusBody(BaseModel):
 # POST /friends  -> Send request (one row, no symmetry)
 # -------------------------------
 @app.post("/friends", response_model=FriendEdge, status_code=201)
+@Database.writes(lambda kw: [kw["payload"].user_id, kw["payload"].friend_id])
 async def create_friend(payload: FriendCreateBody):
     """
     Create a friend request:
@@ -2819,36 +3056,22 @@ async def create_friend(payload: FriendCreateBody):
     try:
         async with Database.pool.acquire() as connection:
             # Block if any row exists between the same pair (either direction)
-            exists = await connection.fetchrow(
-                '''
-                SELECT 1
-                FROM public."Friends"
-                WHERE (user_id = $1 AND friend_id = $2)
-                   OR (user_id = $2 AND friend_id = $1)
-                LIMIT 1
-                ''',
+            exists = await queries.fetchrow(
+                connection, queries.FRIENDSHIP_EXISTS,
                 payload.user_id, payload.friend_id
             )
             if exists:
                 raise HTTPException(status_code=409, detail="Friendship already exists or pending")
 
             # Insert pending request
-            row = await connection.fetchrow(
-                '''
-                INSERT INTO public."Friends" (user_id, friend_id, status, created_at)
-                VALUES ($1, $2, 'pending', NOW())
-                RETURNING user_id, friend_id, status, created_at
-                ''',
+            row = await queries.fetchrow(
+                connection, queries.FRIEND_REQUEST_INSERT,
                 payload.user_id, payload.friend_id
             )
 
             # Return with OTHER user's profile (receiver is the other)
-            other = await connection.fetchrow(
-                '''
-                SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                FROM public."Users" AS u
-                WHERE u.user_id = $1
-                ''',
+            other = await queries.fetchrow(
+                connection, queries.FRIEND_PROFILE,
                 payload.friend_id
             )
             return {
@@ -2866,7 +3089,8 @@ async def create_friend(payload: FriendCreateBody):
 # PUT /friends/status  -> Accept or Reject
 # -------------------------------
 @app.put("/friends/status", response_model=Union[FriendEdge, dict])
-async def update_friend_status(body: FriendStatusBody):
+@Database.writes(lambda kw: [kw["body"].user_id, kw["body"].friend_id])
+async def update_friend_status(body: FriendStatusBody, uow: Database.UnitOfWork = Depends(Database.unit_of_work)):
     """
     Accept or reject a friend request from user_id -> friend_id.
       - 'accepted' => update same row to accepted and return OTHER profile (receiver sees requester)
@@ -2875,87 +3099,68 @@ async def update_friend_status(body: FriendStatusBody):
     if body.status not in ("accepted", "rejected"):
         raise HTTPException(status_code=400, detail="status must be 'accepted' or 'rejected'")
 
-    try:
-        async with Database.pool.acquire() as connection:
-            # Ensure the pending row exists in the REQUEST direction
-            pending = await connection.fetchrow(
-                '''
-                SELECT user_id, friend_id, status, created_at
-                FROM public."Friends"
-                WHERE user_id = $1 AND friend_id = $2
-                LIMIT 1
-                ''',
-                body.user_id, body.friend_id
-            )
-            if not pending:
-                raise HTTPException(status_code=404, detail="Friend request not found")
-
-            if body.status == "rejected":
-                if pending["status"] != "pending":
-                    raise HTTPException(status_code=409, detail="Cannot reject a non-pending request")
-                await connection.execute(
-                    '''
-                    DELETE FROM public."Friends"
-                    WHERE user_id = $1 AND friend_id = $2
-                    ''',
-                    body.user_id, body.friend_id
-                )
-                return {"message": "Friend request rejected and removed."}
-
-            if pending["status"] == "accepted":
-                other = await connection.fetchrow(
-                    '''
-                    SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                    FROM public."Users" AS u
-                    WHERE u.user_id = $1
-                    ''',
-                    body.user_id
-                )
-                return {
-                    "status": pending["status"],
-                    "created_at": pending["created_at"],
-                    "friend": dict(other) if other else None
-                }
-
-            # Accept: update same row
-            updated = await connection.fetchrow(
-                '''
-                UPDATE public."Friends"
-                SET status = 'accepted'
-                WHERE user_id = $1 AND friend_id = $2
-                RETURNING user_id, friend_id, status, created_at
-                ''',
+    async def work(connection):
+        # Ensure the pending row exists in the REQUEST direction. Locked so a
+        # concurrent accept waits and then sees 'accepted' (no double XP).
+        pending = await queries.fetchrow(
+            connection, queries.FRIEND_REQUEST_FOR_UPDATE,
+            body.user_id, body.friend_id
+        )
+        if not pending:
+            raise HTTPException(status_code=404, detail="Friend request not found")
+
+        if body.status == "rejected":
+            if pending["status"] != "pending":
+                raise HTTPException(status_code=409, detail="Cannot reject a non-pending request")
+            await queries.execute(
+                connection, queries.FRIEND_REQUEST_DELETE,
                 body.user_id, body.friend_id
             )
+            return {"message": "Friend request rejected and removed."}
 
-            await apply_progress(
-                connection,
-                user_id=body.user_id,
-                sport_id=0,
-                xp_delta=XP_REWARDS["friend_accept"]
-            )
-            await apply_progress(
-                connection,
-                user_id=body.friend_id,
-                sport_id=0,
-                xp_delta=XP_REWARDS["friend_accept"]
-            )
-
-            # For the receiver (friend_id), the OTHER user is the requester (user_id)
-            other = await connection.fetchrow(
-                '''
-                SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                FROM public."Users" AS u
-                WHERE u.user_id = $1
-                ''',
+        if pending["status"] == "accepted":
+            other = await queries.fetchrow(
+                connection, queries.FRIEND_PROFILE,
                 body.user_id
             )
             return {
-                "status": updated["status"],
-                "created_at": updated["created_at"],
+                "status": pending["status"],
+                "created_at": pending["created_at"],
                 "friend": dict(other) if other else None
             }
 
+        # Accept: update same row
+        updated = await queries.fetchrow(
+            connection, queries.FRIEND_REQUEST_ACCEPT,
+            body.user_id, body.friend_id
+        )
+
+        await apply_progress(
+            connection,
+            user_id=body.user_id,
+            sport_id=0,
+            xp_delta=XP_REWARDS["friend_accept"]
+        )
+        await apply_progress(
+            connection,
+            user_id=body.friend_id,
+            sport_id=0,
+            xp_delta=XP_REWARDS["friend_accept"]
+        )
+
+        # For the receiver (friend_id), the OTHER user is the requester (user_id)
+        other = await queries.fetchrow(
+            connection, queries.FRIEND_PROFILE,
+            body.user_id
+        )
+        return {
+            "status": updated["status"],
+            "created_at": updated["created_at"],
+            "friend": dict(other) if other else None
+        }
+
+    try:
+        return await uow.run(work)
     except HTTPException:
         raise
     except Exception as e:
@@ -2965,6 +3170,7 @@ async def update_friend_status(body: FriendStatusBody):
 # DELETE /friends  -> Unfriend or Reject (generic)
 # -------------------------------
 @app.delete("/friends", status_code=200)
+@Database.writes(lambda kw: [kw["user_id"], kw["friend_id"]])
 async def delete_friend(user_id: int, friend_id: int):
     """
     Delete the friendship/request row between two users (any direction).
@@ -2975,12 +3181,8 @@ async def delete_friend(user_id: int, friend_id: int):
 
     try:
         async with Database.pool.acquire() as connection:
-            result = await connection.execute(
-                '''
-                DELETE FROM public."Friends"
-                WHERE (user_id = $1 AND friend_id = $2)
-                   OR (user_id = $2 AND friend_id = $1)
-                ''',
+            result = await queries.execute(
+                connection, queries.FRIENDSHIP_DELETE,
                 user_id, friend_id
             )
         deleted = int(result.split()[-1]) if result else 0
@@ -2997,6 +3199,7 @@ async def delete_friend(user_id: int, friend_id: int):
 # GET /friends/my  -> Accepted friends for me (include OTHER profile)
 # -------------------------------
 @app.get("/friends/my", response_model=List[FriendEdge])
+@Database.read_only("user_id")
 async def my_friends(user_id: int):
     """
     Return accepted friendships for user_id (either direction),
@@ -3004,39 +3207,10 @@ async def my_friends(user_id: int):
     """
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch(
-                '''
-                WITH edges AS (
-                  SELECT
-                    CASE WHEN f.user_id = $1 THEN f.friend_id ELSE f.user_id END AS other_id,
-                    f.status, f.created_at
-                  FROM public."Friends" f
-                  WHERE f.status = 'accepted'
-                    AND ($1 = f.user_id OR $1 = f.friend_id)
-                )
-                SELECT e.status, e.created_at,
-                       u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                FROM edges e
-                JOIN public."Users" u ON u.user_id = e.other_id
-                ORDER BY e.created_at DESC
-                ''',
-                user_id
-            )
-            return [
-                {
-                    "status": r["status"],
-                    "created_at": r["created_at"],
-                    "friend": {
-                        "user_id": r["user_id"],
-                        "email": r["email"],
-                        "first_name": r["first_name"],
-                        "last_name": r["last_name"],
-                        "avatar_url": r["avatar_url"],
-                        "favorite_sport": r["favorite_sport"],
-                    }
-                }
-                for r in rows
-            ]
+            rows = await queries.fetch(connection, queries.FRIENDS_ACCEPTED, user_id)
+            return json_response([_friend_edge(r) for r in rows])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3044,6 +3218,7 @@ async def my_friends(user_id: int):
 # GET /friends/requests  -> Pending requests RECEIVED by me
 # -------------------------------
 @app.get("/friends/requests", response_model=List[FriendEdge])
+@Database.read_only("user_id")
 async def requests_received(user_id: int):
     """
     Pending requests RECEIVED by user_id.
@@ -3051,32 +3226,10 @@ async def requests_received(user_id: int):
     """
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch(
-                '''
-                SELECT f.status, f.created_at,
-                       u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                FROM public."Friends" f
-                JOIN public."Users"  u ON u.user_id = f.user_id
-                WHERE f.status = 'pending' AND f.friend_id = $1
-                ORDER BY f.created_at DESC
-                ''',
-                user_id
-            )
-            return [
-                {
-                    "status": r["status"],
-                    "created_at": r["created_at"],
-                    "friend": {
-                        "user_id": r["user_id"],
-                        "email": r["email"],
-                        "first_name": r["first_name"],
-                        "last_name": r["last_name"],
-                        "avatar_url": r["avatar_url"],
-                        "favorite_sport": r["favorite_sport"],
-                    }
-                }
-                for r in rows
-            ]
+            rows = await queries.fetch(connection, queries.FRIENDS_PENDING_RECEIVED, user_id)
+            return json_response([_friend_edge(r) for r in rows])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3084,12 +3237,58 @@ async def requests_received(user_id: int):
 # GET /friends/find  -> Users with NO relation to me (discover)
 # -------------------------------
 @app.get("/friends/find", response_model=List[FriendPerson])
-async def find_friends(user_id: int, query: Union[str, None] = None, limit: int = 20, offset: int = 0):
+@Database.read_only("user_id")
+async def find_friends(
+    user_id: int,
+    query: Union[str, None] = None,
+    limit: int = 20,
+    offset: int = 0,
+    sport_id: Optional[int] = None,
+    min_attendance: Optional[float] = Query(None, ge=0, le=1),
+    sort: str = "relevance",
+):
     """
     Users not already connected to user_id in any status and not me.
     Returns candidate users with a real mutual_count (accepted↔accepted).
+    When `query` is given, candidates are matched by name/email prefix or
+    substring (indexed, see services/search.py) and ordered by relevance.
+
+    attendance_rate is for sport_id when given, otherwise across sports.
+    min_attendance drops candidates below it (and those with no record yet);
+    sort=attendance puts the most reliable players first.
     """
-    try:
+    if sort not in ("relevance", "attendance"):
+        raise HTTPException(status_code=400, detail="sort must be 'relevance' or 'attendance'")
+    try:
+        limit = max(1, min(limit, 100))
+        offset = max(0, offset)
+        params = [user_id]
+        search_filter = ""
+        order_by = "c.user_id DESC"
+        terms = parse_search(query)
+        rank = "0"
+        if terms:
+            search_filter = "AND " + search_predicate("u", terms, params)
+            rank = search_rank("u", terms, params)
+            order_by = "c.rank DESC, c.user_id DESC"
+        if sport_id is not None:
+            params.append(sport_id)
+            attendance_join = f'''
+                LEFT JOIN public."User_stats" AS us
+                       ON us.user_id = u.user_id AND us.sport_id = ${len(params)}'''
+        else:
+            attendance_join = '''
+                LEFT JOIN LATERAL (
+                    SELECT public.attendance_rate(SUM(s.games_attended)::int, SUM(s.games_left)::int) AS attendance_rate
+                    FROM public."User_stats" AS s
+                    WHERE s.user_id = u.user_id
+                ) AS us ON TRUE'''
+        if min_attendance is not None:
+            params.append(Decimal(str(min_attendance)))
+            search_filter += f" AND us.attendance_rate >= ${len(params)}"
+        if sort == "attendance":
+            order_by = "c.attendance_rate DESC NULLS LAST, " + order_by
+
         async with Database.pool.acquire() as connection:
             sql = f'''
                 WITH my_friends AS (
@@ -3100,9 +3299,12 @@ async def find_friends(user_id: int, query: Union[str, None] = None, limit: int
                 ),
                 candidates AS (
                     -- all users who are NOT me and have NO relation (any status) with me
-                    SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
+                    SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport,
+                           us.attendance_rate, {rank} AS rank
                     FROM public."Users" AS u
+                    {attendance_join}
                     WHERE u.user_id <> $1
+                      {search_filter}
                       AND NOT EXISTS (
                         SELECT 1
                         FROM public."Friends" AS f
@@ -3112,6 +3314,7 @@ async def find_friends(user_id: int, query: Union[str, None] = None, limit: int
                 )
                 SELECT
                     c.user_id, c.email, c.first_name, c.last_name, c.avatar_url, c.favorite_sport,
+                    c.attendance_rate,
                     COALESCE((
                         SELECT COUNT(*)
                         FROM my_friends mf
@@ -3123,16 +3326,15 @@ async def find_friends(user_id: int, query: Union[str, None] = None, limit: int
                          )
                     ), 0) AS mutual_count
                 FROM candidates c
-                { "WHERE (c.email ILIKE $" + str(2) + " OR c.first_name ILIKE $" + str(2) + " OR c.last_name ILIKE $" + str(2) + ")" if query else "" }
-                ORDER BY c.user_id DESC
-                LIMIT {limit} OFFSET {offset}
+                ORDER BY {order_by}
+                LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}
             '''
-            params = [user_id]
-            if query:
-                params.append(f"%{query}%")
+            params.extend([limit, offset])
 
             rows = await connection.fetch(sql, *params)
-            return [FriendPerson(**dict(r)) for r in rows]
+            return rows_response(rows, FriendPerson)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3140,6 +3342,7 @@ async def find_friends(user_id: int, query: Union[str, None] = None, limit: int
 # GET /friends/sent  -> Pending requests I SENT
 # -------------------------------
 @app.get("/friends/sent", response_model=List[FriendEdge])
+@Database.read_only("user_id")
 async def requests_sent(user_id: int):
     """
     Pending requests SENT by user_id.
@@ -3148,34 +3351,12 @@ async def requests_sent(user_id: int):
     """
     try:
         async with Database.pool.acquire() as connection:
-            rows = await connection.fetch(
-                '''
-                SELECT f.status, f.created_at,
-                       u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
-                FROM public."Friends" f
-                JOIN public."Users" u ON u.user_id = f.friend_id
-                WHERE f.status = 'pending' AND f.user_id = $1
-                ORDER BY f.created_at DESC
-                ''',
-                user_id
-            )
+            rows = await queries.fetch(connection, queries.FRIENDS_PENDING_SENT, user_id)
 
-            return [
-                {
-                    "status": r["status"],
-                    "created_at": r["created_at"],
-                    "friend": {
-                        "user_id": r["user_id"],
-                        "email": r["email"],
-                        "first_name": r["first_name"],
-                        "last_name": r["last_name"],
-                        "avatar_url": r["avatar_url"],
-                        "favorite_sport": r["favorite_sport"],
-                    },
-                }
-                for r in rows
-            ]
+            return json_response([_friend_edge(r) for r in rows])
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3214,6 +3395,8 @@ async def list_user_badges(
 
             rows = await connection.fetch(sql, *params)
             return [UserBadgeRead(**dict(row)) for row in rows]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3222,12 +3405,8 @@ async def list_user_badges(
 async def get_user_badge(badge_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            row = await connection.fetchrow(
-                '''
-                SELECT id, user_id, badge_name, earned_on, seen
-                FROM public."user_badges"
-                WHERE id = $1
-                ''',
+            row = await queries.fetchrow(
+                connection, queries.USER_BADGE_BY_ID,
                 badge_id
             )
             if not row:
@@ -3243,18 +3422,16 @@ async def get_user_badge(badge_id: int):
 async def create_user_badge(badge: UserBadgeCreate):
     try:
         async with Database.pool.acquire() as connection:
-            row = await connection.fetchrow(
-                '''
-                INSERT INTO public."user_badges" (user_id, badge_name, earned_on, seen)
-                VALUES ($1, $2, $3, $4)
-                RETURNING id, user_id, badge_name, earned_on, seen
-                ''',
+            row = await queries.fetchrow(
+                connection, queries.USER_BADGE_INSERT,
                 badge.user_id,
                 badge.badge_name,
                 badge.earned_on or datetime.utcnow(),
                 badge.seen
             )
             return UserBadgeRead(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3295,8 +3472,8 @@ async def update_user_badge(badge_id: int, updates: UserBadgeUpdate):
 async def delete_user_badge(badge_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            result = await connection.execute(
-                'DELETE FROM public."user_badges" WHERE id = $1',
+            result = await queries.execute(
+                connection, queries.USER_BADGE_DELETE,
                 badge_id
             )
             deleted = int(result.split()[-1]) if result else 0
@@ -3314,13 +3491,17 @@ async def delete_user_badge(badge_id: int):
 # ========================
 @app.get("/activity_logs", response_model=List[ActivityLogRead])
 async def list_activity_logs(
+    response: Response,
     user_id: Optional[int] = Query(None),
-    limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0)
+    limit: int = Query(50, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
 ):
     """
-    Fetch activity logs ordered by most recent.
+    Fetch activity logs ordered by most recent, one page at a time
+    (next page in X-Next-Cursor). Pages are keyset on (created_at, id), so
+    only the partitions a page touches are scanned.
     """
+    after = decode_cursor(cursor, datetime.fromisoformat, int)
     try:
         async with Database.pool.acquire() as connection:
             sql = '''
@@ -3332,13 +3513,19 @@ async def list_activity_logs(
             if user_id is not None:
                 params.append(user_id)
                 clauses.append(f"user_id = ${len(params)}")
+            if after:
+                params += list(after)
+                clauses.append(f"(created_at, id) < (${len(params) - 1}, ${len(params)})")
             if clauses:
                 sql += " WHERE " + " AND ".join(clauses)
-            sql += " ORDER BY created_at DESC, id DESC LIMIT $%d OFFSET $%d" % (len(params) + 1, len(params) + 2)
+            params.append(limit + 1)
+            sql += f" ORDER BY created_at DESC, id DESC LIMIT ${len(params)}"
 
-            params.extend([limit, offset])
             rows = await connection.fetch(sql, *params)
-            return [ActivityLogRead(**dict(row)) for row in rows]
+            rows = page_rows(rows, limit, response, lambda r: (r["created_at"], r["id"]))
+            return rows_response(rows, ActivityLogRead, response=response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3347,12 +3534,8 @@ async def list_activity_logs(
 async def get_activity_log(log_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            row = await connection.fetchrow(
-                '''
-                SELECT id, user_id, action, created_at
-                FROM public."activity_logs"
-                WHERE id = $1
-                ''',
+            row = await queries.fetchrow(
+                connection, queries.ACTIVITY_LOG_BY_ID,
                 log_id
             )
             if not row:
@@ -3368,17 +3551,15 @@ async def get_activity_log(log_id: int):
 async def create_activity_log(entry: ActivityLogCreate):
     try:
         async with Database.pool.acquire() as connection:
-            row = await connection.fetchrow(
-                '''
-                INSERT INTO public."activity_logs" (user_id, action, created_at)
-                VALUES ($1, $2, $3)
-                RETURNING id, user_id, action, created_at
-                ''',
+            row = await queries.fetchrow(
+                connection, queries.ACTIVITY_LOG_INSERT,
                 entry.user_id,
                 entry.action,
-                entry.created_at or datetime.utcnow()
+                entry.created_at or datetime.now(timezone.utc)
             )
             return ActivityLogRead(**dict(row))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3419,8 +3600,8 @@ async def update_activity_log(log_id: int, updates: ActivityLogUpdate):
 async def delete_activity_log(log_id: int):
     try:
         async with Database.pool.acquire() as connection:
-            result = await connection.execute(
-                'DELETE FROM public."activity_logs" WHERE id = $1',
+            result = await queries.execute(
+                connection, queries.ACTIVITY_LOG_DELETE,
                 log_id
             )
             deleted = int(result.split()[-1]) if result else 0
@@ -0,0 +1,213 @@
+"""Versioned schema migrations.
+
+Every file in migrations/ is named NNNN_description.sql and is applied once,
+in version order. Applied versions are recorded in public.schema_migrations
+together with a checksum of the file, so an edited migration is reported
+instead of silently diverging.
+
+    python -m PlayConnect_API.migrate              # apply pending migrations
+    python -m PlayConnect_API.migrate status       # list applied / pending
+    python -m PlayConnect_API.migrate baseline 11  # mark 0001..0011 as applied, run nothing
+
+Set DB_MIGRATE_ON_STARTUP=1 to apply pending migrations when the API starts.
+A session advisory lock makes concurrent runners (several workers starting
+at once) wait for each other, so every migration runs exactly once.
+
+A migration without its own BEGIN/COMMIT runs in a transaction together with
+its schema_migrations row. Files that manage their own transaction (to run
+ANALYZE after COMMIT, for example) are executed as they are and recorded
+afterwards; they are written to be safe to re-run.
+
+Databases that had the scripts applied by hand before this runner existed
+should be baselined to the last version applied, not migrated from scratch.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import List, NamedTuple
+
+import asyncpg
+
+from PlayConnect_API import Database
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "0") == "1"
+
+# pg_advisory_lock key shared by every runner of this schema
+MIGRATION_LOCK_ID = 271_000_001
+
+_FILENAME = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_OWN_TRANSACTION = re.compile(r"^\s*BEGIN\s*;", re.IGNORECASE | re.MULTILINE)
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS public.schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+'''
+
+RECORD_SQL = '''
+    INSERT INTO public.schema_migrations (version, name, checksum)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (version) DO UPDATE SET name = EXCLUDED.name, checksum = EXCLUDED.checksum
+'''
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise RuntimeError(f"Migration file {path.name} is not named NNNN_description.sql")
+        migrations.append(Migration(int(match.group(1)), match.group(2), path))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Two migration files share a version number")
+    return migrations
+
+
+async def _applied(connection) -> dict:
+    await connection.execute(CREATE_TABLE_SQL)
+    rows = await connection.fetch("SELECT version, name, checksum, applied_at FROM public.schema_migrations")
+    return {r["version"]: r for r in rows}
+
+
+async def _apply(connection, migration: Migration) -> None:
+    sql = migration.sql
+    if _OWN_TRANSACTION.search(sql):
+        try:
+            await connection.execute(sql)
+        except Exception:
+            # A failure after the file's BEGIN leaves the session in an aborted
+            # transaction, where the advisory unlock would fail too and hide
+            # this error.
+            if connection.is_in_transaction():
+                try:
+                    await connection.execute("ROLLBACK")
+                except Exception:
+                    pass
+            raise
+        await connection.execute(RECORD_SQL, migration.version, migration.name, migration.checksum)
+    else:
+        async with connection.transaction():
+            await connection.execute(sql)
+            await connection.execute(RECORD_SQL, migration.version, migration.name, migration.checksum)
+
+
+async def migrate(connection, *, target: int = None) -> List[Migration]:
+    """Apply pending migrations up to `target` (all by default). Returns those applied."""
+    await connection.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        applied = await _applied(connection)
+        done = []
+        for migration in discover():
+            if target is not None and migration.version > target:
+                break
+            row = applied.get(migration.version)
+            if row is not None:
+                if row["checksum"] != migration.checksum:
+                    print(f"[migrate] warning: {migration.path.name} changed after it was applied")
+                continue
+            print(f"[migrate] applying {migration.path.name}")
+            await _apply(connection, migration)
+            done.append(migration)
+        return done
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+
+async def baseline(connection, version: int) -> List[Migration]:
+    """Record every migration up to `version` as applied without running it."""
+    await connection.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        applied = await _applied(connection)
+        marked = [m for m in discover() if m.version <= version and m.version not in applied]
+        for migration in marked:
+            await connection.execute(RECORD_SQL, migration.version, migration.name, migration.checksum)
+        return marked
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+
+async def status(connection) -> List[dict]:
+    applied = await _applied(connection)
+    out = []
+    for migration in discover():
+        row = applied.get(migration.version)
+        out.append({
+            "version": migration.version,
+            "file": migration.path.name,
+            "applied_at": row["applied_at"] if row else None,
+            "modified": bool(row) and row["checksum"] != migration.checksum,
+        })
+    return out
+
+
+async def _connect():
+    # Migrations run in UTC whatever the server default is: timestamp <->
+    # timestamptz casts in them (0010's copy of the legacy activity_logs, for
+    # one) assume the session TimeZone is UTC.
+    return await asyncpg.connect(Database.DATABASE_URL, server_settings={"timezone": "UTC"})
+
+
+async def run_on_startup() -> None:
+    """Called from the API startup hook when DB_MIGRATE_ON_STARTUP=1."""
+    connection = await _connect()
+    try:
+        await migrate(connection)
+    finally:
+        await connection.close()
+
+
+async def _main(args) -> None:
+    if not Database.DATABASE_URL:
+        raise SystemExit("DATABASE_URL is not set")
+    connection = await _connect()
+    try:
+        if args.command == "status":
+            for row in await status(connection):
+                state = row["applied_at"].isoformat() if row["applied_at"] else "pending"
+                flag = "  (modified since applied)" if row["modified"] else ""
+                print(f"{row['file']:<50} {state}{flag}")
+        elif args.command == "baseline":
+            marked = await baseline(connection, args.version)
+            print(f"[migrate] marked {len(marked)} migration(s) as applied")
+        else:
+            done = await migrate(connection, target=args.version)
+            print(f"[migrate] {len(done)} migration(s) applied")
+    finally:
+        await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", nargs="?", default="up", choices=("up", "status", "baseline"))
+    parser.add_argument("version", nargs="?", type=int, help="up: stop after this version; baseline: last version already applied")
+    args = parser.parse_args()
+    if args.command == "baseline" and args.version is None:
+        parser.error("baseline needs a version")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+-- Migration: Trigram + full-text search support for user and game search
+-- Backs /friends/find (Users) and /dashboard/games?search= (Game_instance).
+-- Requires PostgreSQL 12+ (stored generated columns).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Users: lower-cased haystack for substring (trigram) matching and a tsvector
+-- for prefix matching / ranking. Kept in sync by Postgres on every write.
+ALTER TABLE public."Users"
+ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, ''))
+) STORED,
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, ''))
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_users_search_text_trgm
+    ON public."Users" USING GIN (search_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_search_vector
+    ON public."Users" USING GIN (search_vector);
+
+-- Game_instance: same treatment over location + notes
+ALTER TABLE public."Game_instance"
+ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(coalesce(location, '') || ' ' || coalesce(notes, ''))
+) STORED,
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('simple', coalesce(location, '') || ' ' || coalesce(notes, ''))
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_game_instance_search_text_trgm
+    ON public."Game_instance" USING GIN (search_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_game_instance_search_vector
+    ON public."Game_instance" USING GIN (search_vector);
+
+ANALYZE public."Users";
+ANALYZE public."Game_instance";
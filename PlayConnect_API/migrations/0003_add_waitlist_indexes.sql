@@ -0,0 +1,10 @@
+-- Migration: Indexes backing the waitlist read model and promotion engine
+-- Per-game queue (positions via ROW_NUMBER over joined_at) and promotion both
+-- scan waiting entries of one game in join order.
+CREATE INDEX IF NOT EXISTS idx_waitlist_game_queue
+    ON public."Waitlist" (game_id, joined_at, user_id)
+    WHERE admitted = FALSE;
+
+-- "My waitlists": every entry of one user, paginated by (joined_at, game_id)
+CREATE INDEX IF NOT EXISTS idx_waitlist_user_joined
+    ON public."Waitlist" (user_id, joined_at, game_id);
@@ -0,0 +1,23 @@
+-- Migration: Store coach verification documents as rows
+-- Run this SQL script on your database to create the documents table
+
+-- Files themselves live in content-addressed storage (services/storage.py);
+-- storage_key is "verification_docs/<sha[:2]>/<sha><ext>". The same file
+-- uploaded twice by a coach is stored once and recorded once.
+CREATE TABLE IF NOT EXISTS public."Coach_verification_documents" (
+    document_id SERIAL PRIMARY KEY,
+    coach_id INTEGER NOT NULL REFERENCES public."Coaches"(coach_id) ON DELETE CASCADE,
+    sha256 CHAR(64) NOT NULL,
+    storage_key TEXT NOT NULL,
+    original_filename TEXT,
+    content_type TEXT,
+    size_bytes BIGINT NOT NULL,
+    uploaded_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    UNIQUE (coach_id, sha256)
+);
+
+CREATE INDEX IF NOT EXISTS idx_coach_verification_documents_coach
+    ON public."Coach_verification_documents" (coach_id, uploaded_at DESC);
+
+-- Note: new requests leave Coach_verification_requests.document_url NULL.
+-- Older rows keep their comma-separated paths under uploads/verification_docs.
@@ -0,0 +1,150 @@
+-- Migration: Coach directory summary + search indexes
+-- Run this SQL script on your database to create Coach_summary, its triggers and the indexes
+
+-- One row per coach with counters the directory sorts and displays on.
+-- Maintained incrementally by the triggers below, so reads never aggregate.
+--   sessions_hosted       games the coach hosts / hosted
+--   participants_coached  participant rows (other than the coach) in those games
+-- Games that already ended are deleted by the archiver but still count: only
+-- removing a game (or participant) that has not ended yet decrements.
+CREATE TABLE IF NOT EXISTS public."Coach_summary" (
+    coach_id BIGINT PRIMARY KEY REFERENCES public."Coaches"(coach_id) ON DELETE CASCADE,
+    sessions_hosted INTEGER NOT NULL DEFAULT 0,
+    participants_coached INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION public.coach_summary_bump(p_coach BIGINT, p_sessions INTEGER, p_participants INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_coach IS NULL OR NOT EXISTS (SELECT 1 FROM public."Coaches" WHERE coach_id = p_coach) THEN
+        RETURN;
+    END IF;
+    INSERT INTO public."Coach_summary" AS s (coach_id, sessions_hosted, participants_coached)
+    VALUES (p_coach, GREATEST(p_sessions, 0), GREATEST(p_participants, 0))
+    ON CONFLICT (coach_id) DO UPDATE
+    SET sessions_hosted = GREATEST(s.sessions_hosted + p_sessions, 0),
+        participants_coached = GREATEST(s.participants_coached + p_participants, 0),
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Game_instance: +1 on insert, -1 (with its participants) when a game that has
+-- not ended is deleted, move counts when the host changes. BEFORE DELETE so
+-- the game's participants are still visible to count.
+CREATE OR REPLACE FUNCTION public.coach_summary_game_trg()
+RETURNS TRIGGER AS $$
+DECLARE
+    n INTEGER;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.coach_summary_bump(NEW.host_id, 1, 0);
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        IF OLD.start_time + INTERVAL '1 minute' * OLD.duration_minutes > NOW() THEN
+            SELECT COUNT(*) INTO n FROM public."Game_participants"
+            WHERE game_id = OLD.game_id AND user_id <> OLD.host_id;
+            PERFORM public.coach_summary_bump(OLD.host_id, -1, -n);
+        END IF;
+        RETURN OLD;
+    ELSE -- UPDATE OF host_id
+        IF NEW.host_id IS DISTINCT FROM OLD.host_id THEN
+            SELECT COUNT(*) INTO n FROM public."Game_participants"
+            WHERE game_id = NEW.game_id AND user_id NOT IN (OLD.host_id, NEW.host_id);
+            PERFORM public.coach_summary_bump(OLD.host_id, -1, -n);
+            PERFORM public.coach_summary_bump(NEW.host_id, 1, n);
+        END IF;
+        RETURN NEW;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_coach_summary_game_ins ON public."Game_instance";
+CREATE TRIGGER trg_coach_summary_game_ins
+    AFTER INSERT ON public."Game_instance"
+    FOR EACH ROW EXECUTE FUNCTION public.coach_summary_game_trg();
+
+DROP TRIGGER IF EXISTS trg_coach_summary_game_del ON public."Game_instance";
+CREATE TRIGGER trg_coach_summary_game_del
+    BEFORE DELETE ON public."Game_instance"
+    FOR EACH ROW EXECUTE FUNCTION public.coach_summary_game_trg();
+
+DROP TRIGGER IF EXISTS trg_coach_summary_game_host ON public."Game_instance";
+CREATE TRIGGER trg_coach_summary_game_host
+    AFTER UPDATE OF host_id ON public."Game_instance"
+    FOR EACH ROW EXECUTE FUNCTION public.coach_summary_game_trg();
+
+-- Game_participants: +1 on join, -1 when someone leaves a game that has not
+-- ended. Rows removed by a game delete find no game here and are skipped; the
+-- game trigger already accounted for them.
+CREATE OR REPLACE FUNCTION public.coach_summary_participant_trg()
+RETURNS TRIGGER AS $$
+DECLARE
+    g RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT host_id INTO g FROM public."Game_instance" WHERE game_id = NEW.game_id;
+        IF FOUND AND NEW.user_id <> g.host_id THEN
+            PERFORM public.coach_summary_bump(g.host_id, 0, 1);
+        END IF;
+        RETURN NEW;
+    ELSE
+        SELECT host_id, start_time, duration_minutes INTO g
+        FROM public."Game_instance" WHERE game_id = OLD.game_id;
+        IF FOUND AND OLD.user_id <> g.host_id
+           AND g.start_time + INTERVAL '1 minute' * g.duration_minutes > NOW() THEN
+            PERFORM public.coach_summary_bump(g.host_id, 0, -1);
+        END IF;
+        RETURN OLD;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_coach_summary_participant ON public."Game_participants";
+CREATE TRIGGER trg_coach_summary_participant
+    AFTER INSERT OR DELETE ON public."Game_participants"
+    FOR EACH ROW EXECUTE FUNCTION public.coach_summary_participant_trg();
+
+-- Backfill from the games currently on record (games archived before this
+-- migration are not in Game_instance any more and start from zero).
+INSERT INTO public."Coach_summary" (coach_id, sessions_hosted, participants_coached)
+SELECT
+    c.coach_id,
+    (SELECT COUNT(*) FROM public."Game_instance" gi WHERE gi.host_id = c.coach_id),
+    (SELECT COUNT(*)
+       FROM public."Game_participants" gp
+       JOIN public."Game_instance" gi ON gi.game_id = gp.game_id
+      WHERE gi.host_id = c.coach_id AND gp.user_id <> c.coach_id)
+FROM public."Coaches" c
+ON CONFLICT (coach_id) DO UPDATE
+SET sessions_hosted = EXCLUDED.sessions_hosted,
+    participants_coached = EXCLUDED.participants_coached,
+    updated_at = NOW();
+
+-- New coaches start with an empty summary row.
+CREATE OR REPLACE FUNCTION public.coach_summary_coach_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public."Coach_summary" (coach_id) VALUES (NEW.coach_id)
+    ON CONFLICT (coach_id) DO NOTHING;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_coach_summary_coach ON public."Coaches";
+CREATE TRIGGER trg_coach_summary_coach
+    AFTER INSERT ON public."Coaches"
+    FOR EACH ROW EXECUTE FUNCTION public.coach_summary_coach_trg();
+
+-- Directory indexes: one per sort order of /coaches/search (the expressions
+-- must match services/coach_directory.SORTS), plus the sport filter.
+CREATE INDEX IF NOT EXISTS idx_coaches_created ON public."Coaches" (created_at DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_coaches_verified_created ON public."Coaches" (isverified, created_at DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_coaches_rate_asc ON public."Coaches" ((COALESCE(hourly_rate, 1000000)), coach_id);
+CREATE INDEX IF NOT EXISTS idx_coaches_rate_desc ON public."Coaches" ((COALESCE(hourly_rate, 0)) DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_coaches_experience ON public."Coaches" ((COALESCE(experience_yrs, 0)) DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_coach_summary_sessions ON public."Coach_summary" (sessions_hosted DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_users_favorite_sport_lower ON public."Users" (LOWER(favorite_sport));
+
+ANALYZE public."Coaches";
+ANALYZE public."Coach_summary";
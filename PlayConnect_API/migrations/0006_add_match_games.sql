@@ -0,0 +1,122 @@
+-- Migration: Game-level match history (Match_games + Match_participants)
+-- Run this SQL script on your database to replace the pairwise Match_Histories table
+
+-- Match_Histories stored one row per participant pair (a 20-player game was
+-- 190 rows). History is now one Match_games row per archived game plus one
+-- Match_participants row per player. "Match_Histories" becomes a view with
+-- the old pairwise shape for anything that still reads it; match_id in that
+-- view is the match_game_id.
+--
+-- Existing pairwise rows are compacted: rows with the same
+-- (played_at, location, cost, duration) were one game. The whole script
+-- runs in a single transaction and is safe to re-run.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public."Match_games" (
+    match_game_id BIGSERIAL PRIMARY KEY,
+    game_id BIGINT UNIQUE,              -- Game_instance.game_id it was archived from (NULL for compacted legacy rows)
+    legacy_match_id BIGINT UNIQUE,      -- smallest Match_Histories.match_id of a compacted game
+    host_id INTEGER REFERENCES public."Users"(user_id) ON DELETE SET NULL,
+    sport_id INTEGER,
+    played_at TIMESTAMPTZ NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    location TEXT,
+    cost NUMERIC,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public."Match_participants" (
+    match_game_id BIGINT NOT NULL REFERENCES public."Match_games"(match_game_id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    score INTEGER NOT NULL DEFAULT 0,
+    result TEXT NOT NULL DEFAULT 'draw',  -- 'win' | 'loss' | 'draw'
+    PRIMARY KEY (match_game_id, user_id)
+);
+
+-- "my history": participant rows by user, then the game row by key
+CREATE INDEX IF NOT EXISTS idx_match_participants_user ON public."Match_participants" (user_id, match_game_id);
+CREATE INDEX IF NOT EXISTS idx_match_games_played_at ON public."Match_games" (played_at DESC, match_game_id DESC);
+
+-- Move the pairwise table out of the way (only the first time this runs).
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = 'Match_Histories' AND c.relkind = 'r'
+    ) THEN
+        ALTER TABLE public."Match_Histories" RENAME TO "Match_Histories_legacy";
+    END IF;
+END $$;
+
+-- Compact legacy rows: one game per (played_at, location, cost, duration),
+-- identified by its smallest match_id. PARTITION BY treats NULLs as equal.
+DO $$
+BEGIN
+    IF to_regclass('public."Match_Histories_legacy"') IS NULL THEN
+        RETURN;
+    END IF;
+
+    CREATE TEMP TABLE legacy_keyed ON COMMIT DROP AS
+    SELECT h.*,
+           MIN(h.match_id) OVER (PARTITION BY h.played_at, h.location, h.cost, h.duration_minute) AS group_id
+    FROM public."Match_Histories_legacy" h;
+
+    INSERT INTO public."Match_games" (legacy_match_id, played_at, duration_minutes, location, cost)
+    SELECT DISTINCT ON (group_id) group_id, played_at, duration_minute, location, cost
+    FROM legacy_keyed
+    ORDER BY group_id
+    ON CONFLICT (legacy_match_id) DO NOTHING;
+
+    -- Each pair row contributes both sides; the opponent's result is mirrored.
+    INSERT INTO public."Match_participants" (match_game_id, user_id, score, result)
+    SELECT DISTINCT ON (mg.match_game_id, side.user_id)
+           mg.match_game_id, side.user_id, COALESCE(side.score, 0), COALESCE(side.result, 'draw')
+    FROM legacy_keyed k
+    JOIN public."Match_games" mg ON mg.legacy_match_id = k.group_id
+    CROSS JOIN LATERAL (VALUES
+        (k.player_id, k.score_player, k.result),
+        (k.opponent_id, k.score_opponent,
+         CASE k.result WHEN 'win' THEN 'loss' WHEN 'loss' THEN 'win' ELSE k.result END)
+    ) AS side(user_id, score, result)
+    ORDER BY mg.match_game_id, side.user_id, k.match_id
+    ON CONFLICT (match_game_id, user_id) DO NOTHING;
+
+    -- Every (user, game) of the legacy rows must have made it across before
+    -- the pairwise rows are dropped.
+    IF EXISTS (
+        SELECT 1
+        FROM legacy_keyed k
+        CROSS JOIN LATERAL (VALUES (k.player_id), (k.opponent_id)) AS side(user_id)
+        JOIN public."Match_games" mg ON mg.legacy_match_id = k.group_id
+        LEFT JOIN public."Match_participants" mp
+               ON mp.match_game_id = mg.match_game_id AND mp.user_id = side.user_id
+        WHERE mp.user_id IS NULL
+    ) THEN
+        RAISE EXCEPTION 'Match_Histories compaction incomplete, nothing was changed';
+    END IF;
+
+    DROP TABLE public."Match_Histories_legacy";
+END $$;
+
+-- Backward-compatible pairwise view (same columns as the old table).
+CREATE OR REPLACE VIEW public."Match_Histories" AS
+SELECT
+    mg.match_game_id AS match_id,
+    a.user_id AS player_id,
+    b.user_id AS opponent_id,
+    a.score AS score_player,
+    b.score AS score_opponent,
+    a.result,
+    mg.duration_minutes AS duration_minute,
+    mg.location,
+    mg.cost,
+    mg.played_at
+FROM public."Match_games" mg
+JOIN public."Match_participants" a ON a.match_game_id = mg.match_game_id
+JOIN public."Match_participants" b ON b.match_game_id = mg.match_game_id AND b.user_id > a.user_id;
+
+COMMIT;
+
+ANALYZE public."Match_games";
+ANALYZE public."Match_participants";
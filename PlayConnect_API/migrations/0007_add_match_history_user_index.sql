@@ -0,0 +1,31 @@
+-- Migration: Player-centric match history index
+-- Run this SQL script on your database after 0006_add_match_games.sql
+
+-- A user's history is read newest first, optionally for one sport or date
+-- range. Copying played_at and sport_id onto the participant row lets one
+-- index range scan return a page in order: the cost of a page no longer
+-- depends on how many games the user has played. Both values are fixed when
+-- a game is archived (see archive_past_games), so the copies never drift.
+ALTER TABLE public."Match_participants"
+    ADD COLUMN IF NOT EXISTS played_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS sport_id INTEGER;
+
+UPDATE public."Match_participants" mp
+SET played_at = mg.played_at,
+    sport_id = mg.sport_id
+FROM public."Match_games" mg
+WHERE mg.match_game_id = mp.match_game_id
+  AND (mp.played_at IS NULL OR mp.sport_id IS DISTINCT FROM mg.sport_id);
+
+ALTER TABLE public."Match_participants" ALTER COLUMN played_at SET NOT NULL;
+
+-- Keyset order of GET /match-histories?user_id=... : (played_at, match_game_id) DESC
+CREATE INDEX IF NOT EXISTS idx_match_participants_user_played
+    ON public."Match_participants" (user_id, played_at DESC, match_game_id DESC);
+CREATE INDEX IF NOT EXISTS idx_match_participants_user_sport_played
+    ON public."Match_participants" (user_id, sport_id, played_at DESC, match_game_id DESC);
+
+-- Superseded by the two indexes above.
+DROP INDEX IF EXISTS public.idx_match_participants_user;
+
+ANALYZE public."Match_participants";
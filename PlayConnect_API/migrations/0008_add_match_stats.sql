@@ -0,0 +1,142 @@
+-- Migration: Per-user match stats and head-to-head rollups
+-- Run this SQL script on your database after 0007_add_match_history_user_index.sql
+
+-- Win/draw/loss records, minutes played and spend are kept as running totals
+-- so GET /stats/{user_id} and GET /stats/head-to-head are primary-key lookups
+-- instead of scans over a user's whole history.
+--
+--   User_match_stats   one row per (user, sport); sport_id 0 = unknown sport
+--   Head_to_head       one row per pair of users who played the same game,
+--                      stored once with user_low < user_high
+--
+-- Both are maintained by match_stats_apply(match_game_id, sign): +1 adds a
+-- game's contribution, -1 takes it back. archive_past_games calls it for the
+-- games it archives; a score edit is -1, update, +1 in one transaction.
+--
+-- Pair outcome: a player who won while the other did not wins the pair;
+-- any other combination (both won, both lost, draws) is a draw.
+
+CREATE TABLE IF NOT EXISTS public."User_match_stats" (
+    user_id INTEGER NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    sport_id INTEGER NOT NULL DEFAULT 0,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    minutes_played BIGINT NOT NULL DEFAULT 0,
+    spend NUMERIC NOT NULL DEFAULT 0,
+    last_played_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, sport_id)
+);
+
+CREATE TABLE IF NOT EXISTS public."Head_to_head" (
+    user_low INTEGER NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    user_high INTEGER NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    games INTEGER NOT NULL DEFAULT 0,
+    low_wins INTEGER NOT NULL DEFAULT 0,
+    high_wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    minutes_played BIGINT NOT NULL DEFAULT 0,
+    spend NUMERIC NOT NULL DEFAULT 0,  -- what each of the two paid across their shared games
+    last_played_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_low, user_high),
+    CHECK (user_low < user_high)
+);
+
+CREATE OR REPLACE FUNCTION public.match_stats_apply(p_match_game_id BIGINT, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO public."User_match_stats" AS s
+        (user_id, sport_id, games, wins, draws, losses, minutes_played, spend, last_played_at)
+    SELECT mp.user_id,
+           COALESCE(mg.sport_id, 0),
+           p_sign,
+           p_sign * (mp.result = 'win')::int,
+           p_sign * (mp.result = 'draw')::int,
+           p_sign * (mp.result = 'loss')::int,
+           p_sign * mg.duration_minutes,
+           p_sign * COALESCE(mg.cost, 0),
+           mg.played_at
+    FROM public."Match_participants" mp
+    JOIN public."Match_games" mg ON mg.match_game_id = mp.match_game_id
+    WHERE mp.match_game_id = p_match_game_id
+    ON CONFLICT (user_id, sport_id) DO UPDATE
+    SET games = s.games + EXCLUDED.games,
+        wins = s.wins + EXCLUDED.wins,
+        draws = s.draws + EXCLUDED.draws,
+        losses = s.losses + EXCLUDED.losses,
+        minutes_played = s.minutes_played + EXCLUDED.minutes_played,
+        spend = s.spend + EXCLUDED.spend,
+        last_played_at = GREATEST(s.last_played_at, EXCLUDED.last_played_at),
+        updated_at = NOW();
+
+    INSERT INTO public."Head_to_head" AS h
+        (user_low, user_high, games, low_wins, high_wins, draws, minutes_played, spend, last_played_at)
+    SELECT a.user_id,
+           b.user_id,
+           p_sign,
+           p_sign * (a.result = 'win' AND b.result <> 'win')::int,
+           p_sign * (b.result = 'win' AND a.result <> 'win')::int,
+           p_sign * ((a.result = 'win') = (b.result = 'win'))::int,
+           p_sign * mg.duration_minutes,
+           p_sign * COALESCE(mg.cost, 0),
+           mg.played_at
+    FROM public."Match_participants" a
+    JOIN public."Match_participants" b ON b.match_game_id = a.match_game_id AND b.user_id > a.user_id
+    JOIN public."Match_games" mg ON mg.match_game_id = a.match_game_id
+    WHERE a.match_game_id = p_match_game_id
+    ON CONFLICT (user_low, user_high) DO UPDATE
+    SET games = h.games + EXCLUDED.games,
+        low_wins = h.low_wins + EXCLUDED.low_wins,
+        high_wins = h.high_wins + EXCLUDED.high_wins,
+        draws = h.draws + EXCLUDED.draws,
+        minutes_played = h.minutes_played + EXCLUDED.minutes_played,
+        spend = h.spend + EXCLUDED.spend,
+        last_played_at = GREATEST(h.last_played_at, EXCLUDED.last_played_at),
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the history on record. Rebuilds both tables from scratch, so
+-- the script is safe to re-run (stop the archiver while it does).
+BEGIN;
+
+TRUNCATE public."User_match_stats", public."Head_to_head";
+
+INSERT INTO public."User_match_stats"
+    (user_id, sport_id, games, wins, draws, losses, minutes_played, spend, last_played_at)
+SELECT mp.user_id,
+       COALESCE(mg.sport_id, 0),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE mp.result = 'win'),
+       COUNT(*) FILTER (WHERE mp.result = 'draw'),
+       COUNT(*) FILTER (WHERE mp.result = 'loss'),
+       SUM(mg.duration_minutes),
+       SUM(COALESCE(mg.cost, 0)),
+       MAX(mg.played_at)
+FROM public."Match_participants" mp
+JOIN public."Match_games" mg ON mg.match_game_id = mp.match_game_id
+GROUP BY mp.user_id, COALESCE(mg.sport_id, 0);
+
+INSERT INTO public."Head_to_head"
+    (user_low, user_high, games, low_wins, high_wins, draws, minutes_played, spend, last_played_at)
+SELECT a.user_id,
+       b.user_id,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE a.result = 'win' AND b.result <> 'win'),
+       COUNT(*) FILTER (WHERE b.result = 'win' AND a.result <> 'win'),
+       COUNT(*) FILTER (WHERE (a.result = 'win') = (b.result = 'win')),
+       SUM(mg.duration_minutes),
+       SUM(COALESCE(mg.cost, 0)),
+       MAX(mg.played_at)
+FROM public."Match_participants" a
+JOIN public."Match_participants" b ON b.match_game_id = a.match_game_id AND b.user_id > a.user_id
+JOIN public."Match_games" mg ON mg.match_game_id = a.match_game_id
+GROUP BY a.user_id, b.user_id;
+
+COMMIT;
+
+ANALYZE public."User_match_stats";
+ANALYZE public."Head_to_head";
@@ -0,0 +1,56 @@
+-- Migration: Attendance counters and User_stats.attendance_rate
+-- Run this SQL script on your database after 0007_add_match_history_user_index.sql
+
+-- attendance_rate = games attended / (games attended + games left), per user
+-- and sport, NULL until a join has resolved either way. Joins to games that
+-- have not happened yet don't count against anyone.
+--
+--   joins_total     +1 on join / waitlist promotion (main.upsert_user_stats_delta)
+--   games_left      +1 when the user leaves a game
+--   games_attended  +1 for every participant still in a game when it is
+--                   archived, applied in bulk by archive_past_games
+ALTER TABLE public."User_stats"
+    ADD COLUMN IF NOT EXISTS joins_total INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS games_attended INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS games_left INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.attendance_rate(p_attended INTEGER, p_left INTEGER)
+RETURNS NUMERIC AS $$
+    SELECT ROUND(p_attended::numeric / NULLIF(p_attended + p_left, 0), 3)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Backfill. Leaves were never recorded, so history starts as full attendance
+-- of the archived games plus the joins still pending.
+BEGIN;
+
+INSERT INTO public."User_stats" (user_id, sport_id, games_played, games_hosted, xp, level)
+SELECT DISTINCT mp.user_id, COALESCE(mp.sport_id, 0), 0, 0, 0, 0
+FROM public."Match_participants" mp
+ON CONFLICT (user_id, sport_id) DO NOTHING;
+
+UPDATE public."User_stats" us
+SET games_attended = COALESCE(a.attended, 0),
+    joins_total = COALESCE(a.attended, 0) + COALESCE(p.pending, 0),
+    games_left = 0,
+    attendance_rate = public.attendance_rate(COALESCE(a.attended, 0), 0)
+FROM public."User_stats" base
+LEFT JOIN (
+    SELECT user_id, COALESCE(sport_id, 0) AS sport_id, COUNT(*)::int AS attended
+    FROM public."Match_participants"
+    GROUP BY 1, 2
+) a ON a.user_id = base.user_id AND a.sport_id = base.sport_id
+LEFT JOIN (
+    SELECT gp.user_id, COALESCE(gi.sport_id, 0) AS sport_id, COUNT(*)::int AS pending
+    FROM public."Game_participants" gp
+    JOIN public."Game_instance" gi ON gi.game_id = gp.game_id
+    GROUP BY 1, 2
+) p ON p.user_id = base.user_id AND p.sport_id = base.sport_id
+WHERE base.user_id = us.user_id AND base.sport_id = us.sport_id;
+
+COMMIT;
+
+-- Player search sorts/filters on attendance within a sport.
+CREATE INDEX IF NOT EXISTS idx_user_stats_sport_attendance
+    ON public."User_stats" (sport_id, attendance_rate DESC NULLS LAST, user_id);
+
+ANALYZE public."User_stats";
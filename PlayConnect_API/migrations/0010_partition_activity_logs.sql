@@ -0,0 +1,152 @@
+-- Migration: Monthly partitions for activity_logs + User_login_days rollup
+-- Run this SQL script on your database to partition activity_logs by month
+
+-- activity_logs becomes a RANGE partitioned table, one partition per calendar
+-- month (UTC) named activity_logs_pYYYYMM. Retention drops whole partitions
+-- (no DELETE, no bloat); services/activity_log.maintain_partitions() creates
+-- the months ahead and drops the expired ones daily.
+--
+-- Login days are rolled up into User_login_days by a trigger, so streaks and
+-- badge checks read a handful of (user_id, day) rows instead of the log, and
+-- keep working after the log rows they came from are dropped.
+--
+-- The primary key of a partitioned table must contain the partition key:
+-- it is (id, created_at). id is still unique (one sequence for all rows).
+
+BEGIN;
+
+-- Creates the partition holding `p_month` if it doesn't exist yet.
+CREATE OR REPLACE FUNCTION public.activity_logs_ensure_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_at TIMESTAMPTZ := date_trunc('month', p_month::timestamp) AT TIME ZONE 'UTC';
+    part_name TEXT := 'activity_logs_p' || to_char(p_month, 'YYYYMM');
+BEGIN
+    IF to_regclass('public.' || quote_ident(part_name)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public."activity_logs" FOR VALUES FROM (%L) TO (%L)',
+            part_name, start_at, start_at + INTERVAL '1 month'
+        );
+    END IF;
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drops partitions whose whole month is older than `p_keep_months` months
+-- before the current one. Returns the names dropped.
+CREATE OR REPLACE FUNCTION public.activity_logs_drop_partitions(p_keep_months INTEGER)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    cutoff TEXT := 'activity_logs_p' || to_char(
+        date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => p_keep_months), 'YYYYMM'
+    );
+    part RECORD;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public."activity_logs"'::regclass
+          AND c.relname ~ '^activity_logs_p[0-9]{6}$'
+          AND c.relname < cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE public.%I', part.relname);
+        RETURN NEXT part.relname;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = 'activity_logs' AND c.relkind = 'r'
+    ) THEN
+        ALTER TABLE public."activity_logs" RENAME TO "activity_logs_legacy";
+    END IF;
+END $$;
+
+CREATE SEQUENCE IF NOT EXISTS public.activity_logs_log_id_seq AS BIGINT;
+
+CREATE TABLE IF NOT EXISTS public."activity_logs" (
+    id BIGINT NOT NULL DEFAULT nextval('public.activity_logs_log_id_seq'),
+    user_id BIGINT NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    action TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE public.activity_logs_log_id_seq OWNED BY public."activity_logs".id;
+
+-- Keyset order of GET /activity_logs, overall and per user (created on every partition)
+CREATE INDEX IF NOT EXISTS idx_activity_logs_created ON public."activity_logs" (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created ON public."activity_logs" (user_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS public."User_login_days" (
+    user_id BIGINT NOT NULL REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    day DATE NOT NULL,              -- UTC calendar day
+    logins INTEGER NOT NULL DEFAULT 1,
+    first_at TIMESTAMPTZ NOT NULL,
+    last_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE OR REPLACE FUNCTION public.user_login_days_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public."User_login_days" AS d (user_id, day, logins, first_at, last_at)
+    VALUES (NEW.user_id, (NEW.created_at AT TIME ZONE 'UTC')::date, 1, NEW.created_at, NEW.created_at)
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET logins = d.logins + 1,
+        first_at = LEAST(d.first_at, EXCLUDED.first_at),
+        last_at = GREATEST(d.last_at, EXCLUDED.last_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_login_days ON public."activity_logs";
+CREATE TRIGGER trg_user_login_days
+    AFTER INSERT ON public."activity_logs"
+    FOR EACH ROW WHEN (NEW.action = 'login')
+    EXECUTE FUNCTION public.user_login_days_trg();
+
+-- Partitions for the legacy rows and the next three months, then move the rows
+-- across (the trigger fills User_login_days as they go in).
+DO $$
+DECLARE
+    first_month DATE;
+    m DATE;
+BEGIN
+    first_month := date_trunc('month', NOW() AT TIME ZONE 'UTC')::date;
+    IF to_regclass('public."activity_logs_legacy"') IS NOT NULL THEN
+        EXECUTE 'SELECT LEAST($1, COALESCE(date_trunc(''month'', MIN(created_at))::date, $1))
+                 FROM public."activity_logs_legacy"'
+        INTO first_month USING first_month;
+    END IF;
+
+    m := first_month;
+    WHILE m <= (date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '3 months')::date LOOP
+        PERFORM public.activity_logs_ensure_partition(m);
+        m := (m + INTERVAL '1 month')::date;
+    END LOOP;
+
+    IF to_regclass('public."activity_logs_legacy"') IS NOT NULL THEN
+        INSERT INTO public."activity_logs" (id, user_id, action, created_at)
+        SELECT id, user_id, action, created_at FROM public."activity_logs_legacy";
+
+        IF (SELECT COUNT(*) FROM public."activity_logs")
+           <> (SELECT COUNT(*) FROM public."activity_logs_legacy") THEN
+            RAISE EXCEPTION 'activity_logs copy incomplete, nothing was changed';
+        END IF;
+
+        PERFORM setval('public.activity_logs_log_id_seq',
+                       GREATEST((SELECT MAX(id) FROM public."activity_logs"), 1));
+        DROP TABLE public."activity_logs_legacy";
+    END IF;
+END $$;
+
+COMMIT;
+
+ANALYZE public."activity_logs";
+ANALYZE public."User_login_days";
@@ -0,0 +1,40 @@
+-- Migration: Per-user login streaks and Users.timezone
+-- Run this SQL script on your database after 0010_partition_activity_logs.sql
+
+-- One row per user, upserted on login (services/streaks.py). Days are the
+-- user's local calendar days, so every user needs a timezone.
+ALTER TABLE public."Users"
+    ADD COLUMN IF NOT EXISTS timezone TEXT NOT NULL DEFAULT 'UTC';
+
+CREATE TABLE IF NOT EXISTS public."User_login_streaks" (
+    user_id BIGINT PRIMARY KEY REFERENCES public."Users"(user_id) ON DELETE CASCADE,
+    current_streak INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    last_login_date DATE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Backfill users without a row from User_login_days (UTC days, the only
+-- ones on record). Consecutive days share day - row_number: one run each.
+WITH numbered AS (
+    SELECT user_id, day,
+           day - (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day))::int AS run_id
+    FROM public."User_login_days"
+),
+runs AS (
+    SELECT user_id, run_id, COUNT(*)::int AS length, MAX(day) AS last_day
+    FROM numbered
+    GROUP BY user_id, run_id
+),
+per_user AS (
+    SELECT user_id, MAX(length) AS longest, MAX(last_day) AS last_login_date
+    FROM runs
+    GROUP BY user_id
+)
+INSERT INTO public."User_login_streaks" (user_id, current_streak, longest_streak, last_login_date)
+SELECT p.user_id, r.length, p.longest, p.last_login_date
+FROM per_user p
+JOIN runs r ON r.user_id = p.user_id AND r.last_day = p.last_login_date
+ON CONFLICT (user_id) DO NOTHING;  -- rows written by logins since are newer
+
+ANALYZE public."User_login_streaks";
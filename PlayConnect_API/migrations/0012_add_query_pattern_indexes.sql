@@ -0,0 +1,55 @@
+-- Migration: Indexes for the hot handler predicates
+-- Run this SQL script on your database to add the indexes (benchmarks/explain_indexes.py checks the plans)
+
+-- Game_participants: lookups by game are served by the (game_id, user_id)
+-- unique key that ON CONFLICT relies on; "games of a user" needs its own.
+CREATE INDEX IF NOT EXISTS idx_game_participants_user
+    ON public."Game_participants" (user_id, game_id);
+
+-- Notifications: a user's feed newest first (GET /notifications?user_id=),
+-- and the unread subset (unread_only=true, /notifications/unread_count).
+-- Two indexes instead of one on (user_id, is_read, notification_id): the
+-- unfiltered feed couldn't read that one in notification_id order.
+CREATE INDEX IF NOT EXISTS idx_notifications_user_id_desc
+    ON public."Notifications" (user_id, notification_id DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+    ON public."Notifications" (user_id, notification_id DESC)
+    WHERE is_read = FALSE;
+
+-- Friends: pending requests received (friend_id) / sent (user_id), and the
+-- accepted edges of a user, which match on either side (BitmapOr of both).
+CREATE INDEX IF NOT EXISTS idx_friends_friend_status
+    ON public."Friends" (friend_id, status);
+CREATE INDEX IF NOT EXISTS idx_friends_user_status
+    ON public."Friends" (user_id, status);
+
+-- activity_logs: a user's events of one kind, newest first (created on every partition)
+CREATE INDEX IF NOT EXISTS idx_activity_logs_user_action_created
+    ON public."activity_logs" (user_id, action, created_at DESC);
+
+-- Game_instance: a host's games in time order (dashboard host_id filter sorted by start_time)
+CREATE INDEX IF NOT EXISTS idx_game_instance_host_start
+    ON public."Game_instance" (host_id, start_time);
+
+-- Waitlist (game_id, joined_at) is already covered by idx_waitlist_game_queue
+-- (0003_add_waitlist_indexes.sql) for every query that reads it.
+
+-- End of a game, the expression the upcoming/past filters use. timestamp +
+-- interval is only immutable (indexable) for timestamp WITHOUT time zone;
+-- with timestamptz the filters need a stored end_time column instead.
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'Game_instance' AND column_name = 'start_time')
+       = 'timestamp without time zone' THEN
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_game_instance_end_expr
+                 ON public."Game_instance" ((start_time + INTERVAL ''1 minute'' * duration_minutes))';
+    ELSE
+        RAISE NOTICE 'Game_instance.start_time is timestamptz, skipping the end-time expression index';
+    END IF;
+END $$;
+
+ANALYZE public."Game_participants";
+ANALYZE public."Notifications";
+ANALYZE public."Friends";
+ANALYZE public."Game_instance";
@@ -0,0 +1,43 @@
+-- Migration: Stored end_time on Game_instance for the upcoming / past filters
+-- Run this SQL script on your database to add the column and its indexes
+-- (benchmarks/game_end_time.py shows the plans before and after)
+
+-- end_time = start_time + duration_minutes. Not a generated column:
+-- timestamptz + interval is only STABLE (it depends on the session TimeZone
+-- for day/month units), and generated columns need an IMMUTABLE expression.
+-- A BEFORE trigger keeps it in step with start_time / duration_minutes.
+ALTER TABLE public."Game_instance"
+ADD COLUMN IF NOT EXISTS end_time TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION public.game_instance_end_time_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.end_time := NEW.start_time + make_interval(mins => NEW.duration_minutes);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_game_instance_end_time ON public."Game_instance";
+CREATE TRIGGER trg_game_instance_end_time
+    BEFORE INSERT OR UPDATE OF start_time, duration_minutes ON public."Game_instance"
+    FOR EACH ROW EXECUTE FUNCTION public.game_instance_end_time_trg();
+
+UPDATE public."Game_instance"
+SET end_time = start_time + make_interval(mins => duration_minutes)
+WHERE end_time IS DISTINCT FROM start_time + make_interval(mins => duration_minutes);
+
+ALTER TABLE public."Game_instance"
+ALTER COLUMN end_time SET NOT NULL;
+
+-- Upcoming games (GET /game-instances) and past games (archive_past_games)
+CREATE INDEX IF NOT EXISTS idx_game_instance_end_time
+    ON public."Game_instance" (end_time);
+
+-- Dashboard: equality filters first, then the end_time range
+CREATE INDEX IF NOT EXISTS idx_game_instance_sport_status_end
+    ON public."Game_instance" (sport_id, status, end_time);
+
+-- Superseded by end_time (only ever created on timestamp without time zone)
+DROP INDEX IF EXISTS public.idx_game_instance_end_expr;
+
+ANALYZE public."Game_instance";
@@ -0,0 +1,16 @@
+-- Migration: Coach lists ordered on COALESCE(created_at, '-infinity')
+-- Run this SQL script on your database to replace the created_at indexes
+
+-- Coaches.created_at is nullable. GET /coaches and /coaches/search?sort=newest
+-- now sort and page on the coalesced value so rows with a NULL created_at
+-- (last in the list) can't be skipped by the keyset cursor; these indexes
+-- replace the plain created_at ones from 0005_add_coach_summary.sql.
+CREATE INDEX IF NOT EXISTS idx_coaches_created_nn
+    ON public."Coaches" ((COALESCE(created_at, '-infinity'::timestamptz)) DESC, coach_id DESC);
+CREATE INDEX IF NOT EXISTS idx_coaches_verified_created_nn
+    ON public."Coaches" (isverified, (COALESCE(created_at, '-infinity'::timestamptz)) DESC, coach_id DESC);
+
+DROP INDEX IF EXISTS public.idx_coaches_created;
+DROP INDEX IF EXISTS public.idx_coaches_verified_created;
+
+ANALYZE public."Coaches";
@@ -0,0 +1,26 @@
+-- Migration: UTC partition bounds for activity_logs
+-- Run this SQL script on databases that already applied 0010_partition_activity_logs.sql
+
+-- The first version of activity_logs_ensure_partition() computed the upper
+-- bound as timestamptz + 1 month, which follows the session TimeZone: under
+-- a non-UTC session a month could end before the next one starts and inserts
+-- in the gap failed with "no partition found". Partitions created from a UTC
+-- session (the default for the API and the maintenance job) are correct; this
+-- replaces the function so future months are too.
+CREATE OR REPLACE FUNCTION public.activity_logs_ensure_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', p_month::timestamp);
+    start_at TIMESTAMPTZ := month_start AT TIME ZONE 'UTC';
+    end_at TIMESTAMPTZ := (month_start + INTERVAL '1 month') AT TIME ZONE 'UTC';
+    part_name TEXT := 'activity_logs_p' || to_char(p_month, 'YYYYMM');
+BEGIN
+    IF to_regclass('public.' || quote_ident(part_name)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public."activity_logs" FOR VALUES FROM (%L) TO (%L)',
+            part_name, start_at, end_at
+        );
+    END IF;
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
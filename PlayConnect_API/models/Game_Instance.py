@@ -25,6 +25,8 @@ class GameInstance(Base):
 
     start_time = Column(TIMESTAMP(timezone=True), nullable=False)
     duration_minutes = Column(Integer, nullable=False)
+    # start_time + duration_minutes, set by trg_game_instance_end_time
+    end_time = Column(TIMESTAMP(timezone=True), nullable=False)
     location = Column(Text, nullable=False)
     skill_level = Column(String, nullable=False)
     max_players = Column(Integer, nullable=False)
@@ -1,9 +1,40 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, Text, Numeric
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, TIMESTAMP, Text, Numeric, func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+class MatchGame(Base):
+    __tablename__ = "Match_games"
+    __table_args__ = {"schema": "public"}
+
+    match_game_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    game_id = Column(BigInteger, unique=True, nullable=True)
+    legacy_match_id = Column(BigInteger, unique=True, nullable=True)
+    host_id = Column(Integer, ForeignKey("Users.user_id", ondelete="SET NULL"), nullable=True)
+    sport_id = Column(Integer, nullable=True)
+    played_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    location = Column(Text, nullable=True)
+    cost = Column(Numeric, nullable=True)
+    archived_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+
+class MatchParticipant(Base):
+    __tablename__ = "Match_participants"
+    __table_args__ = {"schema": "public"}
+
+    match_game_id = Column(BigInteger, ForeignKey("Match_games.match_game_id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("Users.user_id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, nullable=False, default=0)
+    result = Column(String, nullable=False, default="draw")  # "win", "loss", "draw"
+    # copied from the game at archive time for the per-user history index
+    played_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    sport_id = Column(Integer, nullable=True)
+
+
+# Read-only pairwise view over Match_games/Match_participants
+# (migrations/0006_add_match_games.sql); match_id is the match_game_id.
 class MatchHistory(Base):
     __tablename__ = "Match_Histories"
     __table_args__ = {"schema": "public"}
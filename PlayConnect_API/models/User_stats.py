@@ -15,3 +15,6 @@ class UserStat(Base):
 
     xp = Column(Integer, nullable=False, default=0)
     level = Column(Integer, nullable=False, default=0)
+    joins_total = Column(Integer, nullable=False, default=0)
+    games_attended = Column(Integer, nullable=False, default=0)
+    games_left = Column(Integer, nullable=False, default=0)
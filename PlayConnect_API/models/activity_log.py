@@ -8,7 +8,8 @@ class ActivityLog(Base):
     __tablename__ = "activity_logs"
     __table_args__ = {"schema": "public"}
 
+    # Partitioned by month on created_at, which is why it is part of the key
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey("Users.user_id", ondelete="CASCADE"), nullable=False)
     action = Column(Text, nullable=False)
-    created_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+    created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,705 @@
+"""Named SQL statements for PlayConnect API.
+
+Statements live here under a stable name instead of as literals inside
+handlers; only SQL built per request (optional filters, SET clauses) stays
+inline. Each is run through fetch()/fetchrow()/fetchval()/execute(), which
+gives two things:
+
+  * Statements on hot request paths, registered with hot=True, are prepared
+    once per connection by the pool's `init` hook (prepare_hot). Requests then
+    reuse the server-side plan rather than depending on whatever is in
+    asyncpg's LRU statement cache.
+  * Every call is timed per name. GET /admin/query-stats shows which
+    statements are slow or called too often.
+
+Set DB_PREPARE_STATEMENTS=0 to skip explicit preparation, e.g. behind a
+transaction-pooling proxy that cannot keep prepared statements alive.
+
+Services register their own statements with register() at import time.
+"""
+
+import os
+import time
+import weakref
+from typing import Dict, List, NamedTuple
+
+import asyncpg
+
+PREPARE_STATEMENTS = os.getenv("DB_PREPARE_STATEMENTS", "1") != "0"
+
+
+class Statement(NamedTuple):
+    name: str
+    sql: str
+    hot: bool
+
+
+class _Stats:
+    __slots__ = ("calls", "prepared_calls", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.prepared_calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+CATALOGUE: Dict[str, Statement] = {}
+_stats: Dict[str, _Stats] = {}
+# raw asyncpg Connection -> {name: PreparedStatement}
+_prepared: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def register(name: str, sql: str, *, hot: bool = False) -> str:
+    """Add a statement to the catalogue; returns `name` so modules can keep a constant."""
+    existing = CATALOGUE.get(name)
+    if existing and existing.sql != sql:
+        raise ValueError(f"Statement {name!r} already registered with different SQL")
+    CATALOGUE[name] = Statement(name, sql, hot)
+    _stats.setdefault(name, _Stats())
+    return name
+
+
+def sql(name: str) -> str:
+    return CATALOGUE[name].sql
+
+
+def _raw(conn):
+    if isinstance(conn, asyncpg.pool.PoolConnectionProxy):
+        return conn._con
+    return conn
+
+
+async def prepare_hot(conn) -> None:
+    """asyncpg pool `init` hook: prepare every hot statement on a new connection.
+
+    A statement that fails to prepare (e.g. a column its migration has not
+    added yet) is skipped and runs unprepared, instead of failing the
+    connection and with it every request.
+    """
+    if not PREPARE_STATEMENTS:
+        return
+    prepared = {}
+    for stmt in CATALOGUE.values():
+        if not stmt.hot:
+            continue
+        try:
+            prepared[stmt.name] = await conn.prepare(stmt.sql)
+        except asyncpg.PostgresError as e:
+            print(f"[queries] not preparing {stmt.name}: {e}")
+    _prepared[conn] = prepared
+
+
+async def _run(conn, method: str, name: str, args):
+    stats = _stats[name]
+    prepared = _prepared.get(_raw(conn), {}).get(name) if method != "execute" else None
+    start = time.perf_counter()
+    try:
+        if prepared is not None:
+            try:
+                result = await getattr(prepared, method)(*args)
+                stats.prepared_calls += 1
+            except asyncpg.exceptions.InvalidCachedStatementError:
+                # schema changed under the prepared plan: drop it and run
+                # unprepared. Inside a transaction the error has already
+                # aborted it, so re-raise and let the caller retry.
+                _prepared.get(_raw(conn), {}).pop(name, None)
+                if conn.is_in_transaction():
+                    raise
+                result = await getattr(conn, method)(CATALOGUE[name].sql, *args)
+        else:
+            result = await getattr(conn, method)(CATALOGUE[name].sql, *args)
+        return result
+    except Exception:
+        stats.errors += 1
+        raise
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stats.calls += 1
+        stats.total_ms += elapsed
+        stats.max_ms = max(stats.max_ms, elapsed)
+
+
+async def fetch(conn, name: str, *args):
+    return await _run(conn, "fetch", name, args)
+
+
+async def fetchrow(conn, name: str, *args):
+    return await _run(conn, "fetchrow", name, args)
+
+
+async def fetchval(conn, name: str, *args):
+    return await _run(conn, "fetchval", name, args)
+
+
+async def execute(conn, name: str, *args):
+    """Run a statement for its status string. Never prepared: asyncpg's
+    PreparedStatement has no execute(), so register these with hot=False."""
+    return await _run(conn, "execute", name, args)
+
+
+def stats() -> List[dict]:
+    """Per-statement counters, slowest total first."""
+    out = []
+    for name, s in _stats.items():
+        out.append({
+            "name": name,
+            "hot": CATALOGUE[name].hot,
+            "calls": s.calls,
+            "prepared_calls": s.prepared_calls,
+            "errors": s.errors,
+            "total_ms": round(s.total_ms, 3),
+            "avg_ms": round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+            "max_ms": round(s.max_ms, 3),
+        })
+    return sorted(out, key=lambda r: r["total_ms"], reverse=True)
+
+
+def reset_stats() -> None:
+    for name in _stats:
+        _stats[name] = _Stats()
+
+
+# ---------------------------------------------------------------------------
+# Catalogue
+# ---------------------------------------------------------------------------
+
+USER_BY_EMAIL_FOR_LOGIN = register("users.by_email_for_login", '''
+    SELECT user_id, email, password, role, first_name, last_name, isverified, timezone
+    FROM public."Users"
+    WHERE LOWER(email) = LOWER($1)
+''', hot=True)
+
+PROFILE_BY_ID = register("users.profile_by_id", '''
+    SELECT u.user_id, u.first_name, u.last_name, u.age, u.favorite_sport, u.bio, u.avatar_url, u.role,
+           u.timezone,
+           COALESCE(s.current_streak, 0) AS current_streak,
+           COALESCE(s.longest_streak, 0) AS longest_streak,
+           s.last_login_date
+    FROM public."Users" AS u
+    LEFT JOIN public."User_login_streaks" AS s ON s.user_id = u.user_id
+    WHERE u.user_id = $1
+''', hot=True)
+
+COACH_BY_ID = register("coaches.by_id", '''
+    SELECT
+        c.coach_id,
+        c.experience_yrs,
+        c.certifications,
+        c.isverified,
+        c.hourly_rate,
+        c.created_at,
+        u.first_name,
+        u.last_name,
+        u.avatar_url,
+        u.bio,
+        u.favorite_sport,
+        u.email
+    FROM public."Coaches" c
+    LEFT JOIN public."Users" u ON c.coach_id = u.user_id
+    WHERE c.coach_id = $1
+''', hot=True)
+
+GAME_BY_ID = register("games.by_id", '''
+    SELECT game_id, host_id, sport_id, start_time, duration_minutes, end_time, location,
+           skill_level, max_players, cost, status, notes, created_at, updated_at
+    FROM public."Game_instance"
+    WHERE game_id = $1
+''', hot=True)
+
+GAME_PARTICIPANTS = register("games.participants", '''
+    SELECT
+        gp.participant_id,
+        gp.game_id,
+        gp.user_id,
+        gp.joined_at,
+        u.first_name,
+        u.last_name,
+        u.email,
+        us.attendance_rate,
+        COALESCE(us.games_attended, 0) AS games_attended
+    FROM public."Game_participants" AS gp
+    JOIN public."Users" AS u ON u.user_id = gp.user_id
+    JOIN public."Game_instance" AS gi ON gi.game_id = gp.game_id
+    LEFT JOIN public."User_stats" AS us
+           ON us.user_id = gp.user_id AND us.sport_id = COALESCE(gi.sport_id, 0)
+    WHERE gp.game_id = $1
+    ORDER BY gp.joined_at ASC
+''', hot=True)
+
+NOTIFICATIONS_UNREAD_COUNT = register("notifications.unread_count", '''
+    SELECT COUNT(*) FROM public."Notifications" WHERE user_id = $1 AND is_read = FALSE
+''', hot=True)
+
+NOTIFICATION_MARK_READ = register("notifications.mark_read", '''
+    UPDATE public."Notifications"
+    SET is_read = TRUE
+    WHERE notification_id = $1
+    RETURNING notification_id, user_id, message, type, metadata, is_read, created_at
+''', hot=True)
+
+FRIENDS_ACCEPTED = register("friends.accepted", '''
+    WITH edges AS (
+      SELECT
+        CASE WHEN f.user_id = $1 THEN f.friend_id ELSE f.user_id END AS other_id,
+        f.status, f.created_at
+      FROM public."Friends" f
+      WHERE f.status = 'accepted'
+        AND ($1 = f.user_id OR $1 = f.friend_id)
+    )
+    SELECT e.status, e.created_at,
+           u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
+    FROM edges e
+    JOIN public."Users" u ON u.user_id = e.other_id
+    ORDER BY e.created_at DESC
+''', hot=True)
+
+FRIENDS_PENDING_RECEIVED = register("friends.pending_received", '''
+    SELECT f.status, f.created_at,
+           u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
+    FROM public."Friends" f
+    JOIN public."Users"  u ON u.user_id = f.user_id
+    WHERE f.status = 'pending' AND f.friend_id = $1
+    ORDER BY f.created_at DESC
+''', hot=True)
+
+FRIENDS_PENDING_SENT = register("friends.pending_sent", '''
+    SELECT f.status, f.created_at,
+           u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
+    FROM public."Friends" f
+    JOIN public."Users" u ON u.user_id = f.friend_id
+    WHERE f.status = 'pending' AND f.user_id = $1
+    ORDER BY f.created_at DESC
+''', hot=True)
+
+REPORT_BY_ID = register("reports.by_id", '''
+    SELECT report_id, reporter_id, reported_user_id, report_game_id, reason, created_at
+    FROM public."Reports"
+    WHERE report_id = $1
+''')
+
+
+# ---------------------------------------------------------------------------
+# Other handlers: catalogued for the per-statement stats, not prepared up
+# front (asyncpg's own statement cache still applies)
+# ---------------------------------------------------------------------------
+
+ACTIVITY_LOG_APPEND = register("activity_logs.append", '''
+    INSERT INTO public."activity_logs" (user_id, action, created_at)
+    VALUES ($1, $2, NOW())
+''')
+
+USER_STATS_ADD_DELTA = register("user_stats.add_delta", '''
+    INSERT INTO public."User_stats" AS s
+        (user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level, joins_total, games_left)
+    VALUES ($1, $2, $3, $4, public.attendance_rate(0, GREATEST($8, 0)),
+            $5, FLOOR(GREATEST($5, 0)::numeric / $6), GREATEST($7, 0), GREATEST($8, 0))
+    ON CONFLICT (user_id, sport_id)
+    DO UPDATE SET
+        games_played = GREATEST(s.games_played + $3, 0),
+        games_hosted = GREATEST(s.games_hosted + $4, 0),
+        xp = GREATEST(s.xp + $5, 0),
+        level = FLOOR(GREATEST(s.xp + $5, 0)::numeric / $6),
+        joins_total = GREATEST(s.joins_total + $7, 0),
+        games_left = GREATEST(s.games_left + $8, 0),
+        attendance_rate = public.attendance_rate(s.games_attended, GREATEST(s.games_left + $8, 0))
+    RETURNING user_id, sport_id, games_played, games_hosted, attendance_rate, xp, level
+''')
+
+PROGRESS_STAT_TOTALS = register("progress.stat_totals", '''
+    SELECT
+        COALESCE(SUM(games_played), 0) AS total_games_played,
+        COALESCE(SUM(games_hosted), 0) AS total_games_hosted,
+        COALESCE(SUM(xp), 0) AS total_xp,
+        COALESCE(MAX(level), 0) AS current_level
+    FROM public."User_stats"
+    WHERE user_id = $1
+''')
+
+PROGRESS_GAMES_PLAYED = register("progress.games_played", '''
+    SELECT COUNT(*) FROM public."Game_participants" WHERE user_id = $1
+''')
+
+PROGRESS_GAMES_HOSTED = register("progress.games_hosted", '''
+    SELECT COUNT(*) FROM public."Game_instance" WHERE host_id = $1
+''')
+
+PROGRESS_FRIEND_COUNT = register("progress.friend_count", '''
+    SELECT COUNT(*)
+    FROM public."Friends"
+    WHERE status = 'accepted' AND ($1 = user_id OR $1 = friend_id)
+''')
+
+PROGRESS_VERIFIED_COACH = register("progress.verified_coach", '''
+    SELECT 1 FROM public."Coaches"
+    WHERE coach_id = $1 AND isverified = TRUE
+    LIMIT 1
+''')
+
+PROGRESS_XP_RANK = register("progress.xp_rank", '''
+    WITH totals AS (
+        SELECT user_id, COALESCE(SUM(xp), 0) AS total_xp
+        FROM public."User_stats"
+        GROUP BY user_id
+    ), ranked AS (
+        SELECT
+            user_id,
+            total_xp,
+            ROW_NUMBER() OVER (ORDER BY total_xp DESC) AS rk,
+            COUNT(*) OVER () AS total_users
+        FROM totals
+    )
+    SELECT total_xp, rk, total_users
+    FROM ranked
+    WHERE user_id = $1
+''')
+
+USER_BADGE_NAMES = register("user_badges.names_by_user", '''
+    SELECT badge_name FROM public."user_badges" WHERE user_id = $1
+''')
+
+USER_BADGE_AWARD = register("user_badges.award", '''
+    INSERT INTO public."user_badges" (user_id, badge_name, earned_on, seen)
+    VALUES ($1, $2, NOW(), FALSE)
+''')
+
+GAME_WITH_SPORT = register("games.with_sport", '''
+    SELECT gi.game_id, gi.sport_id, gi.location, gi.start_time, gi.duration_minutes, 
+           gi.skill_level, s.name AS sport_name
+    FROM public."Game_instance" AS gi
+    JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
+    WHERE gi.game_id = $1 LIMIT 1
+''')
+
+USER_CONTACT_BY_ID = register("users.contact_by_id", '''
+    SELECT user_id, email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1
+''')
+
+GAME_PARTICIPANT_DELETE = register("participants.delete", '''
+    DELETE FROM public."Game_participants" WHERE game_id = $1 AND user_id = $2
+''')
+
+USER_CONTACT_BY_EMAIL = register("users.contact_by_email", '''
+    SELECT user_id, email, first_name FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1
+''')
+
+RESET_TOKEN_INSERT = register("password_reset.insert", '''
+    INSERT INTO public."Password_reset_tokens" (user_id, token_hash, expires_at) VALUES ($1, $2, $3)
+''')
+
+RESET_TOKEN_BY_HASH = register("password_reset.by_hash", '''
+    SELECT id, user_id, expires_at, used_at
+    FROM public."Password_reset_tokens"
+    WHERE token_hash = $1
+    LIMIT 1
+''')
+
+USER_SET_PASSWORD = register("users.set_password", '''
+    UPDATE public."Users"
+    SET password = $1
+    WHERE user_id = $2
+''')
+
+RESET_TOKEN_MARK_USED = register("password_reset.mark_used", '''
+    UPDATE public."Password_reset_tokens"
+    SET used_at = NOW()
+    WHERE id = $1
+''')
+
+USER_VERIFICATION_BY_EMAIL = register("users.verification_by_email", '''
+    SELECT user_id, email, isverified FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1
+''')
+
+USER_MARK_VERIFIED = register("users.mark_verified", '''
+    UPDATE public."Users" SET isverified = TRUE WHERE user_id = $1
+''')
+
+USER_VERIFICATION_CONTACT_BY_EMAIL = register("users.verification_contact_by_email", '''
+    SELECT user_id, email, first_name, isverified FROM public."Users" WHERE LOWER(email) = LOWER($1) LIMIT 1
+''')
+
+PROFILE_CREATE = register("users.profile_create", '''
+    UPDATE public."Users"
+    SET first_name = $1,
+        last_name = $2,
+        age = $3,
+        favorite_sport = $4,
+        bio = $5,
+        avatar_url = $6,
+        role = $7,
+        timezone = COALESCE($9, timezone)
+    WHERE user_id = $8
+    RETURNING user_id, email, first_name, last_name, age, avatar_url, bio, favorite_sport, isverified, num_of_strikes, created_at, role
+''')
+
+PROFILE_UPDATE = register("users.profile_update", '''
+    WITH prev AS (
+        SELECT user_id, bio FROM public."Users" WHERE user_id = $8 FOR UPDATE
+    )
+    UPDATE public."Users" AS u
+    SET first_name = $1,
+        last_name = $2,
+        age = $3,
+        favorite_sport = $4,
+        bio = $5,
+        avatar_url = $6,
+        role = $7,
+        timezone = COALESCE($9, u.timezone)
+    FROM prev
+    WHERE u.user_id = prev.user_id
+    RETURNING u.user_id, u.first_name, u.last_name, u.age, u.favorite_sport, u.bio,
+              u.avatar_url, u.role, u.timezone, prev.bio AS previous_bio
+''')
+
+USER_SET_AVATAR = register("users.set_avatar", '''
+    UPDATE public."Users" SET avatar_url = $1 WHERE user_id = $2 RETURNING user_id
+''')
+
+COACH_EXISTS = register("coaches.exists", '''
+    SELECT coach_id FROM public."Coaches" WHERE coach_id = $1 LIMIT 1
+''')
+
+COACH_DELETE = register("coaches.delete", '''
+    DELETE FROM public."Coaches" WHERE coach_id = $1
+''')
+
+COACH_VERIFICATION_REQUEST_INSERT = register("coaches.verification_request_insert", '''
+    INSERT INTO public."Coach_verification_requests" (coach_id, message, document_url, status)
+    VALUES ($1, $2, NULL, 'pending')
+''')
+
+COACH_VERIFICATION_DOCUMENTS = register("coaches.verification_documents", '''
+    SELECT document_id, coach_id, sha256, original_filename, content_type, size_bytes, uploaded_at
+    FROM public."Coach_verification_documents"
+    WHERE coach_id = $1
+    ORDER BY uploaded_at DESC
+''')
+
+COACH_VERIFICATION_DOCUMENT = register("coaches.verification_document", '''
+    SELECT storage_key, original_filename, content_type, size_bytes
+    FROM public."Coach_verification_documents"
+    WHERE coach_id = $1 AND document_id = $2
+''')
+
+GAME_EXISTS = register("games.exists", '''
+    SELECT game_id FROM public."Game_instance" WHERE game_id = $1 LIMIT 1
+''')
+
+WAITLIST_JOIN = register("waitlist.join", '''
+    INSERT INTO public."Waitlist" (game_id, user_id, joined_at, admitted)
+    VALUES ($1, $2, NOW(), FALSE)
+    ON CONFLICT (game_id, user_id) DO UPDATE
+        SET admitted = FALSE, joined_at = NOW()
+        WHERE "Waitlist".admitted
+''')
+
+WAITLIST_LEAVE = register("waitlist.leave", '''
+    DELETE FROM public."Waitlist" WHERE game_id = $1 AND user_id = $2
+''')
+
+SPORTS_ALL = register("sports.all", '''
+    SELECT * FROM public."Sports" ORDER BY name
+''')
+
+WAITLIST_REMOVE_USER = register("waitlist.remove_user", '''
+    DELETE FROM public."Waitlist" WHERE user_id = $1 RETURNING game_id
+''')
+
+WAITLIST_REMOVE_USER_GAME = register("waitlist.remove_user_game", '''
+    DELETE FROM public."Waitlist" WHERE user_id = $1 AND game_id = $2 RETURNING game_id
+''')
+
+GAME_HOST_SPORT = register("games.host_sport", '''
+    SELECT game_id, host_id, sport_id FROM public."Game_instance" WHERE game_id = $1
+''')
+
+GAME_DELETE = register("games.delete", '''
+    DELETE FROM public."Game_instance" WHERE game_id = $1
+''')
+
+USER_EMAIL_NAME = register("users.email_name", '''
+    SELECT email, first_name FROM public."Users" WHERE user_id = $1 LIMIT 1
+''')
+
+USER_FIRST_NAME = register("users.first_name", '''
+    SELECT first_name FROM public."Users" WHERE user_id = $1 LIMIT 1
+''')
+
+HEAD_TO_HEAD = register("match_stats.head_to_head", '''
+    SELECT games, low_wins, high_wins, draws, minutes_played, spend, last_played_at
+    FROM public."Head_to_head"
+    WHERE user_low = $1 AND user_high = $2
+''')
+
+USER_MATCH_STATS = register("match_stats.by_user", '''
+    SELECT NULLIF(sport_id, 0) AS sport_id, games, wins, draws, losses,
+           minutes_played, spend, last_played_at
+    FROM public."User_match_stats"
+    WHERE user_id = $1 AND games > 0
+    ORDER BY sport_id
+''')
+
+MATCH_GAME_LOCK = register("match_games.lock", '''
+    SELECT match_game_id FROM public."Match_games" WHERE match_game_id = $1 FOR UPDATE
+''')
+
+MATCH_STATS_RETRACT = register("match_stats.retract", '''
+    SELECT public.match_stats_apply($1, -1)
+''')
+
+MATCH_RESULTS_UPDATE = register("match_games.update_results", '''
+    UPDATE public."Match_participants" mp
+    SET score = COALESCE(r.score, mp.score),
+        result = COALESCE(r.result, mp.result)
+    FROM unnest($2::int[], $3::int[], $4::text[]) AS r(user_id, score, result)
+    WHERE mp.match_game_id = $1 AND mp.user_id = r.user_id
+    RETURNING mp.match_game_id, mp.user_id, mp.score, mp.result
+''')
+
+MATCH_STATS_APPLY = register("match_stats.apply", '''
+    SELECT public.match_stats_apply($1, 1)
+''')
+
+ARCHIVE_PAST_GAMES = register("archive.past_games", '''
+    WITH past AS (
+        SELECT game_id, host_id, sport_id, start_time, duration_minutes, location, cost
+        FROM public."Game_instance"
+        WHERE end_time < NOW()
+        FOR UPDATE SKIP LOCKED
+    ),
+    archivable AS (
+        SELECT p.*
+        FROM past p
+        WHERE (SELECT COUNT(*) FROM public."Game_participants" gp WHERE gp.game_id = p.game_id) >= 2
+    ),
+    archived AS (
+        INSERT INTO public."Match_games"
+            (game_id, host_id, sport_id, played_at, duration_minutes, location, cost)
+        SELECT game_id, host_id, sport_id, start_time, duration_minutes, location, cost
+        FROM archivable
+        ON CONFLICT (game_id) DO NOTHING
+        RETURNING match_game_id, game_id, played_at, sport_id
+    ),
+    players AS (
+        INSERT INTO public."Match_participants" (match_game_id, user_id, played_at, sport_id)
+        SELECT a.match_game_id, gp.user_id, a.played_at, a.sport_id
+        FROM archived a
+        JOIN public."Game_participants" gp ON gp.game_id = a.game_id
+        RETURNING user_id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM past) AS past_games_found,
+        (SELECT COUNT(*) FROM archived) AS games_archived,
+        (SELECT COUNT(*) FROM players) AS participants_archived,
+        ARRAY(SELECT game_id FROM archivable) AS game_ids,
+        ARRAY(SELECT match_game_id FROM archived ORDER BY match_game_id) AS match_game_ids
+''')
+
+ARCHIVE_MATCH_STATS_APPLY = register("archive.match_stats_apply", '''
+    SELECT public.match_stats_apply(id, 1) FROM unnest($1::bigint[]) AS id
+''')
+
+ARCHIVE_USER_STATS = register("archive.user_stats", '''
+    INSERT INTO public."User_stats" AS s
+        (user_id, sport_id, games_played, games_hosted, xp, level,
+         joins_total, games_attended, attendance_rate)
+    SELECT user_id, COALESCE(sport_id, 0), 0, 0, 0, 0, COUNT(*), COUNT(*), 1
+    FROM public."Match_participants"
+    WHERE match_game_id = ANY($1::bigint[])
+    GROUP BY user_id, COALESCE(sport_id, 0)
+    ON CONFLICT (user_id, sport_id) DO UPDATE
+    SET games_attended = s.games_attended + EXCLUDED.games_attended,
+        joins_total = GREATEST(s.joins_total, s.games_attended + EXCLUDED.games_attended + s.games_left),
+        attendance_rate = public.attendance_rate(s.games_attended + EXCLUDED.games_attended, s.games_left)
+''')
+
+ARCHIVE_DELETE_REPORTS = register("archive.delete_reports", '''
+    DELETE FROM public."Reports" WHERE report_game_id = ANY($1::bigint[])
+''')
+
+ARCHIVE_DELETE_PARTICIPANTS = register("archive.delete_participants", '''
+    DELETE FROM public."Game_participants" WHERE game_id = ANY($1::bigint[])
+''')
+
+ARCHIVE_DELETE_GAMES = register("archive.delete_games", '''
+    DELETE FROM public."Game_instance" WHERE game_id = ANY($1::bigint[])
+''')
+
+FRIENDSHIP_EXISTS = register("friends.exists", '''
+    SELECT 1
+    FROM public."Friends"
+    WHERE (user_id = $1 AND friend_id = $2)
+       OR (user_id = $2 AND friend_id = $1)
+    LIMIT 1
+''')
+
+FRIEND_REQUEST_INSERT = register("friends.request_insert", '''
+    INSERT INTO public."Friends" (user_id, friend_id, status, created_at)
+    VALUES ($1, $2, 'pending', NOW())
+    RETURNING user_id, friend_id, status, created_at
+''')
+
+FRIEND_REQUEST_FOR_UPDATE = register("friends.request_for_update", '''
+    SELECT user_id, friend_id, status, created_at
+    FROM public."Friends"
+    WHERE user_id = $1 AND friend_id = $2
+    LIMIT 1
+    FOR UPDATE
+''')
+
+FRIEND_REQUEST_DELETE = register("friends.request_delete", '''
+    DELETE FROM public."Friends"
+    WHERE user_id = $1 AND friend_id = $2
+''')
+
+FRIEND_REQUEST_ACCEPT = register("friends.request_accept", '''
+    UPDATE public."Friends"
+    SET status = 'accepted'
+    WHERE user_id = $1 AND friend_id = $2
+    RETURNING user_id, friend_id, status, created_at
+''')
+
+FRIEND_PROFILE = register("friends.profile", '''
+    SELECT u.user_id, u.email, u.first_name, u.last_name, u.avatar_url, u.favorite_sport
+    FROM public."Users" AS u
+    WHERE u.user_id = $1
+''')
+
+FRIENDSHIP_DELETE = register("friends.delete", '''
+    DELETE FROM public."Friends"
+    WHERE (user_id = $1 AND friend_id = $2)
+       OR (user_id = $2 AND friend_id = $1)
+''')
+
+USER_BADGE_BY_ID = register("user_badges.by_id", '''
+    SELECT id, user_id, badge_name, earned_on, seen
+    FROM public."user_badges"
+    WHERE id = $1
+''')
+
+USER_BADGE_INSERT = register("user_badges.insert", '''
+    INSERT INTO public."user_badges" (user_id, badge_name, earned_on, seen)
+    VALUES ($1, $2, $3, $4)
+    RETURNING id, user_id, badge_name, earned_on, seen
+''')
+
+USER_BADGE_DELETE = register("user_badges.delete", '''
+    DELETE FROM public."user_badges" WHERE id = $1
+''')
+
+ACTIVITY_LOG_BY_ID = register("activity_logs.by_id", '''
+    SELECT id, user_id, action, created_at
+    FROM public."activity_logs"
+    WHERE id = $1
+''')
+
+ACTIVITY_LOG_INSERT = register("activity_logs.insert", '''
+    INSERT INTO public."activity_logs" (user_id, action, created_at)
+    VALUES ($1, $2, $3)
+    RETURNING id, user_id, action, created_at
+''')
+
+ACTIVITY_LOG_DELETE = register("activity_logs.delete", '''
+    DELETE FROM public."activity_logs" WHERE id = $1
+''')
@@ -20,6 +20,7 @@ class GameInstanceResponse(BaseModel):
     sport_id: int
     start_time: datetime
     duration_minutes: int
+    end_time: Optional[datetime] = None
     location: str
     skill_level: str
     max_players: int
@@ -28,6 +28,7 @@ class MatchHistoryRead(BaseModel):
     location: Optional[str] = None
     cost: Optional[float] = None  # Use float for JSON serialization
     played_at: datetime
+    sport_id: Optional[int] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
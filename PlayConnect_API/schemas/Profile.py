@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import date
 
 class ProfileCreate(BaseModel):
     first_name: str
@@ -9,6 +10,7 @@ class ProfileCreate(BaseModel):
     bio: Optional[str] = None
     avatar_url: Optional[str] = None
     role: str   
+    timezone: Optional[str] = None  # IANA name, e.g. "Asia/Beirut"; unchanged when omitted
 
 class ProfileRead(BaseModel):
     user_id: int
@@ -19,6 +21,10 @@ class ProfileRead(BaseModel):
     bio: Optional[str] = None
     avatar_url: Optional[str] = None
     role: str
+    timezone: str = "UTC"
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_login_date: Optional[date] = None
 
     class Config:
         from_attributes = True
@@ -22,3 +22,6 @@ class UserStatRead(BaseModel):
     attendance_rate: Optional[Decimal] = None
     xp: Optional[int] = 0
     level: Optional[int] = 0
+    joins_total: int = 0
+    games_attended: int = 0
+    games_left: int = 0
@@ -15,3 +15,11 @@ class WaitlistCreate(BaseModel):
     game_id: int
     user_id: int
     admitted: Optional[bool] = False
+
+
+class WaitlistPosition(BaseModel):
+    game_id: int
+    user_id: int
+    joined_at: datetime
+    admitted: bool
+    position: Optional[int] = None  # 1-based place among waiting users; None once admitted
@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+__all__ = ["MatchStatTotals", "UserMatchStatsRead", "HeadToHeadRead", "MatchResultUpdate", "MatchResultsUpdate"]
+
+
+class MatchStatTotals(BaseModel):
+    sport_id: Optional[int] = None  # None for the all-sports total
+    games: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    minutes_played: int = 0
+    spend: float = 0
+    last_played_at: Optional[datetime] = None
+
+
+class UserMatchStatsRead(BaseModel):
+    user_id: int
+    totals: MatchStatTotals
+    by_sport: List[MatchStatTotals]
+
+
+class HeadToHeadRead(BaseModel):
+    user_id: int
+    opponent_id: int
+    games: int = 0
+    wins: int = 0       # games user_id won against opponent_id
+    losses: int = 0     # games opponent_id won against user_id
+    draws: int = 0
+    minutes_played: int = 0
+    spend: float = 0
+    last_played_at: Optional[datetime] = None
+
+
+class MatchResultUpdate(BaseModel):
+    user_id: int
+    score: Optional[int] = None
+    result: Optional[Literal["win", "loss", "draw"]] = None
+
+
+class MatchResultsUpdate(BaseModel):
+    results: List[MatchResultUpdate]
@@ -0,0 +1,169 @@
+"""activity_logs writing and partition maintenance.
+
+Writes go through ActivityLogWriter: events are queued in memory and a
+background task COPYs them into activity_logs in batches, every
+ACTIVITY_LOG_FLUSH_MS or as soon as ACTIVITY_LOG_BATCH_SIZE events are
+waiting. A request that logs something no longer pays an INSERT round trip,
+and under load one COPY replaces hundreds of single-row INSERTs.
+
+    await writer.log(user_id, "login")      # returns once queued
+
+The queue is bounded (ACTIVITY_LOG_QUEUE_SIZE): when the database falls
+behind, log() waits for room instead of growing memory without limit.
+Queued events are flushed on shutdown; events still queued if the process
+dies are lost, so anything that must be durable (or must commit/roll back
+with the request's transaction) is INSERTed directly, see
+main.log_activity(durable=True).
+
+activity_logs is partitioned by month (see migrations/0010_partition_activity_logs.sql).
+maintain_partitions() runs daily on the app scheduler: it makes sure the
+partitions for the current and the next ACTIVITY_LOG_PARTITIONS_AHEAD months
+exist, and drops every partition older than ACTIVITY_LOG_RETENTION_MONTHS.
+Dropping a partition is a catalog operation, so retention never deletes rows
+one by one. Login days survive in User_login_days.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from PlayConnect_API import Database
+
+ACTIVITY_LOG_RETENTION_MONTHS = int(os.getenv("ACTIVITY_LOG_RETENTION_MONTHS", "12"))
+ACTIVITY_LOG_PARTITIONS_AHEAD = int(os.getenv("ACTIVITY_LOG_PARTITIONS_AHEAD", "3"))
+
+ACTIVITY_LOG_FLUSH_MS = int(os.getenv("ACTIVITY_LOG_FLUSH_MS", "200"))
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "500"))
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+ACTIVITY_LOG_FLUSH_RETRIES = 3
+
+COLUMNS = ("user_id", "action", "created_at")
+
+_STOP = object()
+
+
+class ActivityLogWriter:
+    def __init__(
+        self,
+        flush_ms: int = ACTIVITY_LOG_FLUSH_MS,
+        batch_size: int = ACTIVITY_LOG_BATCH_SIZE,
+        queue_size: int = ACTIVITY_LOG_QUEUE_SIZE,
+    ):
+        self.flush_interval = flush_ms / 1000
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def log(self, user_id: int, action: str, created_at: Optional[datetime] = None) -> None:
+        """Queue one event (waits while the queue is full). The timestamp is taken now, not at flush time."""
+        await self._queue.put((user_id, action, created_at or datetime.now(timezone.utc)))
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the background task."""
+        if not self.running:
+            return
+        self._stopping = True
+        await self._queue.put(_STOP)  # behind every event already queued
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is _STOP:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        for attempt in range(ACTIVITY_LOG_FLUSH_RETRIES):
+            try:
+                async with Database.pool.acquire(primary=True) as connection:
+                    await connection.copy_records_to_table(
+                        "activity_logs", schema_name="public", columns=COLUMNS, records=batch
+                    )
+                self.written += len(batch)
+                self.flushes += 1
+                return
+            except Exception as e:
+                print(f"[activity_logs] flush of {len(batch)} events failed ({attempt + 1}): {e}")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        self.dropped += len(batch)
+        print(f"[activity_logs] dropped {len(batch)} events")
+
+
+writer = ActivityLogWriter()
+
+
+def _months_ahead(count: int) -> List[datetime]:
+    now = datetime.now(timezone.utc)
+    months = []
+    for k in range(count + 1):
+        year, month = divmod(now.month - 1 + k, 12)
+        months.append(datetime(now.year + year, month + 1, 1).date())
+    return months
+
+
+async def maintain_partitions(connection=None) -> dict:
+    """Create upcoming monthly partitions and drop expired ones."""
+    if connection is None:
+        async with Database.pool.acquire(primary=True) as connection:
+            return await maintain_partitions(connection)
+
+    created = []
+    for month in _months_ahead(ACTIVITY_LOG_PARTITIONS_AHEAD):
+        created.append(await connection.fetchval("SELECT public.activity_logs_ensure_partition($1)", month))
+    dropped = [
+        row[0]
+        for row in await connection.fetch(
+            "SELECT public.activity_logs_drop_partitions($1)", ACTIVITY_LOG_RETENTION_MONTHS
+        )
+    ]
+    if dropped:
+        print(f"[activity_logs] dropped partitions: {', '.join(dropped)}")
+    return {"partitions": created, "dropped": dropped}
@@ -0,0 +1,139 @@
+"""Avatar processing.
+
+An uploaded avatar is decoded once, in a worker process (Pillow is CPU-bound
+and would stall the event loop). It is square-cropped and rendered at every
+size in SIZES as WebP and JPEG. The variants are stored under the SHA-256 of
+the original bytes:
+
+    avatars/<sha>/<size>.webp
+    avatars/<sha>/<size>.jpg
+
+Users.avatar_url then points at GET /avatars/<sha>. That endpoint serves the
+smallest variant >= ?size=, picks WebP or JPEG from the Accept header, and
+marks the response immutable: a new picture gets a new hash, so a cached URL
+never changes content.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from PlayConnect_API.services.storage import get_storage
+
+SIZES = (40, 80, 160, 320)
+DEFAULT_SIZE = 160
+FORMATS = {"webp": "image/webp", "jpg": "image/jpeg"}
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", "2"))
+PUBLIC_API_URL = os.getenv("PUBLIC_API_URL", "http://localhost:8000").rstrip("/")
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASH_RE = re.compile(r"[0-9a-f]{64}")
+_DATA_URL_RE = re.compile(r"^data:image/[a-z0-9.+-]+;base64,", re.IGNORECASE)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class AvatarError(Exception):
+    pass
+
+
+def _render_variants(data: bytes) -> Dict[Tuple[int, str], bytes]:
+    """Runs in a worker process: decode, crop to a centred square, encode every size/format."""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = 40_000_000
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGB")
+    except Exception as e:
+        raise AvatarError(f"Unsupported or corrupt image: {e}")
+
+    side = min(img.size)
+    left, top = (img.width - side) // 2, (img.height - side) // 2
+    square = img.crop((left, top, left + side, top + side))
+
+    out = {}
+    for size in SIZES:
+        thumb = square.resize((size, size), Image.LANCZOS) if side > size else square
+        buf = io.BytesIO()
+        thumb.save(buf, "WEBP", quality=80, method=4)
+        out[(size, "webp")] = buf.getvalue()
+        buf = io.BytesIO()
+        thumb.save(buf, "JPEG", quality=85, optimize=True, progressive=True)
+        out[(size, "jpg")] = buf.getvalue()
+    return out
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: forking a process that runs an event loop and a DB pool is unsafe
+        _executor = ProcessPoolExecutor(max_workers=AVATAR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def variant_key(avatar_hash: str, size: int, fmt: str) -> str:
+    return f"avatars/{avatar_hash}/{size}.{fmt}"
+
+
+def avatar_url(avatar_hash: str) -> str:
+    return f"{PUBLIC_API_URL}/avatars/{avatar_hash}"
+
+
+def is_avatar_hash(value: str) -> bool:
+    return bool(_HASH_RE.fullmatch(value or ""))
+
+
+def pick_size(requested: Optional[int]) -> int:
+    """Smallest rendered size that is at least `requested` (largest if none is)."""
+    if not requested:
+        return DEFAULT_SIZE
+    return next((s for s in SIZES if s >= requested), SIZES[-1])
+
+
+async def process_avatar(data: bytes) -> str:
+    """Render and store every variant of `data`; returns its hash. Re-uploads are free."""
+    if len(data) > AVATAR_MAX_BYTES:
+        raise AvatarError(f"Avatar exceeds the {AVATAR_MAX_BYTES // (1024 * 1024)} MB limit")
+    avatar_hash = hashlib.sha256(data).hexdigest()
+    storage = get_storage()
+    if await storage.exists(variant_key(avatar_hash, SIZES[-1], "jpg")):
+        return avatar_hash
+
+    loop = asyncio.get_running_loop()
+    variants = await loop.run_in_executor(_get_executor(), _render_variants, data)
+    # largest JPEG last: its presence marks the set as complete (checked above)
+    for (size, fmt), blob in sorted(variants.items(), key=lambda kv: (kv[0] == (SIZES[-1], "jpg"), kv[0])):
+        await storage.put_bytes(variant_key(avatar_hash, size, fmt), blob, FORMATS[fmt])
+    return avatar_hash
+
+
+async def ingest_avatar_value(value: Optional[str]) -> Optional[str]:
+    """Turn an inline `data:image/...;base64,` avatar into a processed avatar URL.
+
+    Any other value (an existing URL, empty string, None) is returned unchanged,
+    so profile endpoints can pass `avatar_url` through this unconditionally.
+    """
+    if not value or not _DATA_URL_RE.match(value):
+        return value
+    try:
+        data = base64.b64decode(value.split(",", 1)[1], validate=False)
+    except (binascii.Error, ValueError):
+        raise AvatarError("Avatar data URL is not valid base64")
+    return avatar_url(await process_avatar(data))
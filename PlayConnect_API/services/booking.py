@@ -0,0 +1,131 @@
+"""Race-free booking of game spots.
+
+Every path that adds a player to a game under a capacity limit goes through
+book_spot(). It runs two statements in one transaction:
+
+  1. SELECT ... FOR UPDATE on the Game_instance row. Concurrent bookings for
+     the same game queue up here; bookings for other games are unaffected.
+  2. One CTE that counts current participants, inserts the new row only if
+     there is room and the user isn't already in, and returns the booking
+     details (game, host, sport, booker) in the same round trip.
+
+Because (2) starts after the lock is granted, its snapshot already contains
+every participant committed by the booking that held the lock before it, so
+the capacity check can't be raced.
+"""
+
+from typing import NamedTuple, Optional
+
+from PlayConnect_API import queries
+
+# Roles come from GameParticipantJoin's Literal; the literal is inlined (not a
+# bind parameter) so Postgres coerces it to the column's enum type on INSERT.
+_ROLE_SQL = {"PLAYER": "'PLAYER'", "HOST": "'HOST'"}
+
+LOCK_GAME = '''
+    SELECT game_id, status, max_players
+    FROM public."Game_instance"
+    WHERE game_id = $1
+    FOR UPDATE
+'''
+
+_BOOK_TEMPLATE = '''
+    WITH taken AS (
+        SELECT COUNT(*) AS cnt, COALESCE(BOOL_OR(user_id = $2), FALSE) AS already
+        FROM public."Game_participants"
+        WHERE game_id = $1
+    ),
+    booker AS (
+        SELECT user_id, email, first_name
+        FROM public."Users"
+        WHERE user_id = $2
+    ),
+    ins AS (
+        INSERT INTO public."Game_participants" (game_id, user_id, role, joined_at)
+        SELECT $1, b.user_id, {role}, NOW()
+        FROM booker AS b, taken AS t
+        WHERE NOT t.already AND t.cnt < $3
+        RETURNING joined_at
+    )
+    SELECT
+        gi.game_id, gi.location, gi.start_time, gi.duration_minutes,
+        gi.skill_level, gi.max_players, gi.status, gi.sport_id,
+        u.first_name AS coach_first_name, u.last_name AS coach_last_name,
+        s.name AS sport_name,
+        b.user_id IS NOT NULL AS user_exists,
+        b.email AS user_email,
+        b.first_name AS user_first_name,
+        t.already,
+        (SELECT joined_at FROM ins) AS joined_at,
+        t.cnt + (SELECT COUNT(*) FROM ins) AS participants_count
+    FROM public."Game_instance" AS gi
+    JOIN public."Users" AS u ON u.user_id = gi.host_id
+    JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
+    CROSS JOIN taken AS t
+    LEFT JOIN booker AS b ON TRUE
+    WHERE gi.game_id = $1
+'''
+
+BOOK_SPOT = {role: _BOOK_TEMPLATE.format(role=literal) for role, literal in _ROLE_SQL.items()}
+
+LOCK_GAME_STMT = queries.register("booking.lock_game", LOCK_GAME, hot=True)
+BOOK_SPOT_STMT = {
+    role: queries.register(f"booking.book_spot.{role.lower()}", sql, hot=True)
+    for role, sql in BOOK_SPOT.items()
+}
+
+# outcomes
+BOOKED = "booked"
+ALREADY_BOOKED = "already_booked"
+FULL = "full"
+NOT_OPEN = "not_open"
+GAME_NOT_FOUND = "game_not_found"
+USER_NOT_FOUND = "user_not_found"
+
+
+class BookingResult(NamedTuple):
+    outcome: str
+    booking: Optional[dict] = None
+
+    @property
+    def booked(self) -> bool:
+        return self.outcome == BOOKED
+
+
+async def lock_game(conn, game_id: int):
+    """Lock a game row for the rest of the current transaction. Returns None if missing."""
+    return await queries.fetchrow(conn, LOCK_GAME_STMT, game_id)
+
+
+async def book_spot(
+    conn,
+    game_id: int,
+    user_id: int,
+    *,
+    role: str = "PLAYER",
+    require_open: bool = True,
+) -> BookingResult:
+    """Atomically add `user_id` to `game_id` if there is a free spot.
+
+    `booking` holds the joined game/host/sport/booker row whenever the game
+    and user exist, whatever the outcome.
+    """
+    async with conn.transaction():
+        game = await lock_game(conn, game_id)
+        if not game:
+            return BookingResult(GAME_NOT_FOUND)
+        if require_open and (game["status"] or "").lower() != "open":
+            return BookingResult(NOT_OPEN)
+
+        row = await queries.fetchrow(conn, BOOK_SPOT_STMT[role], game_id, user_id, game["max_players"])
+        if row is None:
+            # game row exists but host/sport join failed; treat like a missing game
+            return BookingResult(GAME_NOT_FOUND)
+        booking = dict(row)
+        if not booking["user_exists"]:
+            return BookingResult(USER_NOT_FOUND, booking)
+        if booking["already"]:
+            return BookingResult(ALREADY_BOOKED, booking)
+        if booking["joined_at"] is None:
+            return BookingResult(FULL, booking)
+        return BookingResult(BOOKED, booking)
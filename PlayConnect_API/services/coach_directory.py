@@ -0,0 +1,101 @@
+"""Coach directory search.
+
+build_coach_search() turns the /coaches/search filters into one keyset-paginated
+query over Coaches + Users + Coach_summary. Coach_summary is kept current by
+triggers (migrations/0005_add_coach_summary.sql), so no aggregation happens here.
+
+Each sort order is (expression, direction, cursor type); the expressions match
+the indexes created by that migration (0014 for the nullable created_at), so
+keep the two in sync. A sort over a nullable column can also give the column
+to put in the cursor (`key`) and how to map that value back onto the
+expression (`param`), so a NULL travels as null rather than as a sentinel.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+class Sort(NamedTuple):
+    expr: str
+    direction: str  # "ASC" | "DESC"
+    kind: Callable
+    key: Optional[str] = None  # selected as sort_key; defaults to expr
+    param: str = "{}"          # cursor placeholder -> value comparable to expr
+
+
+SORTS = {
+    "newest": Sort(
+        "COALESCE(c.created_at, '-infinity')", "DESC", datetime.fromisoformat,
+        key="c.created_at", param="COALESCE({}::timestamptz, '-infinity')",
+    ),
+    "rate_asc": Sort("COALESCE(c.hourly_rate, 1000000)", "ASC", Decimal),
+    "rate_desc": Sort("COALESCE(c.hourly_rate, 0)", "DESC", Decimal),
+    "experience": Sort("COALESCE(c.experience_yrs, 0)", "DESC", int),
+    "sessions": Sort("s.sessions_hosted", "DESC", int),
+}
+
+
+def build_coach_search(
+    *,
+    sort: str = "newest",
+    verified: Optional[bool] = None,
+    sport: Optional[str] = None,
+    min_rate: Optional[Decimal] = None,
+    max_rate: Optional[Decimal] = None,
+    min_experience: Optional[int] = None,
+    after: Optional[tuple] = None,
+    limit: int = 20,
+) -> Tuple[str, List]:
+    """Return (sql, params). Rows carry a `sort_key` column for the next cursor."""
+    spec = SORTS[sort]
+    conditions, params = [], []
+
+    if verified is not None:
+        params.append(verified)
+        conditions.append(f"c.isverified = ${len(params)}")
+    if sport:
+        params.append(sport.strip().lower())
+        conditions.append(f"LOWER(u.favorite_sport) = ${len(params)}")
+    if min_rate is not None:
+        params.append(min_rate)
+        conditions.append(f"c.hourly_rate >= ${len(params)}")
+    if max_rate is not None:
+        params.append(max_rate)
+        conditions.append(f"c.hourly_rate <= ${len(params)}")
+    if min_experience is not None:
+        params.append(min_experience)
+        conditions.append(f"c.experience_yrs >= ${len(params)}")
+    if after:
+        op = "<" if spec.direction == "DESC" else ">"
+        params += [after[0], after[1]]
+        cursor_value = spec.param.format(f"${len(params) - 1}")
+        conditions.append(f"({spec.expr}, c.coach_id) {op} ({cursor_value}, ${len(params)})")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit + 1)
+    sql = f'''
+        SELECT
+            c.coach_id,
+            c.experience_yrs,
+            c.certifications,
+            c.isverified,
+            c.hourly_rate,
+            c.created_at,
+            u.first_name,
+            u.last_name,
+            u.avatar_url,
+            u.bio,
+            u.favorite_sport,
+            u.email,
+            s.sessions_hosted,
+            s.participants_coached,
+            {spec.key or spec.expr} AS sort_key
+        FROM public."Coaches" c
+        JOIN public."Coach_summary" s ON s.coach_id = c.coach_id
+        LEFT JOIN public."Users" u ON u.user_id = c.coach_id
+        {where}
+        ORDER BY {spec.expr} {spec.direction}, c.coach_id {spec.direction}
+        LIMIT ${len(params)}
+    '''
+    return sql, params
@@ -0,0 +1,94 @@
+"""Cursor pagination helpers.
+
+List endpoints keep returning plain JSON arrays (so existing clients keep
+working) and advertise the next page in the `X-Next-Cursor` response header.
+A cursor is the keyset of the last row on the page, base64url-encoded JSON;
+clients treat it as opaque and send it back as `?cursor=`.
+
+    after = decode_cursor(cursor, datetime.fromisoformat, int)   # or None
+    ...fetch limit + 1 rows WHERE (created_at, id) < ($1, $2)...
+    rows = page_rows(rows, limit, response, lambda r: (r["created_at"], r["id"]))
+
+Exports that need every row use stream_ndjson(), which walks a server-side
+cursor and yields one JSON line per row, so neither the API process nor the
+client ever holds the full result set.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+from PlayConnect_API.services.serialization import dumps
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_PREFETCH = 500
+
+
+# Cursor values only: Decimals stay strings so a keyset round-trips exactly.
+# Response bodies (stream_ndjson) go through serialization.dumps instead.
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([_plain(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *kinds: Callable) -> Optional[tuple]:
+    """Decode a cursor into a tuple, converting each value with the matching callable.
+
+    Returns None for a missing cursor; raises a 400 for one that doesn't decode.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(kinds):
+            raise ValueError("cursor arity mismatch")
+        return tuple(None if v is None else kind(v) for kind, v in zip(kinds, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def clamp_limit(limit: Optional[int], default: int = DEFAULT_LIMIT, maximum: int = MAX_LIMIT) -> int:
+    if limit is None:
+        return default
+    return max(1, min(int(limit), maximum))
+
+
+def page_rows(rows: Sequence, limit: int, response: Optional[Response], key: Callable) -> list:
+    """Trim a `limit + 1` fetch to `limit` rows and set the next-cursor header.
+
+    `key(row)` returns the keyset tuple of a row.
+    """
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if response is not None and has_more and rows:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
+
+
+async def stream_ndjson(pool, query: str, *args, prefetch: int = STREAM_PREFETCH) -> AsyncIterator[bytes]:
+    """Yield `query`'s rows as newline-delimited JSON, `prefetch` rows per round trip.
+
+    asyncpg cursors only exist inside a transaction; the connection is held
+    for the life of the stream and released when the client finishes or
+    disconnects.
+    """
+    async with pool.acquire() as connection:
+        async with connection.transaction(readonly=True):
+            async for row in connection.cursor(query, *args, prefetch=prefetch):
+                yield dumps(dict(row)) + b"\n"
@@ -0,0 +1,73 @@
+"""Search helpers for user and game lookups.
+
+Users and Game_instance carry two generated columns (see
+migrations/0002_add_search_indexes.sql):
+
+  - search_text:   lower-cased haystack, GIN-indexed with pg_trgm so that
+                   substring matches (LIKE '%q%') use the index
+  - search_vector: 'simple' tsvector, GIN-indexed, used for prefix matching
+                   ("ali" -> "alice") and relevance ranking
+
+Callers build their WHERE clause the same way the handlers already do, by
+appending to a `conditions` / `params` pair:
+
+    terms = parse_search(query)
+    if terms:
+        conditions.append(search_predicate("u", terms, params))
+"""
+
+import re
+from typing import List, NamedTuple, Optional
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TOKENS = 8
+
+
+class SearchTerms(NamedTuple):
+    text: str               # normalized query, used for similarity()
+    like: str               # escaped '%text%' pattern for the trigram index
+    tsquery: Optional[str]  # prefix tsquery ("ali:* & smi:*"), None if no word tokens
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_search(raw: Optional[str]) -> Optional[SearchTerms]:
+    """Normalize a free-text query. Returns None when there is nothing to search for."""
+    if raw is None:
+        return None
+    text = " ".join(raw.lower().split())
+    if not text:
+        return None
+    tokens = _TOKEN_RE.findall(text)[:MAX_TOKENS]
+    tsquery = " & ".join(f"'{tok}':*" for tok in tokens) if tokens else None
+    return SearchTerms(text=text, like=f"%{_escape_like(text)}%", tsquery=tsquery)
+
+
+def search_predicate(alias: str, terms: SearchTerms, params: List) -> str:
+    """Return the WHERE predicate for `alias` and append its params.
+
+    The tsvector match and the trigram LIKE are OR-ed so the planner can
+    combine both GIN indexes with a BitmapOr.
+    """
+    params.append(terms.like)
+    like = f"{alias}.search_text LIKE ${len(params)}"
+    if terms.tsquery is None:
+        return like
+    params.append(terms.tsquery)
+    return f"({alias}.search_vector @@ to_tsquery('simple', ${len(params)}) OR {like})"
+
+
+def search_rank(alias: str, terms: SearchTerms, params: List) -> str:
+    """Return a relevance expression for `alias` (higher is better) and append its params.
+
+    Kept separate from the predicate so callers that don't order by relevance
+    (e.g. COUNT queries) never carry unused, untyped parameters.
+    """
+    params.append(terms.text)
+    rank = f"similarity({alias}.search_text, ${len(params)})"
+    if terms.tsquery is None:
+        return rank
+    params.append(terms.tsquery)
+    return f"(ts_rank({alias}.search_vector, to_tsquery('simple', ${len(params)})) + {rank})"
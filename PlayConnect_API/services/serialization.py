@@ -0,0 +1,112 @@
+"""JSON responses built straight from asyncpg records.
+
+Returning a list of Pydantic models (or dicts) from a handler with a
+`response_model` makes FastAPI validate every row again and push it through
+jsonable_encoder. For large lists that costs more than the query. The helpers
+here write the response bytes directly:
+
+    rows = page_rows(rows, limit, response, key)
+    return rows_response(rows, GameInstanceResponse, response=response)
+
+Rows are projected onto the model's fields: extra columns are dropped and
+missing ones get the field default, the same shape response_model produces.
+Keep `response_model=` on the route so the OpenAPI schema doesn't change.
+
+Decimal is written as a JSON number, and datetime/date/UUID as ISO
+strings/text. orjson is used when installed; otherwise the stdlib json
+module is used with the same conversions.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+_MISSING = object()
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _fields(model) -> Tuple[Tuple[str, Any], ...]:
+    """(name, default) per field of a Pydantic model; default is _MISSING for required fields."""
+    out = []
+    for name, field in model.model_fields.items():
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        out.append((name, default))
+    return tuple(out)
+
+
+def project(row, model) -> dict:
+    """Pick `model`'s fields out of a record/dict (missing optional fields get their default)."""
+    data = {}
+    for name, default in _fields(model):
+        value = row.get(name, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(f"{model.__name__}.{name} missing from row")
+            value = default
+        data[name] = value
+    return data
+
+
+def json_response(content: Any, *, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """Serialize `content` directly. Headers already set on the injected
+    `response` (e.g. X-Next-Cursor) are carried over, since FastAPI ignores
+    them once a handler returns its own Response."""
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def rows_response(
+    rows: Iterable,
+    model=None,
+    *,
+    response: Optional[Response] = None,
+    transform: Optional[Callable[[dict], dict]] = None,
+) -> FastJSONResponse:
+    """A JSON array response from records, shaped like List[model] without validating rows.
+
+    `transform` post-processes each projected dict (e.g. decoding a JSON column).
+    """
+    items = []
+    for row in rows:
+        item = project(row, model) if model is not None else dict(row)
+        if transform is not None:
+            item = transform(item)
+        items.append(item)
+    return json_response(items, response=response)
@@ -0,0 +1,264 @@
+"""Content-addressed file storage.
+
+Uploads are streamed in fixed-size chunks into a temporary file. The file is
+hashed while it is written and the size limit is checked as it goes, so an
+oversized upload is rejected before it is fully written. The finished file is
+then stored under its SHA-256:
+
+    <prefix>/<sha[:2]>/<sha><ext>
+
+Uploading the same bytes twice therefore yields the same key, and the second
+copy is discarded instead of stored again. Disk and network I/O runs in
+worker threads (asyncio.to_thread) so large files never block the event loop.
+
+Backends are chosen with STORAGE_BACKEND:
+  - "local" (default): files under STORAGE_ROOT (default "uploads")
+  - "s3": S3_BUCKET on any S3-compatible service; set S3_ENDPOINT_URL to
+    point it at MinIO or another local stand-in. Needs boto3.
+"""
+
+import abc
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from typing import AsyncIterator, NamedTuple, Optional
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 1024 * 1024
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+
+
+class StorageError(Exception):
+    pass
+
+
+class FileTooLarge(StorageError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        self.max_bytes = max_bytes
+
+
+class StoredObject(NamedTuple):
+    key: str
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    created: bool  # False when identical bytes were already stored
+
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+async def iter_upload(upload: UploadFile, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class _Storage(abc.ABC):
+    """Shared streaming/hashing logic; backends implement _commit, exists, read_chunks, delete."""
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        *,
+        prefix: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        max_bytes: int = UPLOAD_MAX_BYTES,
+    ) -> StoredObject:
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = await asyncio.to_thread(self._mkstemp)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FileTooLarge(max_bytes)
+                    digest.update(chunk)
+                    await asyncio.to_thread(tmp.write, chunk)
+            sha = digest.hexdigest()
+            key = f"{prefix.strip('/')}/{sha[:2]}/{sha}{_extension(filename)}"
+            created = await self._commit(tmp_path, key, content_type)
+            return StoredObject(key, sha, size, content_type, created)
+        finally:
+            if os.path.exists(tmp_path):
+                await asyncio.to_thread(os.remove, tmp_path)
+
+    async def save_upload(self, upload: UploadFile, *, prefix: str, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredObject:
+        return await self.save_stream(
+            iter_upload(upload),
+            prefix=prefix,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            max_bytes=max_bytes,
+        )
+
+    async def save_bytes(self, data: bytes, *, prefix: str, filename: Optional[str] = None,
+                         content_type: Optional[str] = None) -> StoredObject:
+        async def one():
+            yield data
+        return await self.save_stream(one(), prefix=prefix, filename=filename,
+                                      content_type=content_type, max_bytes=len(data))
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> bool:
+        """Store `data` under a caller-chosen key (e.g. one derived from a content hash).
+
+        Returns False if the key already existed, in which case nothing is written.
+        """
+        fd, tmp_path = await asyncio.to_thread(self._mkstemp)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                await asyncio.to_thread(tmp.write, data)
+            return await self._commit(tmp_path, key, content_type)
+        finally:
+            if os.path.exists(tmp_path):
+                await asyncio.to_thread(os.remove, tmp_path)
+
+    def _temp_dir(self) -> Optional[str]:
+        """Where upload temp files are written; None for the system temp dir."""
+        return None
+
+    def _mkstemp(self):
+        tmp_dir = self._temp_dir()
+        if tmp_dir is not None:
+            os.makedirs(tmp_dir, exist_ok=True)
+        return tempfile.mkstemp(prefix="upload-", dir=tmp_dir)
+
+    @abc.abstractmethod
+    async def _commit(self, tmp_path: str, key: str, content_type: Optional[str]) -> bool:
+        """Move the finished temp file to `key`; False if the key already existed."""
+
+    @abc.abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def read_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class LocalStorage(_Storage):
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError("Invalid storage key")
+        return path
+
+    def _temp_dir(self) -> str:
+        # same filesystem as the final path, so os.replace never crosses
+        # devices (EXDEV) when STORAGE_ROOT is a separate mount
+        return os.path.join(self.root, ".tmp")
+
+    def _move_into_place(self, tmp_path: str, key: str) -> bool:
+        path = self._path(key)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return True
+
+    async def _commit(self, tmp_path: str, key: str, content_type: Optional[str]) -> bool:
+        return await asyncio.to_thread(self._move_into_place, tmp_path, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self._path(key))
+
+    async def read_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            await asyncio.to_thread(os.remove, path)
+
+
+class S3Storage(_Storage):
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        try:
+            import boto3
+        except ImportError as e:
+            raise StorageError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)") from e
+        self.bucket = bucket
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def _exists_sync(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _upload_sync(self, tmp_path: str, key: str, content_type: Optional[str]) -> bool:
+        if self._exists_sync(key):
+            return False
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_file(tmp_path, self.bucket, key, ExtraArgs=extra)
+        return True
+
+    async def _commit(self, tmp_path: str, key: str, content_type: Optional[str]) -> bool:
+        return await asyncio.to_thread(self._upload_sync, tmp_path, key, content_type)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists_sync, key)
+
+    async def read_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        obj = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = obj["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+
+_storage: Optional[_Storage] = None
+
+
+def get_storage() -> _Storage:
+    """The process-wide backend, built from the environment on first use."""
+    global _storage
+    if _storage is None:
+        backend = (os.getenv("STORAGE_BACKEND", "local") or "local").lower()
+        if backend == "s3":
+            bucket = os.getenv("S3_BUCKET")
+            if not bucket:
+                raise StorageError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+            _storage = S3Storage(bucket, os.getenv("S3_ENDPOINT_URL"), os.getenv("S3_REGION"))
+        elif backend == "local":
+            _storage = LocalStorage(os.getenv("STORAGE_ROOT", "uploads"))
+        else:
+            raise StorageError(f"Unknown STORAGE_BACKEND: {backend}")
+    return _storage
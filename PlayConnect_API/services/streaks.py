@@ -0,0 +1,81 @@
+"""Login streaks.
+
+User_login_streaks keeps one row per user (current_streak, longest_streak,
+last_login_date), updated by a single upsert on every login, so neither the
+Weekly Streak badge nor the profile ever reads the activity log.
+
+Days are calendar days in the user's own timezone (Users.timezone, an IANA
+name such as "Asia/Beirut"; UTC when unset or unknown). A stored
+current_streak is only still running if the last login was today or
+yesterday in that timezone; current() applies that when reading.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from dateutil.tz import UTC, gettz
+
+RECORD_LOGIN_SQL = '''
+    INSERT INTO public."User_login_streaks" AS s (user_id, current_streak, longest_streak, last_login_date)
+    VALUES ($1, 1, 1, $2)
+    ON CONFLICT (user_id) DO UPDATE
+    SET current_streak = CASE
+            WHEN s.last_login_date >= EXCLUDED.last_login_date THEN s.current_streak
+            WHEN s.last_login_date = EXCLUDED.last_login_date - 1 THEN s.current_streak + 1
+            ELSE 1
+        END,
+        longest_streak = GREATEST(s.longest_streak, CASE
+            WHEN s.last_login_date >= EXCLUDED.last_login_date THEN s.current_streak
+            WHEN s.last_login_date = EXCLUDED.last_login_date - 1 THEN s.current_streak + 1
+            ELSE 1
+        END),
+        last_login_date = GREATEST(s.last_login_date, EXCLUDED.last_login_date),
+        updated_at = NOW()
+    RETURNING user_id, current_streak, longest_streak, last_login_date
+'''
+
+STREAK_SQL = '''
+    SELECT u.user_id, u.timezone,
+           COALESCE(s.current_streak, 0) AS current_streak,
+           COALESCE(s.longest_streak, 0) AS longest_streak,
+           s.last_login_date
+    FROM public."Users" AS u
+    LEFT JOIN public."User_login_streaks" AS s ON s.user_id = u.user_id
+    WHERE u.user_id = $1
+'''
+
+
+def is_valid_timezone(name: Optional[str]) -> bool:
+    return bool(name) and gettz(name) is not None
+
+
+def local_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    """Today's date in the user's timezone."""
+    tz = gettz(tz_name) if tz_name else None
+    return (now or datetime.now(UTC)).astimezone(tz or UTC).date()
+
+
+def current(current_streak: int, last_login_date: Optional[date], tz_name: Optional[str]) -> int:
+    """The stored streak if it is still running, else 0."""
+    if last_login_date is None:
+        return 0
+    if last_login_date >= local_today(tz_name) - timedelta(days=1):
+        return current_streak
+    return 0
+
+
+async def record_login(connection, user_id: int, tz_name: Optional[str]):
+    return await connection.fetchrow(RECORD_LOGIN_SQL, user_id, local_today(tz_name))
+
+
+async def fetch_streak(connection, user_id: int) -> Optional[dict]:
+    row = await connection.fetchrow(STREAK_SQL, user_id)
+    if row is None:
+        return None
+    return {
+        "user_id": row["user_id"],
+        "timezone": row["timezone"],
+        "current_streak": current(row["current_streak"], row["last_login_date"], row["timezone"]),
+        "longest_streak": row["longest_streak"],
+        "last_login_date": row["last_login_date"],
+    }
@@ -0,0 +1,165 @@
+"""Waitlist promotion.
+
+When a spot frees up (a participant leaves, a waitlist entry is removed),
+promote_waitlist() admits the oldest waiting users into the game in one
+server-side step instead of clients polling the waitlist and retrying joins.
+
+The game row is locked with the same FOR UPDATE used by the booking engine
+(services/booking.py), so promotions and bookings for a game are serialized
+and can never overfill it. Waitlist rows are claimed with FOR UPDATE SKIP
+LOCKED so a concurrent removal of a waitlist entry never blocks promotion.
+"""
+
+from typing import List
+
+from PlayConnect_API import queries
+from PlayConnect_API.services.booking import lock_game
+
+PROMOTE_SQL = '''
+    WITH free AS (
+        SELECT GREATEST($2::int - COUNT(*), 0) AS spots
+        FROM public."Game_participants"
+        WHERE game_id = $1
+    ),
+    next_up AS (
+        SELECT w.game_id, w.user_id
+        FROM public."Waitlist" AS w
+        WHERE w.game_id = $1
+          AND w.admitted = FALSE
+          AND NOT EXISTS (
+              SELECT 1 FROM public."Game_participants" AS gp
+              WHERE gp.game_id = w.game_id AND gp.user_id = w.user_id
+          )
+        ORDER BY w.joined_at ASC, w.user_id ASC
+        LIMIT (SELECT spots FROM free)
+        FOR UPDATE OF w SKIP LOCKED
+    ),
+    admitted AS (
+        UPDATE public."Waitlist" AS w
+        SET admitted = TRUE
+        FROM next_up AS n
+        WHERE w.game_id = n.game_id AND w.user_id = n.user_id
+        RETURNING w.user_id
+    ),
+    joined AS (
+        INSERT INTO public."Game_participants" (game_id, user_id, role, joined_at)
+        SELECT $1, a.user_id, 'PLAYER', NOW()
+        FROM admitted AS a
+        ON CONFLICT (game_id, user_id) DO NOTHING
+        RETURNING user_id, joined_at
+    ),
+    game AS (
+        SELECT gi.game_id, gi.sport_id, gi.location, s.name AS sport_name
+        FROM public."Game_instance" AS gi
+        LEFT JOIN public."Sports" AS s ON s.sport_id = gi.sport_id
+        WHERE gi.game_id = $1
+    ),
+    notified AS (
+        INSERT INTO public."Notifications" (user_id, message, type, metadata, is_read, created_at)
+        SELECT
+            j.user_id,
+            'A spot opened up in ' || COALESCE(g.sport_name, 'a game') || ' at '
+                || COALESCE(g.location, 'TBD') || '. You have been moved off the waitlist.',
+            'waitlist',
+            jsonb_build_object('game_id', $1::int, 'event', 'promoted'),
+            FALSE,
+            NOW()
+        FROM joined AS j CROSS JOIN game AS g
+        RETURNING user_id
+    )
+    SELECT j.user_id, j.joined_at, g.sport_id
+    FROM joined AS j CROSS JOIN game AS g
+'''
+
+
+async def promote_waitlist(conn, game_id: int) -> List:
+    """Fill free spots of `game_id` from its waitlist, oldest first.
+
+    Returns one row (user_id, joined_at, sport_id) per promoted user. Safe to
+    call when nothing changed: with no free spot or an empty queue it is a
+    no-op. Runs in its own transaction, or a savepoint when the caller is
+    already in one, so "free a spot + promote" can be made atomic.
+    """
+    async with conn.transaction():
+        game = await lock_game(conn, game_id)
+        if not game or game["max_players"] is None:
+            return []
+        return await queries.fetch(conn, PROMOTE_STMT, game_id, game["max_players"])
+
+
+# ---------------------------------------------------------------------------
+# Read model: ordered queues with positions
+# ---------------------------------------------------------------------------
+# Both queries walk idx_waitlist_game_queue (game_id, joined_at, user_id)
+# WHERE admitted = FALSE, see migrations/0003_add_waitlist_indexes.sql. Positions
+# count waiting (non-admitted) entries only, 1-based.
+
+GAME_QUEUE_SQL = '''
+    SELECT w.game_id, w.user_id, w.joined_at, w.admitted,
+           $2::bigint + ROW_NUMBER() OVER (ORDER BY w.joined_at, w.user_id) AS position
+    FROM public."Waitlist" AS w
+    WHERE w.game_id = $1 AND w.admitted = FALSE
+    ORDER BY w.joined_at, w.user_id
+    LIMIT $3
+'''
+
+GAME_QUEUE_AFTER_SQL = '''
+    SELECT w.game_id, w.user_id, w.joined_at, w.admitted,
+           $2::bigint + ROW_NUMBER() OVER (ORDER BY w.joined_at, w.user_id) AS position
+    FROM public."Waitlist" AS w
+    WHERE w.game_id = $1 AND w.admitted = FALSE
+      AND (w.joined_at, w.user_id) > ($4, $5)
+    ORDER BY w.joined_at, w.user_id
+    LIMIT $3
+'''
+
+_USER_WAITLISTS_TEMPLATE = '''
+    WITH mine AS (
+        SELECT game_id, user_id, joined_at, admitted
+        FROM public."Waitlist"
+        WHERE user_id = $1
+          AND ($3::int IS NULL OR game_id = $3)
+          {after}
+        ORDER BY joined_at, game_id
+        LIMIT $2
+    ),
+    ranked AS (
+        SELECT q.game_id, q.user_id,
+               ROW_NUMBER() OVER (PARTITION BY q.game_id ORDER BY q.joined_at, q.user_id) AS position
+        FROM public."Waitlist" AS q
+        WHERE q.game_id IN (SELECT game_id FROM mine) AND q.admitted = FALSE
+    )
+    SELECT m.game_id, m.user_id, m.joined_at, m.admitted, r.position
+    FROM mine AS m
+    LEFT JOIN ranked AS r ON r.game_id = m.game_id AND r.user_id = m.user_id
+    ORDER BY m.joined_at, m.game_id
+'''
+
+USER_WAITLISTS_SQL = _USER_WAITLISTS_TEMPLATE.format(after="")
+USER_WAITLISTS_AFTER_SQL = _USER_WAITLISTS_TEMPLATE.format(after="AND (joined_at, game_id) > ($4, $5)")
+
+PROMOTE_STMT = queries.register("waitlist.promote", PROMOTE_SQL, hot=True)
+GAME_QUEUE_STMT = queries.register("waitlist.game_queue", GAME_QUEUE_SQL, hot=True)
+GAME_QUEUE_AFTER_STMT = queries.register("waitlist.game_queue_after", GAME_QUEUE_AFTER_SQL)
+USER_WAITLISTS_STMT = queries.register("waitlist.user_waitlists", USER_WAITLISTS_SQL)
+USER_WAITLISTS_AFTER_STMT = queries.register("waitlist.user_waitlists_after", USER_WAITLISTS_AFTER_SQL)
+
+
+async def fetch_game_queue(conn, game_id: int, limit: int, after: tuple = None) -> List:
+    """One page of a game's waiting queue. `after` is (joined_at, user_id, position) of the previous page's last row."""
+    if after is None:
+        return await queries.fetch(conn, GAME_QUEUE_STMT, game_id, 0, limit)
+    joined_at, user_id, position = after
+    return await queries.fetch(conn, GAME_QUEUE_AFTER_STMT, game_id, position, limit, joined_at, user_id)
+
+
+async def fetch_user_waitlists(conn, user_id: int, limit: int, after: tuple = None, game_id: int = None) -> List:
+    """One page of every waitlist `user_id` is on, with their position in each queue.
+
+    `after` is (joined_at, game_id) of the previous page's last row. Admitted
+    entries are listed with position NULL.
+    """
+    if after is None:
+        return await queries.fetch(conn, USER_WAITLISTS_STMT, user_id, limit, game_id)
+    joined_at, after_game = after
+    return await queries.fetch(conn, USER_WAITLISTS_AFTER_STMT, user_id, limit, game_id, joined_at, after_game)
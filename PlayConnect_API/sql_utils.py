@@ -0,0 +1,36 @@
+"""SQL building helpers for PlayConnect API.
+
+Dynamic UPDATEs used to be assembled by hand in each endpoint ("col = $n",
+bump n, repeat). build_set_clause() does it in one place. It only accepts
+columns from an explicit whitelist, so a column name never comes from
+request data.
+"""
+
+import re
+from typing import Any, Iterable, List, Mapping
+
+_IDENTIFIER = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+def changed_fields(model, columns: Iterable[str]) -> dict:
+    """The subset of `columns` the client actually set to a non-null value on `model`."""
+    return {col: getattr(model, col) for col in columns if getattr(model, col, None) is not None}
+
+
+def build_set_clause(values: Mapping[str, Any], allowed: Iterable[str], params: List[Any]) -> str:
+    """Render `values` as "col = $n, ..." and append the values to `params`.
+
+    Placeholders continue from len(params), so the clause can follow parameters
+    already bound by the caller. Raises ValueError for a column not in
+    `allowed` or an empty `values`.
+    """
+    allowed = set(allowed)
+    parts = []
+    for col, value in values.items():
+        if col not in allowed or not _IDENTIFIER.fullmatch(col):
+            raise ValueError(f"Column not updatable: {col}")
+        params.append(value)
+        parts.append(f"{col} = ${len(params)}")
+    if not parts:
+        raise ValueError("No fields provided for update")
+    return ", ".join(parts)
@@ -0,0 +1,6 @@
+// Avatars uploaded through the API are served from /avatars/<hash> in fixed
+// sizes (40, 80, 160, 320). Ask for the one that fits instead of the full image.
+export function avatarSrc(url, size) {
+  if (!url || !/\/avatars\/[0-9a-f]{64}$/.test(url)) return url;
+  return `${url}?size=${size}`;
+}
@@ -0,0 +1,28 @@
+import API_BASE_URL from "./config";
+
+// Keyset-paginated list endpoints return one page per request and put the
+// cursor of the next page in the X-Next-Cursor header (absent on the last one).
+
+// GET one page: { items, nextCursor }
+export async function fetchPage(path, { cursor, limit, ...params } = {}) {
+  const query = new URLSearchParams(params);
+  if (limit) query.set("limit", limit);
+  if (cursor) query.set("cursor", cursor);
+  const qs = query.toString();
+  const res = await fetch(`${API_BASE_URL}${path}${qs ? `?${qs}` : ""}`);
+  if (!res.ok) throw new Error(`Failed to fetch ${path}: ${res.status}`);
+  const items = await res.json();
+  return { items, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+// GET every page, following X-Next-Cursor until the last one
+export async function fetchAllPages(path, params = {}) {
+  const all = [];
+  let cursor;
+  do {
+    const page = await fetchPage(path, { ...params, cursor });
+    all.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return all;
+}
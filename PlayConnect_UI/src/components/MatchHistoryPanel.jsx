@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from "react";
 import ReportModal from "./ReportModal";
-import API_BASE_URL from "../Api/config";
+import { fetchPage } from "../Api/pagination";
+
+const PAGE_SIZE = 20;
 
 
 const MatchHistoryPanel = ({ userId }) => {
@@ -8,6 +10,8 @@ const MatchHistoryPanel = ({ userId }) => {
   const [loading, setLoading] = useState(true);
   const [selectedMatch, setSelectedMatch] = useState(null);
   const [showReport, setShowReport] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     // --------------------------------------------------------------------
@@ -60,11 +64,9 @@ const MatchHistoryPanel = ({ userId }) => {
     // ✅ Fetch actual match history from API (uncomment when backend is ready)
     const fetchHistory = async () => {
       try {
-        const res = await fetch(`${API_BASE_URL}/match-history/${userId}`);
-
-        if (!res.ok) throw new Error(`Failed to fetch match history: ${res.status}`);
-        const data = await res.json();
-        setMatches(data);
+        const page = await fetchPage(`/match-history/${userId}`, { limit: PAGE_SIZE });
+        setMatches(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("Error fetching match history:", err);
       } finally {
@@ -74,6 +76,21 @@ const MatchHistoryPanel = ({ userId }) => {
     fetchHistory();
   }, [userId]);
 
+  // Older matches, one page at a time (cursor from X-Next-Cursor)
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(`/match-history/${userId}`, { limit: PAGE_SIZE, cursor: nextCursor });
+      setMatches((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching match history:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const closeModal = () => setSelectedMatch(null);
 
   if (loading)
@@ -136,6 +153,16 @@ const MatchHistoryPanel = ({ userId }) => {
               </div>
             </div>
           ))}
+
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="self-center text-sm font-medium px-6 py-2 rounded-lg bg-neutral-800 hover:bg-neutral-700 border border-neutral-600 transition disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          )}
         </div>
       )}
 
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from "react";
 import ReportModal from "./ReportModal";
 import API_BASE_URL from "../Api/config";
+import { avatarSrc } from "../Api/avatar";
 
 
 
@@ -86,7 +87,7 @@ const ViewProfile = ({ userId, currentUserId, onClose, initialUser }) => {
         }
 
         // 5) Fallback: /users (last resort)
-        res = await fetch(`${API_BASE_URL}/users`);
+        res = await fetch(`${API_BASE_URL}/users?user_id=${userId}`);
 
         if (res.ok) {
           const list = await res.json();
@@ -143,7 +144,7 @@ const ViewProfile = ({ userId, currentUserId, onClose, initialUser }) => {
               <div className="w-16 h-16 rounded-full overflow-hidden flex-shrink-0">
                 {user.avatar_url ? (
                   <img
-                    src={user.avatar_url}
+                    src={avatarSrc(user.avatar_url, 160)}
                     alt={`${user.first_name || ""} ${user.last_name || ""}`}
                     className="w-full h-full object-cover"
                   />
@@ -156,7 +156,7 @@ export const AuthProvider = ({ children }) => {
         if (!parsedUser.first_name || !parsedUser.last_name) {
           (async () => {
             try {
-              const res = await fetch(`${API_BASE_URL}/users`);
+              const res = await fetch(`${API_BASE_URL}/users?user_id=${parsedUser.user_id}`);
 
               if (res.ok) {
                 const users = await res.json();
@@ -222,7 +222,7 @@ export const AuthProvider = ({ children }) => {
         
         // Try to fetch names from users endpoint
         try {
-          const res = await fetch(`${API_BASE_URL}/users`);
+          const res = await fetch(`${API_BASE_URL}/users?user_id=${data.user_id}`);
 
           if (res.ok) {
             const users = await res.json();
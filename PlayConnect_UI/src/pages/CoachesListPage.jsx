@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import { Search, Star, MapPin, Award, ChevronRight, CheckCircle, Plus } from "lucide-react";
 import VerificationRequestModal from "../components/VerificationRequestModal";
 import API_BASE_URL from '../Api/config';
+import { fetchAllPages } from '../Api/pagination';
 
 export default function CoachesListPage() {
   const [search, setSearch] = useState("");
@@ -35,8 +36,7 @@ export default function CoachesListPage() {
     const fetchCoaches = async () => {
       try {
         setLoading(true);
-        const res = await fetch(`${API_BASE_URL}/coaches`);
-        const data = await res.json();
+        const data = await fetchAllPages("/coaches", { limit: 100 });
         setCoaches(data);
         setLoading(false);
       } catch (err) {
@@ -93,8 +93,7 @@ export default function CoachesListPage() {
 
   const refreshCoaches = async () => {
     try {
-      const res = await fetch(`${API_BASE_URL}/coaches`);
-      const data = await res.json();
+      const data = await fetchAllPages("/coaches", { limit: 100 });
       setCoaches(data);
     } catch (e) {
       // ignore silently
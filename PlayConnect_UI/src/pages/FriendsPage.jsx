@@ -2,6 +2,7 @@ import React, { useState, useEffect, useMemo } from "react";
 import { Search, UserPlus, UserCheck, X } from "lucide-react";
 import ViewProfile from "../components/ViewProfile";
 import API_BASE_URL from '../Api/config';
+import { avatarSrc } from '../Api/avatar';
 
 
 
@@ -23,7 +24,7 @@ export default function FriendsPage() {
   const [toast, setToast] = useState(null);
 
   // --- Profile modal ---
-  const [allUsers, setAllUsers] = useState(null);
+  const [userCache, setUserCache] = useState(null);
   const [profileUser, setProfileUser] = useState(null);
   const [showProfileModal, setShowProfileModal] = useState(false);
   const [profileLoading, setProfileLoading] = useState(false);
@@ -189,12 +190,12 @@ export default function FriendsPage() {
     setShowProfileModal(true);
     setProfileLoading(true);
     try {
-      let list = allUsers;
-      if (!list) {
-        list = await apiGet("/users");
-        setAllUsers(list);
+      let u = userCache?.[friendUserId];
+      if (!u) {
+        const [found] = await apiGet(`/users?user_id=${friendUserId}`);
+        u = found;
+        if (u) setUserCache((prev) => ({ ...(prev || {}), [friendUserId]: u }));
       }
-      const u = list.find((u) => u.user_id === friendUserId);
       setProfileUser(u || null);
     } catch (e) {
       console.error(e);
@@ -220,18 +221,6 @@ export default function FriendsPage() {
     setError("");
   }, []);
 
-  // Preload /users once for the profile modal
-  useEffect(() => {
-    (async () => {
-      try {
-        const users = await apiGet("/users");
-        setAllUsers(users);
-      } catch (e) {
-        console.warn("Failed to preload /users", e);
-      }
-    })();
-  }, []);
-
   // auto-hide toast after 3s
   useEffect(() => {
     if (!toast) return;
@@ -294,7 +283,7 @@ export default function FriendsPage() {
           <div className="w-12 h-12 rounded-full overflow-hidden flex-shrink-0">
             {person.avatar_url ? (
               <img
-                src={person.avatar_url}
+                src={avatarSrc(person.avatar_url, 96)}
                 alt={displayName}
                 className="w-full h-full object-cover cursor-pointer hover:opacity-80 transition"
                 onClick={() => {
@@ -630,7 +619,7 @@ export default function FriendsPage() {
                   <div className="w-12 h-12 rounded-full overflow-hidden flex-shrink-0">
                     {profileUser.avatar_url ? (
                       <img
-                        src={profileUser.avatar_url}
+                        src={avatarSrc(profileUser.avatar_url, 96)}
                         alt="avatar"
                         className="w-full h-full object-cover"
                       />
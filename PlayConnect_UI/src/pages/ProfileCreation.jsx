@@ -158,7 +158,7 @@ export default function ProfileCreation() {
       // If we already have details, skip
       if (userDetails?.user_id === effectiveUserId) return;
       try {
-        const res = await fetch(`${API_BASE_URL}/users`);
+        const res = await fetch(`${API_BASE_URL}/users?user_id=${effectiveUserId}`);
         if (!res.ok) return;
         const all = await res.json();
         const me = all.find((u) => u.user_id === effectiveUserId);
@@ -252,7 +252,7 @@ export default function ProfileCreation() {
       if (!first_name || !last_name || typeof age !== "number") {
         // Try one last fetch if missing
         try {
-          const res = await fetch(`${API_BASE_URL}/users`);
+          const res = await fetch(`${API_BASE_URL}/users?user_id=${user.user_id}`);
           if (res.ok) {
             const all = await res.json();
             const me = all.find((u) => u.user_id === user.user_id);
@@ -96,7 +96,7 @@ export default function ProfilePage() {
   const fetchStats = async () => {
     if (!user?.user_id) return;
     try {
-      const res = await fetch(`${API_BASE_URL}/user_stats`);
+      const res = await fetch(`${API_BASE_URL}/user_stats?user_id=${user.user_id}`);
       if (!res.ok) throw new Error("Failed to load stats");
       const data = await res.json();
       const mine = Array.isArray(data)